@@ -0,0 +1,217 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import product
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+from bench.generator import BuildingGenerator
+from building_model import BuildingModel
+from config import Config
+from grid import Grid
+from pathfinder import PathFinder
+
+SIZES: Dict[str, Tuple[float, float, int]] = {
+    "small": (10000.0, 5000.0, 6),
+    "medium": (20000.0, 10000.0, 16),
+    "large": (40000.0, 20000.0, 48),
+}
+STAGES = ("load", "ceiling_mask", "mark_ceiling", "mark_obstacles", "graph", "find_path")
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def cases(
+    sizes: List[str], shapes: List[str], cell_sizes: List[float], algorithm: str, threads: List[int] | None = None
+) -> List[Dict[str, Any]]:
+    result = []
+    for size, shape, cell_size, count in product(sizes, shapes, cell_sizes, threads or [1]):
+        if size not in SIZES:
+            raise ValueError(f"Unknown benchmark size '{size}', expected one of {'/'.join(SIZES)}")
+        width, depth, ducts = SIZES[size]
+        suffix = "" if count == 1 else f"-{count}threads"
+        result.append({
+            "name": f"{size}-{shape}-{cell_size:g}mm-{algorithm}{suffix}",
+            "building": BuildingGenerator(width, depth, shape, ducts),
+            "config": {
+                "grid": {"cell_size": cell_size, "orientation": "xy", "threads": count},
+                "cable": {"width": 50},
+                "routing": {"offset": 100, "algorithm": algorithm},
+            },
+        })
+    return result
+
+
+def run_case(model_path: Path, config_path: Path, building: BuildingGenerator, trace: bool) -> Dict[str, Any]:
+    stages: Dict[str, Dict[str, float]] = {}
+
+    def stage(name: str, action: Callable[[], Any]) -> Any:
+        if trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = action()
+        stages[name] = {"seconds": time.perf_counter() - start}
+        if trace:
+            stages[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+        return result
+
+    def graph() -> PathFinder:
+        pathfinder = PathFinder(grid, config.algorithm, config.cluster_size)
+        pathfinder.prepare()
+        return pathfinder
+
+    config = Config(config_path)
+    model = stage("load", lambda: BuildingModel(model_path))
+    grid = stage("ceiling_mask", lambda: Grid(model, config))
+    stage("mark_ceiling", grid.mark_ceiling)
+    stage("mark_obstacles", grid.mark_obstacles)
+    pathfinder = stage("graph", graph)
+    z = float(model.ceiling.vertices[:, 2].max())
+    source, target = (np.array([*point, z]) for point in building.endpoints())
+    path = stage("find_path", lambda: pathfinder.find_path(source, target))
+
+    counts = {
+        "objects": len(model.obstacles) + 1,
+        "grid_shape": list(grid.obstacle_mask.shape),
+        "free_nodes": int(pathfinder.free_indices.shape[0]),
+        "expanded_nodes": pathfinder.expanded_nodes,
+        "path_length": float(np.abs(np.diff(path, axis=0)).sum()),
+    }
+    if config.algorithm == "dijkstra":
+        counts["graph_edges"] = int(pathfinder.adjacency.nnz // 2)
+
+    return {"stages": stages, "counts": counts}
+
+
+def run(selected: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for case in selected:
+            model_path = case["building"].write(Path(workdir) / f"{case['name']}.json")
+            config_path = Path(workdir) / f"{case['name']}.yaml"
+            config_path.write_text(json.dumps(case["config"]), encoding="utf-8")
+
+            timings = [run_case(model_path, config_path, case["building"], False) for _ in range(repeat)]
+            tracemalloc.start()
+            try:
+                traced = run_case(model_path, config_path, case["building"], True)
+            finally:
+                tracemalloc.stop()
+
+            stages = {
+                name: {
+                    "seconds": min(timing["stages"][name]["seconds"] for timing in timings),
+                    "peak_bytes": traced["stages"][name]["peak_bytes"],
+                }
+                for name in STAGES
+            }
+            results[case["name"]] = {
+                "params": {**case["building"].params, **case["config"]},
+                "stages": stages,
+                "counts": timings[0]["counts"],
+            }
+            print(f"{case['name']}: {sum(s['seconds'] for s in stages.values()):.3f}s", file=sys.stderr)
+
+    return {
+        "version": 1,
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "cases": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.25,
+    min_seconds: float = 0.005,
+    min_bytes: int = 1 << 20,
+) -> List[str]:
+    regressions = []
+    for name, case in current["cases"].items():
+        reference = baseline["cases"].get(name)
+        if reference is None:
+            continue
+        for stage, record in case["stages"].items():
+            before = reference["stages"].get(stage)
+            if before is None:
+                continue
+            for metric, floor in (("seconds", min_seconds), ("peak_bytes", min_bytes)):
+                old, new = before[metric], record[metric]
+                if new > old * (1 + threshold) and new - old > floor:
+                    regressions.append(
+                        f"{name} {stage} {metric}: {old:g} -> {new:g} (+{100 * (new / max(old, 1e-12) - 1):.0f}%)"
+                    )
+    return regressions
+
+
+def report(current: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    print(f"{'case':<40} {'stage':<15} {'seconds':>9} {'peak MB':>9} {'vs base':>8}")
+    for name, case in current["cases"].items():
+        reference = (baseline or {}).get("cases", {}).get(name)
+        for stage, record in case["stages"].items():
+            change = ""
+            if reference is not None and reference["stages"].get(stage, {}).get("seconds"):
+                change = f"{100 * (record['seconds'] / reference['stages'][stage]['seconds'] - 1):+.0f}%"
+            print(
+                f"{name:<40} {stage:<15} {record['seconds']:>9.4f} "
+                f"{record['peak_bytes'] / 2 ** 20:>9.1f} {change:>8}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the cable routing pipeline on generated buildings")
+    parser.add_argument("--sizes", default="small,medium", help=f"Comma separated sizes: {'/'.join(SIZES)}")
+    parser.add_argument(
+        "--shapes", default="rectangle,sloped_cutout",
+        help=f"Comma separated ceiling shapes: {'/'.join(BuildingGenerator.SHAPES)}"
+    )
+    parser.add_argument("--cell-sizes", default="20", help="Comma separated grid cell sizes")
+    parser.add_argument("--algorithm", default="dijkstra", help="Routing algorithm")
+    parser.add_argument(
+        "--threads", default="1", help="Comma separated grid build thread counts, to compare build speedups"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case, the fastest is kept")
+    parser.add_argument("--output", type=str, help="Path to the JSON file the results are written to")
+    parser.add_argument("--baseline", type=str, default=str(BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown before flagging")
+    args = parser.parse_args()
+
+    try:
+        selected = cases(
+            args.sizes.split(","),
+            args.shapes.split(","),
+            [float(size) for size in args.cell_sizes.split(",")],
+            args.algorithm,
+            [int(count) for count in args.threads.split(",")],
+        )
+        current = run(selected, max(args.repeat, 1))
+    except (TypeError, ValueError) as e:
+        print(f"BENCHMARK ERROR: {e}")
+        sys.exit(2)
+
+    baseline = None
+    if Path(args.baseline).is_file():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(current, baseline)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    regressions = compare(baseline, current, args.threshold) if baseline is not None else []
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
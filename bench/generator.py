@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import json
+import numpy as np
+
+
+class BuildingGenerator:
+    SHAPES = ("rectangle", "sloped", "cutout", "sloped_cutout")
+    ORIENTATIONS = ("x", "y", "mixed")
+
+    def __init__(
+        self,
+        width: float = 20000.0,
+        depth: float = 10000.0,
+        shape: str = "rectangle",
+        ducts: int = 8,
+        orientation: str = "mixed",
+        duct_size: float = 300.0,
+        slab: Tuple[float, float] = (3530.0, 4000.0),
+        seed: int = 0,
+    ) -> None:
+        if shape not in self.SHAPES:
+            raise ValueError(f"Building shape must be one of {'/'.join(self.SHAPES)}, got '{shape}'")
+        if orientation not in self.ORIENTATIONS:
+            raise ValueError(
+                f"Duct orientation must be one of {'/'.join(self.ORIENTATIONS)}, got '{orientation}'"
+            )
+        if width <= 0 or depth <= 0:
+            raise ValueError(f"Building size must be > 0, got {width}x{depth}")
+        if ducts < 0:
+            raise ValueError(f"Number of ducts must be >= 0, got {ducts}")
+        if slab[0] >= slab[1]:
+            raise ValueError(f"Slab bottom must be below its top, got {slab}")
+        self.__width: float = float(width)
+        self.__depth: float = float(depth)
+        self.__shape: str = shape
+        self.__ducts: int = ducts
+        self.__orientation: str = orientation
+        self.__duct_size: float = float(duct_size)
+        self.__slab: Tuple[float, float] = (float(slab[0]), float(slab[1]))
+        self.__seed: int = seed
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {
+            "width": self.__width,
+            "depth": self.__depth,
+            "shape": self.__shape,
+            "ducts": self.__ducts,
+            "orientation": self.__orientation,
+            "duct_size": self.__duct_size,
+            "seed": self.__seed,
+        }
+
+    def endpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        y = 0.5 * self.__depth
+        return np.array([0.05 * self.__width, y]), np.array([0.95 * self.__width, y])
+
+    def outline(self) -> List[np.ndarray]:
+        w, d = self.__width, self.__depth
+        sloped = self.__shape in ("sloped", "sloped_cutout")
+        chamfer = 0.3 * min(w, d)
+        if self.__shape in ("cutout", "sloped_cutout"):
+            a, b = 0.3 * w, 0.3 * d
+            right = [(a, 0), (w, 0), (w, d), (a, d)]
+            pieces = [right, [(0, b), (a, b), (a, d), (0, d)]]
+        else:
+            pieces = [[(0, 0), (w, 0), (w, d), (0, d)]]
+        if sloped:
+            pieces[0][1:2] = [(w - chamfer, 0), (w, chamfer)]
+
+        return [np.array(piece, dtype=float) for piece in pieces]
+
+    def objects(self) -> List[Dict[str, Any]]:
+        objects = [
+            {"Name": f"Floor {i}", "Category": "Floors", **self.__prism(piece, *self.__slab)}
+            for i, piece in enumerate(self.outline())
+        ]
+
+        rng = np.random.default_rng(self.__seed)
+        lo = np.array([0.15 * self.__width, 0.1 * self.__depth])
+        hi = np.array([0.85 * self.__width, 0.9 * self.__depth])
+        bottom = self.__slab[0] - 100.0
+        for i in range(self.__ducts):
+            axis = {"x": 0, "y": 1}.get(self.__orientation, i % 2)
+            length = rng.uniform(0.3, 0.8) * (hi[axis] - lo[axis])
+            start = lo + rng.uniform(0, 1, 2) * (hi - lo - self.__duct_size)
+            start[axis] = rng.uniform(lo[axis], hi[axis] - length)
+            end = start + self.__duct_size
+            end[axis] = start[axis] + length
+            box = np.array([start, [end[0], start[1]], end, [start[0], end[1]]])
+            objects.append({
+                "Name": f"Duct {i}",
+                "Category": "Ducts",
+                **self.__prism(box, bottom - self.__duct_size, bottom),
+            })
+
+        return objects
+
+    def write(self, json_path: str | Path) -> Path:
+        json_path = Path(json_path)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.objects(), f)
+        return json_path
+
+    @staticmethod
+    def __prism(polygon: np.ndarray, z0: float, z1: float) -> Dict[str, List[float]]:
+        n = polygon.shape[0]
+        coords = np.concatenate((
+            np.column_stack((polygon, np.full(n, z0))),
+            np.column_stack((polygon, np.full(n, z1))),
+        ))
+        fan = np.column_stack((np.zeros(n - 2, dtype=int), np.arange(1, n - 1), np.arange(2, n)))
+        ring = np.arange(n)
+        nxt = (ring + 1) % n
+        sides = np.concatenate((
+            np.column_stack((ring, nxt, nxt + n)),
+            np.column_stack((nxt + n, ring + n, ring)),
+        ))
+        faces = np.concatenate((fan[:, ::-1], fan + n, sides))
+
+        return {"Coords": coords.ravel().tolist(), "Indices": faces.ravel().tolist()}
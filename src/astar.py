@@ -0,0 +1,124 @@
+from heapq import heapify, heappop, heappush
+from typing import Dict, List
+from voxels import VoxelSpace
+
+
+class AStar:
+    def __init__(self, space: VoxelSpace) -> None:
+        self.__space: VoxelSpace = space
+        sx, sy, sz = space.strides
+        self.__steps = (sx, -sx, sy, -sy, sz, -sz)
+        self.__expanded: int = 0
+
+    @property
+    def expanded(self) -> int:
+        return self.__expanded
+
+    def search(
+        self, source: int, target: int, penalty: Dict[int, float] | None = None
+    ) -> List[int]:
+        coords = self.__space.coords
+        free = self.__space.free
+        tx, ty, tz = coords(target)
+
+        def heuristic(state: int) -> int:
+            x, y, z = coords(state)
+            return abs(x - tx) + abs(y - ty) + abs(z - tz)
+
+        g: Dict[int, int] = {source: 0}
+        parent: Dict[int, int] = {source: -1}
+        closed = set()
+        extra = {} if penalty is None else penalty
+        h0 = heuristic(source)
+        heap = [(h0, h0, source)]
+        self.__expanded = 0
+
+        while heap:
+            _, _, state = heappop(heap)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.__expanded += 1
+            if state == target:
+                path = []
+                while state != -1:
+                    path.append(state)
+                    state = parent[state]
+                return path[::-1]
+
+            base = g[state]
+            for step in self.__steps:
+                nbr = state + step
+                if nbr in closed:
+                    continue
+                total = base + 1 + extra.get(nbr, 0)
+                if total >= g.get(nbr, total + 1) or not free(nbr):
+                    continue
+                g[nbr] = total
+                parent[nbr] = state
+                h = heuristic(nbr)
+                heappush(heap, (total + h, h, nbr))
+
+        raise ValueError("Path not found")
+
+    def search_many(self, source: int, targets: List[int]) -> List[List[int] | None]:
+        coords = self.__space.coords
+        free = self.__space.free
+        remaining: Dict[int, List[int]] = {}
+        for i, target in enumerate(targets):
+            remaining.setdefault(target, []).append(i)
+        goals = [coords(target) for target in remaining]
+
+        def heuristic(state: int) -> int:
+            x, y, z = coords(state)
+            return min(abs(x - tx) + abs(y - ty) + abs(z - tz) for tx, ty, tz in goals)
+
+        paths: List[List[int] | None] = [None] * len(targets)
+        if not targets:
+            return paths
+
+        g: Dict[int, int] = {source: 0}
+        parent: Dict[int, int] = {source: -1}
+        closed = set()
+        h0 = heuristic(source)
+        heap = [(h0, h0, source)]
+        self.__expanded = 0
+
+        while heap and remaining:
+            _, _, state = heappop(heap)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.__expanded += 1
+            if state in remaining:
+                path = []
+                node = state
+                while node != -1:
+                    path.append(node)
+                    node = parent[node]
+                for i in remaining.pop(state):
+                    paths[i] = path[::-1]
+                if not remaining:
+                    break
+                goals = [coords(target) for target in remaining]
+                heap = [
+                    (g[open_state] + h, h, open_state)
+                    for open_state in {entry[2] for entry in heap} - closed
+                    for h in (heuristic(open_state),)
+                ]
+                heapify(heap)
+
+            base = g[state]
+            for step in self.__steps:
+                nbr = state + step
+                if nbr in closed:
+                    continue
+                total = base + 1
+                if total >= g.get(nbr, total + 1) or not free(nbr):
+                    continue
+                g[nbr] = total
+                parent[nbr] = state
+                h = heuristic(nbr)
+                heappush(heap, (total + h, h, nbr))
+
+        return paths
@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+from pathfinder import PathFinder
+
+_worker_pathfinder: PathFinder | None = None
+
+
+def _init_worker(pathfinder: PathFinder) -> None:
+    global _worker_pathfinder
+    _worker_pathfinder = pathfinder
+
+
+def _route_group(group: Tuple[np.ndarray, List[np.ndarray]]) -> List[np.ndarray | None]:
+    source_point, target_points = group
+    try:
+        return _worker_pathfinder.find_paths(source_point, target_points)
+    except ValueError:
+        return [None] * len(target_points)
+
+
+class BatchRouter:
+    def __init__(
+        self,
+        pathfinder: PathFinder,
+        point: Callable[..., np.ndarray],
+        workers: int = 1,
+        capacity: int | None = None,
+        max_iterations: int = 50,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"Number of workers must be >= 1, got {workers}")
+        self.__pathfinder: PathFinder = pathfinder
+        self.__point: Callable[..., np.ndarray] = point
+        self.__workers: int = workers
+        self.__capacity: int | None = capacity
+        self.__max_iterations: int = max_iterations
+
+    @staticmethod
+    def read_pairs(pairs_path: str | Path) -> List[Tuple[np.ndarray, np.ndarray]]:
+        pairs_path = Path(pairs_path)
+        if not pairs_path.is_file():
+            raise FileNotFoundError(f"Pairs file not found: {pairs_path}")
+
+        pairs = []
+        with open(pairs_path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split(",")
+                try:
+                    if len(parts) not in (4, 6):
+                        raise ValueError
+                    half = len(parts) // 2
+                    source, target = (
+                        np.array([float(x), float(y), *(int(storey) for storey in rest)])
+                        for x, y, *rest in (parts[:half], parts[half:])
+                    )
+                except ValueError:
+                    raise ValueError(
+                        f"{pairs_path}:{line_no}: expected 'source_x,source_y,target_x,target_y' or "
+                        f"'source_x,source_y,source_storey,target_x,target_y,target_storey', got '{line}'"
+                    )
+                pairs.append((source, target))
+
+        return pairs
+
+    def route(self, pairs: List[Tuple[np.ndarray, np.ndarray]]) -> List[Dict[str, Any]]:
+        if self.__capacity is not None:
+            return self.__negotiate(pairs)
+
+        groups: Dict[Tuple[float, ...], List[int]] = {}
+        for i, (source, _) in enumerate(pairs):
+            groups.setdefault(tuple(float(value) for value in source), []).append(i)
+
+        tasks = [
+            (self.__endpoint(source), [self.__endpoint(pairs[i][1]) for i in members])
+            for source, members in groups.items()
+        ]
+
+        self.__pathfinder.prepare()
+        if self.__workers == 1 or len(tasks) == 1:
+            _init_worker(self.__pathfinder)
+            routed = list(map(_route_group, tasks))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.__workers,
+                initializer=_init_worker,
+                initargs=(self.__pathfinder,),
+            ) as executor:
+                routed = list(executor.map(_route_group, tasks))
+
+        results: List[Dict[str, Any]] = [{} for _ in pairs]
+        for (source_point, target_points), members, paths in zip(tasks, groups.values(), routed):
+            for i, target_point, path in zip(members, target_points, paths):
+                results[i] = self.__result(source_point, target_point, path)
+
+        return results
+
+    def __negotiate(self, pairs: List[Tuple[np.ndarray, np.ndarray]]) -> List[Dict[str, Any]]:
+        points = [(self.__endpoint(source), self.__endpoint(target)) for source, target in pairs]
+        paths, congested = self.__pathfinder.find_nets(points, self.__capacity, self.__max_iterations)
+
+        results = [
+            self.__result(source_point, target_point, path)
+            for (source_point, target_point), path in zip(points, paths)
+        ]
+        for i in congested:
+            results[i]["congested"] = True
+
+        return results
+
+    def __endpoint(self, endpoint: np.ndarray | Tuple[float, ...]) -> np.ndarray:
+        x, y, *storey = endpoint
+        return self.__point(float(x), float(y), *(int(value) for value in storey))
+
+    def __result(
+        self, source_point: np.ndarray, target_point: np.ndarray, path: np.ndarray | None
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "source": source_point.tolist(),
+            "target": target_point.tolist(),
+        }
+        if path is None:
+            if not self.__pathfinder.contains(source_point):
+                result["error"] = "Source point is inside an obstacle or out of grid bounds"
+            elif not self.__pathfinder.contains(target_point):
+                result["error"] = "Target point is inside an obstacle or out of grid bounds"
+            else:
+                result["error"] = "Path not found"
+        else:
+            result["path"] = path.tolist()
+            result["length"] = float(np.abs(np.diff(path, axis=0)).sum())
+
+        return result
@@ -1,38 +1,41 @@
 from pathlib import Path
 from typing import List, Tuple
 import numpy as np
-import trimesh
 from loader import Loader
+from mesh import Mesh
 
 
-class BuildingModel:
-    def __init__(self, json_path: str | Path) -> None:
-        self.__json_path: Path = Path(json_path)
-        try:
-            loader = Loader(self.__json_path)
-            ceiling, obstacles = loader.load()
-        except (FileNotFoundError, ValueError, TypeError, OSError) as e:
-            print(f"LOADER ERROR: {e}")
-            return
-
-        if not isinstance(ceiling, trimesh.Trimesh):
-            raise TypeError("Loader returned invalid ceiling mesh")
-        if not isinstance(obstacles, list):
-            raise TypeError("Loader returned invalid obstacles list")
-        self.__ceiling: trimesh.Trimesh = ceiling
-        self.__obstacles: List[trimesh.Trimesh] = obstacles
+class Storey:
+    def __init__(self, index: int, ceiling: Mesh, obstacles: List[Mesh], floor: float | None = None) -> None:
+        if ceiling.vertices.size == 0:
+            raise ValueError("Ceiling mesh has no vertices")
+        self.__index: int = index
+        self.__ceiling: Mesh = ceiling
+        self.__obstacles: List[Mesh] = obstacles
+        self.__floor: float | None = floor
+        self.__elevation: float = float(ceiling.vertices[:, 2].max())
+
+    @property
+    def index(self) -> int:
+        return self.__index
 
     @property
-    def ceiling(self) -> trimesh.Trimesh:
+    def ceiling(self) -> Mesh:
         return self.__ceiling
 
     @property
-    def obstacles(self) -> List[trimesh.Trimesh]:
+    def obstacles(self) -> List[Mesh]:
         return self.__obstacles
 
+    @property
+    def floor(self) -> float | None:
+        return self.__floor
+
+    @property
+    def elevation(self) -> float:
+        return self.__elevation
+
     def get_bounds_xy(self) -> Tuple[np.ndarray, np.ndarray]:
-        if self.__ceiling.vertices.size == 0:
-            raise ValueError("Ceiling mesh has no vertices")
         ceiling_xy = self.__ceiling.vertices[:, :2]
 
         if self.__obstacles:
@@ -61,9 +64,59 @@ class BuildingModel:
             z_values.append(obs.vertices[:, 2])
 
         min_z: float = min(z.min() for z in z_values) - offset
-        max_z: float = self.__ceiling.vertices[:, 2].max()
+        if self.__floor is not None:
+            min_z = max(min_z, self.__floor)
+        max_z: float = self.__elevation
         if min_z >= max_z:
             raise ValueError("Invalid Z bounds: min_z >= max_z")
 
         return min_z, max_z
 
+
+class BuildingModel:
+    def __init__(self, json_path: str | Path) -> None:
+        self.__json_path: Path = Path(json_path)
+        loader = Loader(self.__json_path)
+        ceiling, obstacles = loader.load()
+
+        if not isinstance(ceiling, Mesh):
+            raise TypeError("Loader returned invalid ceiling mesh")
+        if not isinstance(obstacles, list):
+            raise TypeError("Loader returned invalid obstacles list")
+        self.__storeys: List[Storey] = []
+        for index, (storey_ceiling, storey_obstacles) in enumerate(loader.storeys):
+            floor = self.__storeys[-1].elevation if self.__storeys else None
+            self.__storeys.append(Storey(index, storey_ceiling, storey_obstacles, floor))
+
+    @property
+    def storeys(self) -> List[Storey]:
+        return self.__storeys
+
+    @property
+    def ceiling(self) -> Mesh:
+        return self.__storeys[-1].ceiling
+
+    @property
+    def obstacles(self) -> List[Mesh]:
+        return self.__storeys[-1].obstacles
+
+    def storey_at(self, z: float) -> Storey:
+        for storey in self.__storeys:
+            if np.isclose(storey.elevation, z):
+                return storey
+        raise ValueError(
+            f"No storey ceiling at z={z}, storeys are at {[storey.elevation for storey in self.__storeys]}"
+        )
+
+    def point(self, x: float, y: float, storey: int | None = None) -> np.ndarray:
+        if storey is None:
+            storey = len(self.__storeys) - 1
+        if not 0 <= storey < len(self.__storeys):
+            raise ValueError(f"Storey must be in [0, {len(self.__storeys) - 1}], got {storey}")
+        return np.array([x, y, self.__storeys[storey].elevation], dtype=float)
+
+    def get_bounds_xy(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.__storeys[-1].get_bounds_xy()
+
+    def get_bounds_z(self, offset: float = 0.0) -> Tuple[float, float]:
+        return self.__storeys[-1].get_bounds_z(offset)
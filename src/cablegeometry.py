@@ -1,85 +1,75 @@
-from typing import List, Dict
+from typing import Tuple
 import numpy as np
 
 
 class CableGeometry:
+    BOX_DTYPE = np.dtype([("center", float, (3,)), ("size", float, (3,))])
+    CORNERS = np.array([
+        [-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+        [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1],
+    ]) / 2
+    SIDES = np.array([
+        [0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4],
+        [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7],
+    ])
+
     @staticmethod
-    def __collinear(
-            p0: np.ndarray,
-            p1: np.ndarray,
-            p2: np.ndarray,
-            tol: float = 1e-6
-    ) -> bool:
-        v1 = p1 - p0
-        v2 = p2 - p1
-        return np.linalg.norm(np.cross(v1, v2)) < tol
+    def runs(path_points: np.ndarray, tol: float = 1e-6) -> np.ndarray:
+        points = np.asarray(path_points, dtype=float)
+        if points.shape[0] < 2:
+            return np.empty(0, dtype=int)
+        steps = np.diff(points, axis=0)
+
+        moving = np.any(steps != 0, axis=1)
+        last = np.maximum.accumulate(np.where(moving, np.arange(steps.shape[0]), 0))
+        heading = np.where(moving[last][:, None], steps[last], 0.0)
+        turn = np.linalg.norm(np.cross(heading[:-1], steps[1:]), axis=1) >= tol
+
+        return np.concatenate(([0], np.flatnonzero(turn) + 1, [steps.shape[0]]))
 
     @staticmethod
     def generate_cable_boxes(
         path_points: np.ndarray,
         width: float,
         height: float = 5.0
-    ) -> List[Dict[str, np.ndarray | float]]:
-        boxes: List[Dict[str, np.ndarray | float]] = []
+    ) -> np.ndarray:
+        points = np.asarray(path_points, dtype=float)
+        bounds = CableGeometry.runs(points)
+        if bounds.shape[0] < 2:
+            return np.empty(0, dtype=CableGeometry.BOX_DTYPE)
+        start, end = bounds[:-1], bounds[1:]
 
-        i: int = 0
-        while i < len(path_points) - 1:
-            source_idx: int = i
-            target_idx: int = i + 1
-            while (
-                target_idx < len(path_points) - 1
-                and CableGeometry.__collinear(
-                    np.asarray(path_points[source_idx]),
-                    np.asarray(path_points[target_idx]),
-                    np.asarray(path_points[target_idx + 1])
-                )
-            ):
-                target_idx += 1
+        vec = points[end] - points[start]
+        length = np.abs(vec).max(axis=1)
+        along_x = vec[:, 0] != 0
+        along_y = ~along_x & (vec[:, 1] != 0)
+        size = np.empty((start.shape[0], 3))
+        size[:, 0] = np.where(along_x, length, np.where(along_y, width, height))
+        size[:, 1] = np.where(along_y, length, width)
+        size[:, 2] = np.where(along_x | along_y, height, length)
 
-            p1 = np.asarray(path_points[source_idx])
-            p2 = np.asarray(path_points[target_idx])
-            center: np.ndarray = (p1 + p2) / 2
-            vec: np.ndarray = p2 - p1
-            length: float = float(np.max(np.abs(vec)))
+        vec_next = np.zeros_like(vec)
+        vec_next[:-1] = vec[1:]
+        corner = (
+            ((vec[:, 0] != 0) & (vec_next[:, 1] != 0))
+            | ((vec[:, 1] != 0) & (vec_next[:, 0] != 0))
+        )
 
-            if vec[0] != 0:
-                box = {
-                    "center": center,
-                    "x_length": length,
-                    "y_length": width,
-                    "z_length": height,
-                }
-            elif vec[1] != 0:
-                box = {
-                    "center": center,
-                    "x_length": width,
-                    "y_length": length,
-                    "z_length": height,
-                }
-            else:
-                box = {
-                    "center": center,
-                    "x_length": height,
-                    "y_length": width,
-                    "z_length": length,
-                }
-            boxes.append(box)
-            i = target_idx
+        slots = 1 + corner.astype(int)
+        offset = np.cumsum(slots) - slots
+        boxes = np.empty(int(slots.sum()), dtype=CableGeometry.BOX_DTYPE)
+        boxes["center"][offset] = (points[start] + points[end]) / 2
+        boxes["size"][offset] = size
+        boxes["center"][offset[corner] + 1] = points[end[corner]]
+        boxes["size"][offset[corner] + 1] = (width, width, height)
 
-            if i < len(path_points) - 2:
-                p3 = np.asarray(path_points[i + 2])
-                vec_next = p3 - p2
+        return boxes
 
-                if (
-                    (vec[0] != 0 and vec_next[1] != 0)
-                    or (vec[1] != 0 and vec_next[0] != 0)
-                ):
-                    corner_box = {
-                        "center": p2,
-                        "x_length": width,
-                        "y_length": width,
-                        "z_length": height,
-                    }
-                    boxes.append(corner_box)
+    @staticmethod
+    def box_mesh(centers: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+        sizes = np.asarray(sizes, dtype=float).reshape(-1, 3)
+        points = centers[:, None, :] + CableGeometry.CORNERS[None, :, :] * sizes[:, None, :]
+        sides = CableGeometry.SIDES[None, :, :] + 8 * np.arange(centers.shape[0])[:, None, None]
 
-        return boxes
+        return points.reshape(-1, 3), sides.reshape(-1, 4)
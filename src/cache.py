@@ -0,0 +1,122 @@
+from pathlib import Path
+from typing import Dict, Tuple
+import hashlib
+import os
+import shutil
+import tempfile
+import numpy as np
+from building_model import BuildingModel, Storey
+from config import Config
+from grid import Grid
+from pathfinder import PathFinder
+
+
+class GridCache:
+    VERSION = 2
+    ARRAYS = ("obstacle_mask", "ceiling_mask", "free_idx", "indptr", "indices", "data")
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        if max_bytes <= 0:
+            raise ValueError(f"Cache size limit must be > 0, got {max_bytes}")
+        self.__directory: Path = Path(directory)
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__max_bytes: int = max_bytes
+
+    @property
+    def directory(self) -> Path:
+        return self.__directory
+
+    @staticmethod
+    def key(model_path: str | Path, config: Config, storey: int | None = None) -> str:
+        digest = hashlib.sha256()
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(
+            f"v{GridCache.VERSION}|{config.step!r}|{config.offset!r}|{config.width!r}|{config.orientation}"
+            f"|{config.mask}".encode()
+        )
+        if storey is not None:
+            digest.update(f"|storey{storey}".encode())
+        return digest.hexdigest()
+
+    def load(
+        self, key: str, building: BuildingModel | Storey, config: Config, **pathfinder_options
+    ) -> Tuple[Grid, PathFinder] | None:
+        entry = self.__directory / key
+        if not entry.is_dir():
+            return None
+        try:
+            arrays: Dict[str, np.ndarray] = {
+                name: np.load(entry / f"{name}.npy", mmap_mode="c" if name == "obstacle_mask" else "r")
+                for name in self.ARRAYS
+            }
+        except (OSError, ValueError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(entry)
+
+        grid = Grid(
+            building,
+            config,
+            ceiling_mask=arrays["ceiling_mask"],
+            obstacle_mask=arrays["obstacle_mask"],
+        )
+        from scipy.sparse import csr_matrix
+
+        n_nodes = arrays["free_idx"].shape[0]
+        adjacency = csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=(n_nodes, n_nodes),
+            copy=False,
+        )
+        pathfinder = PathFinder(
+            grid,
+            free_idx=arrays["free_idx"],
+            adjacency=adjacency,
+            **pathfinder_options,
+        )
+
+        return grid, pathfinder
+
+    def store(self, key: str, grid: Grid, pathfinder: PathFinder) -> None:
+        adjacency = pathfinder.adjacency
+        arrays = {
+            "obstacle_mask": grid.obstacle_mask,
+            "ceiling_mask": grid.ceiling_mask,
+            "free_idx": pathfinder.free_indices,
+            "indptr": adjacency.indptr,
+            "indices": adjacency.indices,
+            "data": adjacency.data,
+        }
+
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.__directory))
+        try:
+            for name, array in arrays.items():
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+            entry = self.__directory / key
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.__evict(keep=key)
+
+    def __evict(self, keep: str) -> None:
+        entries = []
+        total = 0
+        for entry in self.__directory.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((entry.stat().st_mtime, entry, size))
+            total += size
+
+        for _, entry, size in sorted(entries, key=lambda item: item[0]):
+            if total <= self.__max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -1,12 +1,12 @@
 from __future__ import annotations
 import yaml
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 
 class Config:
-    def __init__(self) -> None:
-        self.__path: Path = Path(__file__).parent.parent / "data" / "config.yaml"
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.__path: Path = Path(__file__).parent.parent / "data" / "config.yaml" if path is None else Path(path)
         self.__data: Dict[str, Any] = self.__load_yaml()
         self.__set_defaults()
         self.__bind_fields()
@@ -19,6 +19,26 @@ class Config:
     def orientation(self) -> str:
         return self.__orientation
 
+    @property
+    def mask(self) -> str:
+        return self.__mask
+
+    @property
+    def tile_size(self) -> int:
+        return self.__tile_size
+
+    @property
+    def memory_mb(self) -> float:
+        return self.__memory_mb
+
+    @property
+    def tile_dir(self) -> str | None:
+        return self.__tile_dir
+
+    @property
+    def threads(self) -> int:
+        return self.__threads
+
     @property
     def offset(self) -> float:
         return self.__offset
@@ -27,6 +47,42 @@ class Config:
     def width(self) -> float:
         return self.__width
 
+    @property
+    def algorithm(self) -> str:
+        return self.__algorithm
+
+    @property
+    def cluster_size(self) -> int:
+        return self.__cluster_size
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def max_iterations(self) -> int:
+        return self.__max_iterations
+
+    @property
+    def risers(self) -> List[Tuple[float, float]]:
+        return self.__risers
+
+    @property
+    def cache_dir(self) -> str | None:
+        return self.__cache_dir
+
+    @property
+    def cache_size(self) -> int:
+        return self.__cache_size
+
+    @property
+    def max_models(self) -> int:
+        return self.__max_models
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
     def __load_yaml(self) -> Dict[str, Any]:
         if not self.__path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.__path}")
@@ -37,10 +93,26 @@ class Config:
         self.__data.setdefault("grid", {})
         self.__data["grid"].setdefault("cell_size", 10)
         self.__data["grid"].setdefault("orientation", "xyz")
+        self.__data["grid"].setdefault("mask", "dense")
+        self.__data["grid"].setdefault("tile_size", 256)
+        self.__data["grid"].setdefault("memory_mb", 1024)
+        self.__data["grid"].setdefault("tile_dir", None)
+        self.__data["grid"].setdefault("threads", 1)
         self.__data.setdefault("routing", {})
         self.__data["routing"].setdefault("offset", 50)
+        self.__data["routing"].setdefault("algorithm", "dijkstra")
+        self.__data["routing"].setdefault("cluster_size", 32)
+        self.__data["routing"].setdefault("capacity", 2)
+        self.__data["routing"].setdefault("max_iterations", 50)
+        self.__data["routing"].setdefault("risers", [])
         self.__data.setdefault("cable", {})
         self.__data["cable"].setdefault("width", 100)
+        self.__data.setdefault("cache", {})
+        self.__data["cache"].setdefault("directory", None)
+        self.__data["cache"].setdefault("max_size_mb", 1024)
+        self.__data.setdefault("server", {})
+        self.__data["server"].setdefault("max_models", 4)
+        self.__data["server"].setdefault("workers", 4)
 
     def __bind_fields(self):
         self.__step = float(self.__data["grid"]["cell_size"])
@@ -49,10 +121,54 @@ class Config:
         self.__orientation = self.__data["grid"]["orientation"]
         if self.__orientation not in ("xyz", "xy", "xz", "yz"):
             raise ValueError(f"Config error: grid.orientation must be one of xyz/xy/xz/yz, got '{self.orientation}'")
+        self.__mask = self.__data["grid"]["mask"]
+        if self.__mask not in ("dense", "slab", "tiled"):
+            raise ValueError(f"Config error: grid.mask must be one of dense/slab/tiled, got '{self.mask}'")
+        self.__tile_size = int(self.__data["grid"]["tile_size"])
+        if self.tile_size < 1:
+            raise ValueError(f"Config error: grid.tile_size must be >= 1, got {self.tile_size}")
+        self.__memory_mb = float(self.__data["grid"]["memory_mb"])
+        if self.memory_mb <= 0:
+            raise ValueError(f"Config error: grid.memory_mb must be > 0, got {self.memory_mb}")
+        self.__tile_dir = self.__data["grid"]["tile_dir"]
+        self.__threads = int(self.__data["grid"]["threads"])
+        if self.threads < 1:
+            raise ValueError(f"Config error: grid.threads must be >= 1, got {self.threads}")
         self.__offset = float(self.__data["routing"]["offset"])
         if self.offset < 0:
             raise ValueError(f"Config error: routing.offset must be >= 0, got {self.offset}")
+        self.__algorithm = self.__data["routing"]["algorithm"]
+        if self.__algorithm not in ("dijkstra", "astar", "jps", "hpa", "visibility", "octree"):
+            raise ValueError(f"Config error: routing.algorithm must be one of dijkstra/astar/jps/hpa/visibility/octree, got '{self.algorithm}'")
+        self.__cluster_size = int(self.__data["routing"]["cluster_size"])
+        if self.cluster_size < 2:
+            raise ValueError(f"Config error: routing.cluster_size must be >= 2, got {self.cluster_size}")
+        self.__capacity = int(self.__data["routing"]["capacity"])
+        if self.capacity < 1:
+            raise ValueError(f"Config error: routing.capacity must be >= 1, got {self.capacity}")
+        self.__max_iterations = int(self.__data["routing"]["max_iterations"])
+        if self.max_iterations < 1:
+            raise ValueError(f"Config error: routing.max_iterations must be >= 1, got {self.max_iterations}")
+        try:
+            self.__risers = [(float(x), float(y)) for x, y in self.__data["routing"]["risers"]]
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"Config error: routing.risers must be a list of [x, y] points, got {self.__data['routing']['risers']!r}"
+            )
         self.__width = float(self.__data["cable"]["width"])
         if self.width <= 0:
             raise ValueError(f"Config error: cable.width must be > 0, got {self.width}")
+        self.__cache_dir = self.__data["cache"]["directory"]
+        if self.__cache_dir is not None:
+            self.__cache_dir = str(self.__cache_dir)
+        max_size_mb = float(self.__data["cache"]["max_size_mb"])
+        if max_size_mb <= 0:
+            raise ValueError(f"Config error: cache.max_size_mb must be > 0, got {max_size_mb}")
+        self.__cache_size = int(max_size_mb * 1024 * 1024)
+        self.__max_models = int(self.__data["server"]["max_models"])
+        if self.max_models < 1:
+            raise ValueError(f"Config error: server.max_models must be >= 1, got {self.max_models}")
+        self.__workers = int(self.__data["server"]["workers"])
+        if self.workers < 1:
+            raise ValueError(f"Config error: server.workers must be >= 1, got {self.workers}")
 
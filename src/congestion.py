@@ -0,0 +1,121 @@
+from typing import Dict, List, Set, Tuple
+import numpy as np
+from astar import AStar
+from voxels import VoxelSpace
+
+
+class NegotiatedRouter:
+    def __init__(
+        self,
+        space: VoxelSpace,
+        capacity: int = 2,
+        radius: int = 0,
+        max_iterations: int = 50,
+        present_factor: float = 0.5,
+        present_growth: float = 1.5,
+        history_factor: float = 0.2,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError(f"Capacity must be >= 1, got {capacity}")
+        if max_iterations < 1:
+            raise ValueError(f"Number of iterations must be >= 1, got {max_iterations}")
+        self.__space: VoxelSpace = space
+        self.__capacity: int = capacity
+        self.__radius: int = radius
+        self.__max_iterations: int = max_iterations
+        self.__present_factor: float = present_factor
+        self.__present_growth: float = present_growth
+        self.__history_factor: float = history_factor
+        self.__crowd: Dict[int, int] = {}
+        self.__history: Dict[int, float] = {}
+        self.__penalty: Dict[int, float] = {}
+        self.__factor: float = present_factor
+        self.__iterations: int = 0
+        self.__expanded: int = 0
+        self.__congested: List[int] = []
+
+    @property
+    def iterations(self) -> int:
+        return self.__iterations
+
+    @property
+    def expanded(self) -> int:
+        return self.__expanded
+
+    @property
+    def congested(self) -> List[int]:
+        return self.__congested
+
+    def __spread(self, states: List[int]) -> Set[int]:
+        if self.__radius == 0:
+            return set(states)
+        coords = np.array([self.__space.coords(state) for state in states])
+        shape = np.array(self.__space.shape)
+        reach = [
+            np.arange(-self.__radius, self.__radius + 1) if n > 1 else np.zeros(1, dtype=int)
+            for n in shape
+        ]
+        offsets = np.stack(np.meshgrid(*reach, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = (coords[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+        cells = cells[np.all((cells >= 0) & (cells < shape), axis=1)]
+        sx, sy, sz = self.__space.strides
+        return set((cells[:, 0] * sx + cells[:, 1] * sy + (cells[:, 2] + 1) * sz).tolist())
+
+    def __claim(self, cells: Set[int], delta: int) -> None:
+        crowd = self.__crowd
+        for cell in cells:
+            crowd[cell] = crowd.get(cell, 0) + delta
+            self.__reprice(cell)
+
+    def __reprice(self, cell: int) -> None:
+        present = self.__crowd.get(cell, 0) + 1 - self.__capacity
+        cost = (1 + self.__history.get(cell, 0.0)) * (1 + self.__factor * max(present, 0)) - 1
+        if cost > 0:
+            self.__penalty[cell] = cost
+        else:
+            self.__penalty.pop(cell, None)
+
+    def route(self, nets: List[Tuple[int, int]]) -> List[List[int] | None]:
+        self.__crowd = {}
+        self.__history = {}
+        self.__penalty = {}
+        self.__factor = self.__present_factor
+        self.__expanded = 0
+        engine = AStar(self.__space)
+        exempt = self.__spread([state for net in nets for state in net])
+        paths: List[List[int] | None] = [None] * len(nets)
+        reserved: List[Set[int]] = [set() for _ in nets]
+        pending = list(range(len(nets)))
+
+        for iteration in range(1, self.__max_iterations + 1):
+            self.__iterations = iteration
+            for i in pending:
+                self.__claim(reserved[i], -1)
+                reserved[i] = set()
+                try:
+                    paths[i] = engine.search(*nets[i], penalty=self.__penalty)
+                except ValueError:
+                    paths[i] = None
+                    continue
+                finally:
+                    self.__expanded += engine.expanded
+                reserved[i] = self.__spread(paths[i]) - exempt
+                self.__claim(reserved[i], 1)
+
+            pending = [
+                i for i, path in enumerate(paths)
+                if path is not None and any(self.__crowd.get(state, 0) > self.__capacity for state in path)
+            ]
+            if not pending:
+                break
+            for cell, count in self.__crowd.items():
+                if count > self.__capacity:
+                    self.__history[cell] = (
+                        self.__history.get(cell, 0.0) + self.__history_factor * (count - self.__capacity)
+                    )
+            self.__factor *= self.__present_growth
+            for cell in set(self.__history).union(self.__penalty):
+                self.__reprice(cell)
+
+        self.__congested = pending
+        return paths
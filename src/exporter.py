@@ -0,0 +1,94 @@
+from pathlib import Path
+from typing import Any, Dict, List
+import csv
+import json
+import numpy as np
+from cablegeometry import CableGeometry
+
+
+class RouteExporter:
+    FORMATS = (".json", ".csv", ".ply", ".gltf", ".glb")
+    CSV_FIELDS = ("route", "vertex", "x", "y", "z", "length", "bends", "error")
+
+    def __init__(self, width: float, height: float = 5.0) -> None:
+        self.__width: float = width
+        self.__height: float = height
+
+    @staticmethod
+    def check(output_path: str | Path) -> str:
+        suffix = Path(output_path).suffix.lower()
+        if suffix not in RouteExporter.FORMATS:
+            raise ValueError(
+                f"Unsupported output format '{suffix}', expected one of {'/'.join(RouteExporter.FORMATS)}"
+            )
+        return suffix
+
+    @staticmethod
+    def bends(path_points: np.ndarray) -> int:
+        return max(CableGeometry.runs(path_points).shape[0] - 2, 0)
+
+    def describe(self, path_points: np.ndarray) -> Dict[str, Any]:
+        points = np.asarray(path_points, dtype=float)
+        boxes = CableGeometry.generate_cable_boxes(points, self.__width, self.__height)
+        return {
+            "path": points.tolist(),
+            "length": float(np.abs(np.diff(points, axis=0)).sum()),
+            "bends": self.bends(points),
+            "boxes": [
+                {"center": center, "size": size}
+                for center, size in zip(boxes["center"].tolist(), boxes["size"].tolist())
+            ],
+        }
+
+    def write(self, results: List[Dict[str, Any]], output_path: str | Path) -> None:
+        suffix = self.check(output_path)
+        routes = [
+            {**result, **self.describe(result["path"])} if "path" in result else result
+            for result in results
+        ]
+        if suffix == ".json":
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(routes, f, ensure_ascii=False)
+        elif suffix == ".csv":
+            self.__write_csv(routes, output_path)
+        else:
+            self.__write_mesh(routes, output_path, suffix)
+
+    def __write_csv(self, routes: List[Dict[str, Any]], output_path: str | Path) -> None:
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_FIELDS)
+            for i, route in enumerate(routes):
+                if "path" not in route:
+                    writer.writerow([i, "", "", "", "", "", "", route.get("error", "")])
+                    continue
+                for vertex, (x, y, z) in enumerate(route["path"]):
+                    writer.writerow([i, vertex, x, y, z, route["length"], route["bends"], ""])
+
+    def __write_mesh(self, routes: List[Dict[str, Any]], output_path: str | Path, suffix: str) -> None:
+        import trimesh
+
+        meshes = {}
+        for i, route in enumerate(routes):
+            if not route.get("boxes"):
+                continue
+            centers = [box["center"] for box in route["boxes"]]
+            sizes = [box["size"] for box in route["boxes"]]
+            points, sides = CableGeometry.box_mesh(centers, sizes)
+            faces = sides[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3)
+            meshes[f"route-{i}"] = trimesh.Trimesh(points, faces, process=False)
+        if not meshes:
+            raise ValueError("No routed cables to export")
+
+        if suffix == ".ply":
+            data = trimesh.util.concatenate(list(meshes.values())).export(file_type="ply")
+        else:
+            scene = trimesh.Scene()
+            for name, mesh in meshes.items():
+                scene.add_geometry(mesh, geom_name=name)
+            if suffix == ".glb":
+                data = scene.export(file_type="glb")
+            else:
+                data = scene.export(file_type="gltf", embed_buffers=True)["model.gltf"]
+        with open(output_path, "wb") as f:
+            f.write(data)
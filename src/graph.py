@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Tuple
+import numpy as np
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+
+class GraphBuilder:
+    @staticmethod
+    def index(free_mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        free_idx: np.ndarray = np.argwhere(free_mask)
+        node_index: np.ndarray = np.full(free_mask.shape, -1, dtype=np.int32)
+        node_index[free_mask] = np.arange(free_idx.shape[0], dtype=np.int32)
+
+        return free_idx, node_index
+
+    @staticmethod
+    def lookup(free_idx: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        node_index: np.ndarray = np.full(shape, -1, dtype=np.int32)
+        node_index[tuple(free_idx.T)] = np.arange(free_idx.shape[0], dtype=np.int32)
+
+        return node_index
+
+    @staticmethod
+    def keys(free_idx: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+        return np.ravel_multi_index(tuple(free_idx.T), shape).astype(np.int64)
+
+    @staticmethod
+    def find(keys: np.ndarray, key: int) -> int:
+        pos = int(np.searchsorted(keys, key))
+        if pos < keys.shape[0] and keys[pos] == key:
+            return pos
+        return -1
+
+    @staticmethod
+    def sparse_adjacency(
+        free_idx: np.ndarray, shape: Tuple[int, ...], axes: Tuple[int, ...] | None = None
+    ) -> csr_matrix:
+        from scipy.sparse import csr_matrix
+
+        n_nodes: int = free_idx.shape[0]
+        keys = GraphBuilder.keys(free_idx, shape)
+        strides = np.cumprod((1,) + tuple(shape[:0:-1]))[::-1]
+        rows = []
+        cols = []
+
+        for axis in range(len(shape)) if axes is None else axes:
+            src = np.flatnonzero(free_idx[:, axis] + 1 < shape[axis])
+            pos = np.searchsorted(keys, keys[src] + strides[axis])
+            pos[pos == n_nodes] = 0
+            linked = keys[pos] == keys[src] + strides[axis]
+            src = src[linked]
+            dst = pos[linked]
+            rows.extend((src, dst))
+            cols.extend((dst, src))
+
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.intp)
+        data = np.ones(rows.shape[0], dtype=np.float32)
+
+        return csr_matrix((data, (rows, cols)), shape=(n_nodes, n_nodes))
+
+    @staticmethod
+    def adjacency(node_index: np.ndarray, axes: Tuple[int, ...] | None = None) -> csr_matrix:
+        from scipy.sparse import csr_matrix
+
+        n_nodes: int = int(node_index.max(initial=-1)) + 1
+        rows = []
+        cols = []
+
+        for axis in range(node_index.ndim) if axes is None else axes:
+            lower = [slice(None)] * node_index.ndim
+            upper = [slice(None)] * node_index.ndim
+            lower[axis] = slice(None, -1)
+            upper[axis] = slice(1, None)
+            src = node_index[tuple(lower)]
+            dst = node_index[tuple(upper)]
+            linked = (src >= 0) & (dst >= 0)
+            src = src[linked]
+            dst = dst[linked]
+            rows.extend((src, dst))
+            cols.extend((dst, src))
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        data = np.ones(rows.shape[0], dtype=np.float32)
+
+        return csr_matrix((data, (rows, cols)), shape=(n_nodes, n_nodes))
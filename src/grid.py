@@ -1,42 +1,133 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, List, Tuple
+import threading
 import numpy as np
-from shapely.geometry import Polygon
-from shapely.ops import unary_union
-from shapely import contains_xy
-from scipy.ndimage import binary_erosion
-from typing import Tuple
 from building_model import BuildingModel
 from config import Config
+from profiler import Profiler
+from raster import Rasterizer
+from slab_mask import SlabMask
+from tiled_mask import TiledMask
 
 
 class Grid:
-    def __init__(self, building_model: BuildingModel, config: Config) -> None:
+    AXES = {"xyz": (0, 1, 2), "xy": (0, 1), "xz": (0, 2), "yz": (1, 2)}
+    MASKS = ("dense", "slab", "tiled")
+    MIN_BUILD_TILE = 128
+    BLOCK_CELLS = 1 << 19
+
+    def __init__(
+        self,
+        building_model: BuildingModel,
+        config: Config,
+        ceiling_mask: np.ndarray | None = None,
+        obstacle_mask: np.ndarray | None = None,
+    ) -> None:
         self.__building = building_model
+        self.__obstacles: List[object] = list(building_model.obstacles)
         self.__step: float = config.step
         self.__offset: float = config.offset
         self.__width: int = int(config.width // (2 * self.__step))
+        self.__orientation: str = config.orientation
+        if self.__orientation not in self.AXES:
+            raise ValueError(
+                f"Grid orientation must be one of {'/'.join(self.AXES)}, got '{self.__orientation}'"
+            )
         min_xy, max_xy = self.__building.get_bounds_xy()
         min_z, max_z = self.__building.get_bounds_z(self.__offset)
         self.__grid_min: np.ndarray = np.array([*min_xy, min_z], dtype=float)
         self.__nx: int = int((max_xy[0] - min_xy[0]) // self.__step)
         self.__ny: int = int((max_xy[1] - min_xy[1]) // self.__step)
         self.__nz: int = int((max_z - min_z) // self.__step)
+        if self.__orientation == "xy":
+            self.__grid_min[2] += self.__nz * self.__step
+            self.__nz = 0
         self.__shape: Tuple[int, int, int] = (self.__nx + 1, self.__ny + 1, self.__nz + 1)
-        self.__ceiling_mask: np.ndarray = self.__build_ceiling_mask()
-        self.__obstacle_mask: np.ndarray = np.ones(self.__shape, dtype=np.uint8)
+        Profiler.active().record("grid_shape", list(self.__shape))
+        if ceiling_mask is not None and ceiling_mask.shape != self.__shape[:2]:
+            raise ValueError(
+                f"Ceiling mask shape {ceiling_mask.shape} does not match grid shape {self.__shape[:2]}"
+            )
+        if obstacle_mask is not None and obstacle_mask.shape != self.__shape:
+            raise ValueError(
+                f"Obstacle mask shape {obstacle_mask.shape} does not match grid shape {self.__shape}"
+            )
+        self.__mask_kind: str = config.mask
+        if self.__mask_kind not in self.MASKS:
+            raise ValueError(
+                f"Grid mask must be one of {'/'.join(self.MASKS)}, got '{self.__mask_kind}'"
+            )
+        self.__threads: int = config.threads
+        if self.__threads < 1:
+            raise ValueError(f"Grid threads must be >= 1, got {self.__threads}")
+        self.__tile: int = config.tile_size
+        self.__marks: set = set()
+        self.__ceiling_mask: np.ndarray | None = ceiling_mask
+        if ceiling_mask is None and self.__mask_kind != "tiled":
+            self.__ceiling_mask = self.__build_ceiling_mask()
+        if obstacle_mask is None and self.__mask_kind == "tiled":
+            obstacle_mask = TiledMask(
+                self.__shape, self.__tile, self.__build_tile,
+                memory=config.memory_mb * 1024 * 1024, directory=config.tile_dir,
+            )
+        elif obstacle_mask is None:
+            obstacle_mask = (
+                SlabMask(self.__shape) if self.__mask_kind == "slab"
+                else np.ones(self.__shape, dtype=np.uint8)
+            )
+        elif self.__mask_kind == "slab" and not hasattr(obstacle_mask, "free_indices"):
+            obstacle_mask = SlabMask.from_dense(obstacle_mask)
+        self.__obstacle_mask: np.ndarray | SlabMask = obstacle_mask
+        self.__write_lock: ContextManager = nullcontext()
 
     @property
-    def obstacle_mask(self) -> np.ndarray:
+    def obstacle_mask(self) -> np.ndarray | SlabMask:
         return self.__obstacle_mask
 
+    @property
+    def obstacles(self) -> List[object]:
+        return self.__obstacles
+
     @property
     def grid_min(self) -> np.ndarray:
         return self.__grid_min
 
+    @property
+    def ceiling_mask(self) -> np.ndarray:
+        if self.__ceiling_mask is None:
+            return self.__ceiling(slice(0, self.__nx + 1), slice(0, self.__ny + 1))
+        return self.__ceiling_mask
+
+    @property
+    def orientation(self) -> str:
+        return self.__orientation
+
+    @property
+    def mask_kind(self) -> str:
+        return self.__mask_kind
+
+    @property
+    def axes(self) -> Tuple[int, ...]:
+        return self.AXES[self.__orientation]
+
     @property
     def step(self) -> float:
         return self.__step
 
+    @property
+    def offset(self) -> float:
+        return self.__offset
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def threads(self) -> int:
+        return self.__threads
+
     @property
     def nz(self) -> int:
         return self.__nz
@@ -50,36 +141,70 @@ class Grid:
         return self.__ny
 
     def __build_ceiling_mask(self) -> np.ndarray:
-        polygons = []
-        for face in self.__building.ceiling.faces:
-            poly = Polygon(self.__building.ceiling.vertices[face, :2])
-            if poly.is_valid and poly.area > 0:
-                polygons.append(poly)
-        merged = unary_union(polygons)
-
-        xx, yy = np.meshgrid(
-            self.__grid_min[0] + np.arange(self.__nx + 1) * self.__step,
-            self.__grid_min[1] + np.arange(self.__ny + 1) * self.__step,
-            indexing="ij",
-        )
+        with Profiler.active().stage("ceiling_mask"):
+            if self.__threads == 1:
+                return self.__ceiling(slice(0, self.__nx + 1), slice(0, self.__ny + 1))
+            inside = np.empty(self.__shape[:2], dtype=bool)
 
-        inside = np.zeros(xx.shape, dtype=bool)
-        if merged.geom_type == "Polygon":
-            inside = contains_xy(merged, xx, yy)
-        elif merged.geom_type == "MultiPolygon":
-            for poly in merged.geoms:
-                inside |= contains_xy(poly, xx, yy)
-        inside = binary_erosion(
-            inside,
-            structure=np.ones((2 * self.__width + 1, 2 * self.__width + 1)),
-        )
+            def build(xs: slice, ys: slice) -> None:
+                inside[xs, ys] = self.__ceiling(xs, ys)
+
+            self.__in_tiles(build)
 
         return inside
 
-    def mark_ceiling(self) -> None:
-        self.__obstacle_mask[:, :, self.__nz] = np.where(
-            self.__ceiling_mask, 0, self.__obstacle_mask[:, :, self.__nz]
+    def __in_tiles(self, work: Callable[[slice, slice], Any]) -> None:
+        t = max(self.__tile, self.MIN_BUILD_TILE)
+        tiles = [
+            (slice(x, min(x + t, self.__nx + 1)), slice(y, min(y + t, self.__ny + 1)))
+            for x in range(0, self.__nx + 1, t)
+            for y in range(0, self.__ny + 1, t)
+        ]
+        Profiler.active().record("build_tiles", len(tiles))
+        if self.__mask_kind != "dense":
+            self.__write_lock = threading.Lock()
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.__threads, len(tiles))) as executor:
+                for _ in executor.map(lambda tile: work(*tile), tiles):
+                    pass
+        finally:
+            self.__write_lock = nullcontext()
+
+    def __ceiling(self, xs: slice, ys: slice) -> np.ndarray:
+        from scipy.ndimage import binary_erosion
+
+        if self.__ceiling_mask is not None:
+            return self.__ceiling_mask[xs, ys]
+        w = self.__width
+        hx0, hx1 = max(xs.start - w, 0), min(xs.stop + w, self.__nx + 1)
+        hy0, hy1 = max(ys.start - w, 0), min(ys.stop + w, self.__ny + 1)
+        tris = Rasterizer.triangles(self.__building.ceiling.vertices, self.__building.ceiling.faces)
+        inside = Rasterizer.fill(
+            tris,
+            self.__grid_min[0] + np.arange(hx0, hx1) * self.__step,
+            self.__grid_min[1] + np.arange(hy0, hy1) * self.__step,
         )
+        inside = binary_erosion(inside, structure=np.ones((2 * w + 1, 2 * w + 1)))
+
+        return inside[xs.start - hx0:xs.stop - hx0, ys.start - hy0:ys.stop - hy0]
+
+    def __build_tile(self, xs: slice, ys: slice) -> None:
+        Profiler.active().count("tiles_built")
+        self.__obstacle_mask[xs, ys, :] = 1
+        if "ceiling" in self.__marks:
+            self.__obstacle_mask[xs, ys, self.__nz] = np.where(self.__ceiling(xs, ys), 0, 1)
+        if "obstacles" in self.__marks:
+            self.__mark_window(xs.start, xs.stop, ys.start, ys.stop)
+
+    def mark_ceiling(self) -> None:
+        if isinstance(self.__obstacle_mask, TiledMask):
+            self.__marks.add("ceiling")
+            self.__obstacle_mask.clear()
+            return
+        with Profiler.active().stage("mark_ceiling"):
+            self.__obstacle_mask[:, :, self.__nz] = np.where(
+                self.__ceiling_mask, 0, self.__obstacle_mask[:, :, self.__nz]
+            )
 
     def obstacle_bbox_indices(
         self, obs: object, off: int
@@ -106,32 +231,189 @@ class Grid:
 
         return xmin_c, ymin_c, zmin_c, xmax_c, ymax_c
 
+    def __obstacle_shapes(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.__obstacles:
+            return np.empty((0, 3, 3)), np.empty((0, 2, 3))
+        vertices = [np.asarray(obs.vertices, dtype=float) for obs in self.__obstacles]
+        faces = [getattr(obs, "faces", None) for obs in self.__obstacles]
+        faces = [np.empty((0, 3), dtype=int) if f is None else np.asarray(f).reshape(-1, 3) for f in faces]
+        counts = np.array([v.shape[0] for v in vertices])
+        starts = np.cumsum(counts) - counts
+        vertices = np.concatenate(vertices)
+        lo, hi = np.minimum.reduceat(vertices, starts), np.maximum.reduceat(vertices, starts)
+        owner = np.repeat(np.arange(counts.shape[0]), counts)
+        corner = np.logical_and.reduceat(((vertices == lo[owner]) | (vertices == hi[owner])).all(axis=1), starts)
+
+        sizes = np.array([f.shape[0] for f in faces])
+        owner = np.repeat(np.arange(sizes.shape[0]), sizes)
+        tris = vertices[np.concatenate(faces).astype(int) + starts[owner, None]]
+        e1, e2 = tris[:, 1, :2] - tris[:, 0, :2], tris[:, 2, :2] - tris[:, 0, :2]
+        area = np.abs(e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]) / 2
+        floor = np.bincount(owner, area * (tris[:, :, 2] == lo[owner, 2, None]).all(axis=1), sizes.shape[0])
+        footprint = (hi[:, 0] - lo[:, 0]) * (hi[:, 1] - lo[:, 1])
+        box = (sizes == 0) | (corner & (footprint > 0) & np.isclose(floor, footprint))
+
+        return tris[~box[owner]], np.stack((lo, hi), axis=1)[box]
+
     def mark_obstacles(self) -> None:
-        off = int(self.__offset // self.__step)
+        if isinstance(self.__obstacle_mask, TiledMask):
+            self.__marks.add("obstacles")
+            self.__obstacle_mask.clear()
+            return
+        with Profiler.active().stage("mark_obstacles"):
+            if self.__threads == 1:
+                self.__mark_window(0, self.__nx + 1, 0, self.__ny + 1)
+            else:
+                shapes = self.__obstacle_shapes()
+                self.__in_tiles(lambda xs, ys: self.__mark_window(xs.start, xs.stop, ys.start, ys.stop, shapes))
+
+    def add_obstacle(self, obstacle: object) -> Tuple[slice, slice]:
+        self.__obstacles.append(obstacle)
+        return self.__refresh(self.__footprint(obstacle))
 
-        for obs in self.__building.obstacles:
-            xmin, ymin, zmin, xmax, ymax = self.obstacle_bbox_indices(obs, off)
-            xmin_c, ymin_c, zmin_c, xmax_c, ymax_c = self.clip_bbox(
-                xmin, ymin, zmin, xmax, ymax
+    def remove_obstacle(self, obstacle: object) -> Tuple[slice, slice]:
+        position = next((i for i, obs in enumerate(self.__obstacles) if obs is obstacle), None)
+        if position is None:
+            raise ValueError("Obstacle is not part of the grid")
+        self.__obstacles.pop(position)
+        return self.__refresh(self.__footprint(obstacle))
+
+    def move_obstacle(self, obstacle: object, offset: np.ndarray) -> Tuple[slice, slice]:
+        if not any(obs is obstacle for obs in self.__obstacles):
+            raise ValueError("Obstacle is not part of the grid")
+        before = self.__footprint(obstacle)
+        obstacle.vertices = np.asarray(obstacle.vertices, dtype=float) + np.asarray(offset, dtype=float)
+        after = self.__footprint(obstacle)
+        return self.__refresh(tuple(map(self.__union, before, after)))
+
+    @staticmethod
+    def __union(a: slice, b: slice) -> slice:
+        if a.start >= a.stop:
+            return b
+        if b.start >= b.stop:
+            return a
+        return slice(min(a.start, b.start), max(a.stop, b.stop))
+
+    def __footprint(self, obstacle: object) -> Tuple[slice, slice]:
+        reach = int(self.__offset // self.__step) + self.__width + 1
+        vertices = np.asarray(obstacle.vertices, dtype=float)[:, :2]
+        idxs = np.floor((vertices - self.__grid_min[:2]) // self.__step).astype(int)
+        lo = np.maximum(idxs.min(axis=0) - reach, 0)
+        hi = np.minimum(idxs.max(axis=0) + reach + 1, (self.__nx + 1, self.__ny + 1))
+        hi = np.maximum(hi, lo)
+
+        return slice(int(lo[0]), int(hi[0])), slice(int(lo[1]), int(hi[1]))
+
+    def __refresh(self, region: Tuple[slice, slice]) -> Tuple[slice, slice]:
+        xs, ys = region
+        if xs.start >= xs.stop or ys.start >= ys.stop:
+            return region
+        self.__obstacle_mask[xs, ys, :] = 1
+        self.__obstacle_mask[xs, ys, self.__nz] = np.where(self.__ceiling(xs, ys), 0, 1)
+        self.__mark_window(xs.start, xs.stop, ys.start, ys.stop)
+
+        return region
+
+    def __mark_window(
+        self, x0: int, x1: int, y0: int, y1: int, shapes: Tuple[np.ndarray, np.ndarray] | None = None
+    ) -> None:
+        off = int(self.__offset // self.__step)
+        hx0, hx1 = max(x0 - 1, 0), min(x1 + 1, self.__nx + 1)
+        hy0, hy1 = max(y0 - 1, 0), min(y1 + 1, self.__ny + 1)
+        tris, boxes = self.__obstacle_shapes() if shapes is None else shapes
+        levels = boxes.copy()
+        levels[:, 0, 2] = self.__levels(boxes[:, 0, 2], off)
+        bottom = Rasterizer.bottoms(
+            np.empty((0, 3, 3)), self.__grid_min, self.__step, self.__shape[:2],
+            window=(hx0, hy0, hx1, hy1), boxes=levels, grow=off + self.__width,
+        )
+        if tris.shape[0] > 0:
+            heights = Rasterizer.bottoms(
+                tris, self.__grid_min, self.__step, self.__shape[:2],
+                window=(hx0, hy0, hx1, hy1), grow=off + self.__width,
             )
+            hit = np.isfinite(heights)
+            bottom[hit] = np.minimum(bottom[hit], self.__levels(heights[hit], off))
+        inside = np.isfinite(bottom)
+        if not inside.any():
+            return
+        rows = np.flatnonzero(inside.any(axis=1)) + hx0
+        cols = np.flatnonzero(inside.any(axis=0)) + hy0
+        cx0, cx1 = max(rows[0] - 1, hx0), min(rows[-1] + 2, hx1)
+        cy0, cy1 = max(cols[0] - 1, hy0), min(cols[-1] + 2, hy1)
+        crop = (slice(cx0 - hx0, cx1 - hx0), slice(cy0 - hy0, cy1 - hy0))
+        bottom, inside = bottom[crop], inside[crop]
+
+        level = np.min_scalar_type(-(self.__nz + 3))
+        below = np.iinfo(level).min
+        bottom[~inside] = below
+        cells = bottom.astype(level)
+        lifted = np.pad(cells, 1, mode="constant", constant_values=below)
+        present = np.pad(inside, 1, mode="constant", constant_values=False)
+        ix, iy = np.arange(cx0, cx1), np.arange(cy0, cy1)
+        sides = (
+            ((slice(None, -2), slice(1, -1)), (ix == 0, slice(None)), (ix < off, slice(None))),
+            ((slice(2, None), slice(1, -1)), (ix == self.__nx, slice(None)), (ix > self.__nx - off, slice(None))),
+            ((slice(1, -1), slice(None, -2)), (slice(None), iy == 0), (slice(None), iy < off)),
+            ((slice(1, -1), slice(2, None)), (slice(None), iy == self.__ny), (slice(None), iy > self.__ny - off)),
+        )
+        wall = np.zeros(cells.shape, dtype=bool)
+        edge = np.zeros(cells.shape, dtype=bool)
+        top = cells.copy()
+        for side, beyond, cramped in sides:
+            outside = ~present[side]
+            outside[beyond] = False
+            edge[beyond] = True
+            edge |= outside
+            outside[cramped] = False
+            wall |= outside
+            np.maximum(top, lifted[side], out=top)
+        wall &= inside
+        edge &= inside & ~wall
+        np.copyto(top, cells, where=edge)
+        np.copyto(top, self.__nz, where=wall)
+        interior = inside & ~wall & ~edge
+
+        wx0, wx1 = max(x0, cx0), min(x1, cx1)
+        wy0, wy1 = max(y0, cy0), min(y1, cy1)
+        if wx0 >= wx1 or wy0 >= wy1:
+            return
+        window = (slice(wx0 - cx0, wx1 - cx0), slice(wy0 - cy0, wy1 - cy0))
+        self.__mark_region(
+            (slice(wx0, wx1), slice(wy0, wy1)), cells[window], top[window], inside[window], interior[window]
+        )
 
-            if xmin - off >= 0:
-                self.__obstacle_mask[xmin_c, ymin_c:ymax_c + 1, zmin:self.__nz + 1] = 0
-            if xmax + off <= self.__nx:
-                self.__obstacle_mask[xmax_c, ymin_c:ymax_c + 1, zmin:self.__nz + 1] = 0
-            if ymin - off >= 0:
-                self.__obstacle_mask[xmin_c:xmax_c + 1, ymin_c, zmin:self.__nz + 1] = 0
-            if ymax + off <= self.__ny:
-                self.__obstacle_mask[xmin_c:xmax_c + 1, ymax_c, zmin:self.__nz + 1] = 0
+    def __levels(self, z: np.ndarray, off: int) -> np.ndarray:
+        cells = np.floor((z - self.__grid_min[2]) // self.__step) - off
 
-            self.__obstacle_mask[xmin_c:xmax_c + 1, ymin_c:ymax_c + 1, zmin] = 0
+        return np.clip(cells, -1, self.__nz + 1)
 
-        for obs in self.__building.obstacles:
-            xmin, ymin, zmin, xmax, ymax = self.clip_bbox(
-                *self.obstacle_bbox_indices(obs, off)
+    def __mark_region(
+        self, region: Tuple[slice, slice], cells: np.ndarray, top: np.ndarray,
+        inside: np.ndarray, interior: np.ndarray,
+    ) -> None:
+        xs, ys = region
+        depth = self.__nz + 1 - max(int(cells.min(where=inside, initial=self.__nz)), 0)
+        rows = max(self.BLOCK_CELLS // (cells.shape[1] * depth), 1)
+        for i in range(0, cells.shape[0], rows):
+            part = slice(i, i + rows)
+            used = np.flatnonzero(inside[part].any(axis=0))
+            if used.shape[0] == 0:
+                continue
+            part = (part, slice(used[0], used[-1] + 1))
+            z0 = max(int(cells[part].min(where=inside[part], initial=self.__nz)), 0)
+            z1 = self.__nz
+            if not interior[part].any():
+                z1 = min(int(top[part].max(where=inside[part], initial=0)), self.__nz)
+            z = np.arange(z0, z1 + 1, dtype=cells.dtype)
+            c, t = cells[part][:, :, None], top[part][:, :, None]
+            block_at = (
+                slice(xs.start + i, xs.start + i + c.shape[0]),
+                slice(ys.start + used[0], ys.start + used[-1] + 1),
+                slice(z0, z1 + 1),
             )
-            self.__obstacle_mask[
-                xmin + 1:xmax,
-                ymin + 1:ymax,
-                zmin + 1:self.__nz + 1,
-            ] = 1
+            with self.__write_lock:
+                block = np.asarray(self.__obstacle_mask[block_at])
+                block |= interior[part][:, :, None] & (t < z)
+                block &= ~(inside[part][:, :, None] & (c <= z) & (z <= t))
+                self.__obstacle_mask[block_at] = block
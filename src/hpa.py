@@ -0,0 +1,250 @@
+from heapq import heappop, heappush
+from typing import Dict, List, Tuple
+import numpy as np
+from scipy.ndimage import label
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from graph import GraphBuilder
+
+
+class HierarchicalRouter:
+    def __init__(self, mask: np.ndarray, cluster_size: int = 32) -> None:
+        if cluster_size < 2:
+            raise ValueError(f"Cluster size must be >= 2, got {cluster_size}")
+        self.__free: np.ndarray = np.asarray(mask) == 0
+        self.__size: int = cluster_size
+        self.__counts: Tuple[int, ...] = tuple(
+            -(-n // cluster_size) for n in self.__free.shape
+        )
+        self.__nodes: List[Tuple[int, int, int]] = []
+        self.__node_of: Dict[Tuple[int, int, int], int] = {}
+        self.__cluster_nodes: Dict[int, List[int]] = {}
+        self.__expanded: int = 0
+
+        edges = self.__build_entrances()
+        edges.extend(self.__build_intra_edges())
+        n_nodes = len(self.__nodes)
+        rows, cols, weights = zip(*edges) if edges else ((), (), ())
+        self.__graph: csr_matrix = csr_matrix(
+            (
+                np.concatenate((weights, weights)),
+                (np.concatenate((rows, cols)).astype(int), np.concatenate((cols, rows)).astype(int)),
+            ),
+            shape=(n_nodes, n_nodes),
+        )
+
+    @property
+    def cluster_size(self) -> int:
+        return self.__size
+
+    @property
+    def abstract_nodes(self) -> int:
+        return len(self.__nodes)
+
+    @property
+    def expanded(self) -> int:
+        return self.__expanded
+
+    def __cluster(self, idx: Tuple[int, int, int]) -> int:
+        return int(np.ravel_multi_index(
+            tuple(i // self.__size for i in idx), self.__counts
+        ))
+
+    def __box(self, cluster: int) -> Tuple[slice, ...]:
+        corner = np.unravel_index(cluster, self.__counts)
+        return tuple(
+            slice(c * self.__size, min((c + 1) * self.__size, n))
+            for c, n in zip(corner, self.__free.shape)
+        )
+
+    def __add_node(self, idx: Tuple[int, int, int]) -> int:
+        node = self.__node_of.get(idx)
+        if node is None:
+            node = len(self.__nodes)
+            self.__nodes.append(idx)
+            self.__node_of[idx] = node
+            self.__cluster_nodes.setdefault(self.__cluster(idx), []).append(node)
+        return node
+
+    def __build_entrances(self) -> List[Tuple[int, int, float]]:
+        size = self.__size
+        edges = []
+        for axis in range(3):
+            others = [a for a in range(3) if a != axis]
+            for border in range(1, self.__counts[axis]):
+                plane = border * size
+                both = (
+                    np.take(self.__free, plane - 1, axis=axis)
+                    & np.take(self.__free, plane, axis=axis)
+                )
+                for i in range(0, both.shape[0], size):
+                    for j in range(0, both.shape[1], size):
+                        window = both[i:i + size, j:j + size]
+                        if not window.any():
+                            continue
+                        labels, _ = label(window)
+                        cells = np.argwhere(labels)
+                        order = np.argsort(labels[labels > 0], kind="stable")
+                        counts = np.bincount(labels[labels > 0])[1:]
+                        middles = np.cumsum(counts) - counts + counts // 2
+                        for a, b in cells[order[middles]]:
+                            lower = [0, 0, 0]
+                            lower[others[0]] = i + int(a)
+                            lower[others[1]] = j + int(b)
+                            lower[axis] = plane - 1
+                            upper = list(lower)
+                            upper[axis] = plane
+                            edges.append((
+                                self.__add_node(tuple(lower)),
+                                self.__add_node(tuple(upper)),
+                                1.0,
+                            ))
+
+        return edges
+
+    def __build_intra_edges(self) -> List[Tuple[int, int, float]]:
+        edges = []
+        for cluster, members in self.__cluster_nodes.items():
+            if len(members) < 2:
+                continue
+            box = self.__box(cluster)
+            _, node_index = GraphBuilder.index(self.__free[box])
+            local = self.__local_nodes(node_index, box, members)
+            dist = dijkstra(
+                GraphBuilder.adjacency(node_index),
+                directed=False,
+                indices=local,
+                unweighted=True,
+            )[:, local]
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    if np.isfinite(dist[i, j]):
+                        edges.append((members[i], members[j], float(dist[i, j])))
+
+        return edges
+
+    def __local_nodes(
+        self, node_index: np.ndarray, box: Tuple[slice, ...], members: List[int]
+    ) -> np.ndarray:
+        origin = np.array([s.start for s in box])
+        local = np.array([self.__nodes[m] for m in members]) - origin
+        return node_index[tuple(local.T)]
+
+    def __local_search(
+        self, idx: Tuple[int, int, int], targets: List[Tuple[int, int, int]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        box = self.__box(self.__cluster(idx))
+        origin = np.array([s.start for s in box])
+        free_idx, node_index = GraphBuilder.index(self.__free[box])
+        dist, predecessors = dijkstra(
+            GraphBuilder.adjacency(node_index),
+            directed=False,
+            indices=int(node_index[tuple(np.array(idx) - origin)]),
+            unweighted=True,
+            return_predecessors=True,
+        )
+        local = node_index[tuple((np.array(targets) - origin).T)] if targets else np.array([], dtype=int)
+
+        return dist[local], predecessors, free_idx + origin, local
+
+    def __refine(self, start: Tuple[int, int, int], end: Tuple[int, int, int]) -> List[Tuple[int, int, int]]:
+        if self.__cluster(start) != self.__cluster(end):
+            return [end]
+        _, predecessors, free_idx, local = self.__local_search(start, [end])
+        cur = int(local[0])
+        if predecessors[cur] < 0 and tuple(free_idx[cur]) != start:
+            raise ValueError("Path not found")
+        steps = []
+        while cur >= 0:
+            steps.append(tuple(int(i) for i in free_idx[cur]))
+            cur = predecessors[cur]
+        return steps[::-1][1:]
+
+    def __abstract_search(
+        self,
+        source: Tuple[int, int, int],
+        target: Tuple[int, int, int],
+        source_edges: Dict[int, float],
+        target_edges: Dict[int, float],
+        direct: float,
+    ) -> List[int]:
+        source_node = len(self.__nodes)
+        target_node = source_node + 1
+        indptr, indices, weights = self.__graph.indptr, self.__graph.indices, self.__graph.data
+
+        def heuristic(node: int) -> int:
+            idx = self.__nodes[node] if node < source_node else (source, target)[node - source_node]
+            return sum(abs(a - b) for a, b in zip(idx, target))
+
+        g: Dict[int, float] = {source_node: 0.0}
+        parent: Dict[int, int] = {source_node: -1}
+        closed = set()
+        heap = [(float(heuristic(source_node)), source_node)]
+        self.__expanded = 0
+
+        while heap:
+            _, node = heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            self.__expanded += 1
+            if node == target_node:
+                path = []
+                while node != -1:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+
+            if node == source_node:
+                neighbours = list(source_edges.items())
+                if np.isfinite(direct):
+                    neighbours.append((target_node, direct))
+            else:
+                neighbours = list(zip(
+                    indices[indptr[node]:indptr[node + 1]].tolist(),
+                    weights[indptr[node]:indptr[node + 1]].tolist(),
+                ))
+                if node in target_edges:
+                    neighbours.append((target_node, target_edges[node]))
+
+            for nbr, weight in neighbours:
+                cost = g[node] + weight
+                if nbr in closed or cost >= g.get(nbr, np.inf):
+                    continue
+                g[nbr] = cost
+                parent[nbr] = node
+                heappush(heap, (cost + heuristic(nbr), nbr))
+
+        raise ValueError("Path not found")
+
+    def find_path(
+        self, source_idx: Tuple[int, int, int], target_idx: Tuple[int, int, int]
+    ) -> np.ndarray:
+        source = tuple(int(i) for i in source_idx)
+        target = tuple(int(i) for i in target_idx)
+
+        source_members = self.__cluster_nodes.get(self.__cluster(source), [])
+        same_cluster = self.__cluster(source) == self.__cluster(target)
+        dist, _, _, _ = self.__local_search(
+            source, [self.__nodes[m] for m in source_members] + ([target] if same_cluster else [])
+        )
+        source_edges = {
+            m: float(d) for m, d in zip(source_members, dist) if np.isfinite(d)
+        }
+        direct = float(dist[-1]) if same_cluster else np.inf
+
+        target_members = self.__cluster_nodes.get(self.__cluster(target), [])
+        dist, _, _, _ = self.__local_search(target, [self.__nodes[m] for m in target_members])
+        target_edges = {
+            m: float(d) for m, d in zip(target_members, dist) if np.isfinite(d)
+        }
+
+        abstract = self.__abstract_search(source, target, source_edges, target_edges, direct)
+        waypoints = [source] + [self.__nodes[n] for n in abstract[1:-1]] + [target]
+
+        path = [source]
+        for start, end in zip(waypoints, waypoints[1:]):
+            if start != end:
+                path.extend(self.__refine(start, end))
+
+        return np.array(path)
@@ -0,0 +1,135 @@
+from heapq import heappop, heappush
+from typing import Dict, List, Tuple
+from voxels import VoxelSpace
+
+
+class JumpPointSearch:
+    def __init__(self, space: VoxelSpace) -> None:
+        self.__space: VoxelSpace = space
+        self.__strides: Tuple[int, int, int] = space.strides
+        self.__expanded: int = 0
+        self.__memo: Dict[int, int] = {}
+
+    @property
+    def expanded(self) -> int:
+        return self.__expanded
+
+    def __jump(self, state: int, axis: int, sign: int, target: int) -> int:
+        free = self.__space.free
+        strides = self.__strides
+        memo = self.__memo
+        direction = 2 * axis + (sign > 0)
+        step = sign * strides[axis]
+        visited = [state]
+        cur = state
+
+        while True:
+            known = memo.get(cur * 6 + direction)
+            if known is not None:
+                result = known
+                break
+            prev = cur
+            cur += step
+            if not free(cur):
+                result = -1
+                break
+            if cur == target or self.__is_jump_point(cur, prev, axis, target):
+                result = cur
+                break
+            visited.append(cur)
+
+        for cell in visited:
+            memo[cell * 6 + direction] = result
+        return result
+
+    def __is_jump_point(self, cur: int, prev: int, axis: int, target: int) -> bool:
+        free = self.__space.free
+        strides = self.__strides
+        for higher in range(axis):
+            for offset in (strides[higher], -strides[higher]):
+                if free(cur + offset) and not free(prev + offset):
+                    return True
+        for lower in range(axis + 1, 3):
+            for sign in (1, -1):
+                if free(cur + sign * strides[lower]) and self.__jump(cur, lower, sign, target) >= 0:
+                    return True
+        return False
+
+    def __direction(self, start: int, end: int) -> Tuple[int, int]:
+        delta = [b - a for a, b in zip(self.__space.coords(start), self.__space.coords(end))]
+        axis = next(a for a in range(3) if delta[a] != 0)
+        return axis, 1 if delta[axis] > 0 else -1
+
+    def __directions(self, state: int, parent: int) -> List[Tuple[int, int]]:
+        if parent < 0:
+            return [(axis, sign) for axis in range(3) for sign in (1, -1)]
+
+        free = self.__space.free
+        strides = self.__strides
+        axis, sign = self.__direction(parent, state)
+        prev = state - sign * strides[axis]
+
+        directions = [(axis, sign)]
+        for lower in range(axis + 1, 3):
+            directions.extend(((lower, 1), (lower, -1)))
+        for higher in range(axis):
+            for higher_sign in (1, -1):
+                offset = higher_sign * strides[higher]
+                if free(state + offset) and not free(prev + offset):
+                    directions.append((higher, higher_sign))
+
+        return directions
+
+    def search(self, source: int, target: int) -> List[int]:
+        coords = self.__space.coords
+        tx, ty, tz = coords(target)
+
+        def heuristic(state: int) -> int:
+            x, y, z = coords(state)
+            return abs(x - tx) + abs(y - ty) + abs(z - tz)
+
+        g: Dict[int, int] = {source: 0}
+        parent: Dict[int, int] = {source: -1}
+        closed = set()
+        h0 = heuristic(source)
+        heap = [(h0, h0, source)]
+        self.__expanded = 0
+        self.__memo = {}
+
+        while heap:
+            _, _, state = heappop(heap)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.__expanded += 1
+            if state == target:
+                return self.__unfold(state, parent)
+
+            for axis, sign in self.__directions(state, parent[state]):
+                nbr = self.__jump(state, axis, sign, target)
+                if nbr < 0 or nbr in closed:
+                    continue
+                cost = g[state] + abs(nbr - state) // self.__strides[axis]
+                if cost >= g.get(nbr, cost + 1):
+                    continue
+                g[nbr] = cost
+                parent[nbr] = state
+                h = heuristic(nbr)
+                heappush(heap, (cost + h, h, nbr))
+
+        raise ValueError("Path not found")
+
+    def __unfold(self, state: int, parent: Dict[int, int]) -> List[int]:
+        jump_points = []
+        while state != -1:
+            jump_points.append(state)
+            state = parent[state]
+        jump_points.reverse()
+
+        path = [jump_points[0]]
+        for start, end in zip(jump_points, jump_points[1:]):
+            axis, sign = self.__direction(start, end)
+            step = sign * self.__strides[axis]
+            path.extend(range(start + step, end + step, step))
+
+        return path
@@ -1,11 +1,14 @@
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, TextIO, Tuple
 import json
 import numpy as np
-import trimesh
+from mesh import Mesh
+from profiler import Profiler
 
 
 class Loader:
+    CHUNK_SIZE = 1 << 16
+
     def __init__(self, json_path: Path) -> None:
         if not isinstance(json_path, Path):
             raise TypeError("JSON path must be a str or pathlib.Path object")
@@ -14,15 +17,19 @@ class Loader:
         if not json_path.is_file():
             raise ValueError(f"JSON path is not a file: {json_path}")
         self.__json_path: Path = json_path
-        self.__ceiling: trimesh.Trimesh | None = None
-        self.__obstacles: List[trimesh.Trimesh] = []
+        self.__ceiling: Mesh | None = None
+        self.__obstacles: List[Mesh] = []
+        self.__storeys: List[Tuple[Mesh, List[Mesh]]] = []
+
+    @property
+    def storeys(self) -> List[Tuple[Mesh, List[Mesh]]]:
+        return self.__storeys
 
-    def load(self) -> Tuple[trimesh.Trimesh, List[trimesh.Trimesh]]:
-        objects = self.__read_json()
-        floor_meshes: List[trimesh.Trimesh] = []
-        obstacles: List[trimesh.Trimesh] = []
+    def load(self) -> Tuple[Mesh, List[Mesh]]:
+        floor_meshes: List[Mesh] = []
+        obstacles: List[Mesh] = []
 
-        for obj in objects:
+        for obj in self.__read_json():
             mesh = self.__build_mesh(obj)
             category: str = obj.get("Category", "").lower()
             if "floor" in category:
@@ -30,26 +37,87 @@ class Loader:
             else:
                 obstacles.append(mesh)
 
-        self.__ceiling = self.__get_ceiling_from_floor(floor_meshes)
+        self.__storeys = self.__split_storeys(floor_meshes, obstacles)
+        self.__ceiling = self.__storeys[-1][0]
         self.__obstacles = obstacles
+        profiler = Profiler.active()
+        profiler.record("objects_loaded", len(floor_meshes) + len(obstacles))
+        profiler.record("obstacles", len(obstacles))
+        profiler.record("storeys", len(self.__storeys))
 
         return self.__ceiling, self.__obstacles
 
-    def __read_json(self) -> list:
+    def __read_json(self) -> Iterator[dict]:
         try:
             with open(self.__json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+                yield from self.__iter_objects(f)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format in {self.__json_path}: {e}")
         except OSError as e:
             raise OSError(f"Error reading file {self.__json_path}: {e}")
-        if not isinstance(data, list):
-            raise ValueError(f"JSON root must be a list of objects, got {type(data)}")
 
-        return data
+    def __iter_objects(self, f: TextIO) -> Iterator[dict]:
+        decoder = json.JSONDecoder()
+        buf: str = ""
+        pos: int = 0
+        eof: bool = False
+        chunk_size: int = self.CHUNK_SIZE
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof, chunk_size
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return buf[pos] if pos < len(buf) else ""
+
+        if skip() != "[":
+            rest = buf[pos:] + f.read()
+            data = json.loads(rest)
+            raise ValueError(f"JSON root must be a list of objects, got {type(data)}")
+        pos += 1
+        if skip() == "]":
+            pos += 1
+        else:
+            while True:
+                skip()
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+                    chunk_size *= 2
+                    continue
+                if end == len(buf) and fill():
+                    continue
+                chunk_size = self.CHUNK_SIZE
+                pos = end
+                yield obj
+
+                sep = skip()
+                pos += 1
+                if sep == "]":
+                    break
+                if sep != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
+
+        if skip():
+            raise json.JSONDecodeError("Extra data", buf, pos)
 
     @staticmethod
-    def __build_mesh(obj: dict) -> trimesh.Trimesh:
+    def __build_mesh(obj: dict) -> Mesh:
         if "Coords" not in obj or "Indices" not in obj:
             raise ValueError("Each object must contain 'Coords' and 'Indices' keys")
 
@@ -60,22 +128,49 @@ class Loader:
         if faces.size == 0:
             raise ValueError("Mesh has no faces")
 
-        return trimesh.Trimesh(vertices=coords, faces=faces, process=False)
+        return Mesh(coords, faces)
+
+    @staticmethod
+    def __split_storeys(floor_meshes: List[Mesh], obstacles: List[Mesh]) -> List[Tuple[Mesh, List[Mesh]]]:
+        if not floor_meshes:
+            raise ValueError("No floor meshes provided")
+
+        groups: List[List[Mesh]] = []
+        top: float = -np.inf
+        for mesh in sorted(floor_meshes, key=lambda mesh: float(mesh.vertices[:, 2].min())):
+            z = mesh.vertices[:, 2]
+            if float(z.min()) > top:
+                groups.append([])
+            groups[-1].append(mesh)
+            top = max(top, float(z.max()))
+
+        ceilings = [Loader.__get_ceiling_from_floor(group) for group in groups]
+        levels = [float(ceiling.vertices[:, 2].max()) for ceiling in ceilings]
+        storeys: List[Tuple[Mesh, List[Mesh]]] = []
+        for i, ceiling in enumerate(ceilings):
+            below = levels[i - 1] if i > 0 else -np.inf
+            above = levels[i] if i < len(levels) - 1 else np.inf
+            storeys.append((ceiling, [
+                obs for obs in obstacles
+                if obs.vertices[:, 2].max() > below and obs.vertices[:, 2].min() < above
+            ]))
+
+        return storeys
 
     @staticmethod
-    def __get_ceiling_from_floor(floor_meshes: list[trimesh.Trimesh]) -> trimesh.Trimesh:
+    def __get_ceiling_from_floor(floor_meshes: list[Mesh]) -> Mesh:
         if not floor_meshes:
             raise ValueError("No floor meshes provided")
 
-        combined = trimesh.util.concatenate(floor_meshes)
+        combined = Mesh.concatenate(floor_meshes)
         if combined.vertices.size == 0 or combined.faces.size == 0:
             raise ValueError("Combined floor mesh has no vertices or faces")
 
         z_max: float = float(combined.vertices[:, 2].max())
-        face_mask = [np.allclose(combined.vertices[face][:, 2], z_max) for face in combined.faces]
-        if not any(face_mask):
+        face_mask = np.isclose(combined.vertices[combined.faces][:, :, 2], z_max).all(axis=1)
+        if not face_mask.any():
             raise ValueError("No ceiling faces detected at max Z")
-        ceiling_faces = combined.faces[np.asarray(face_mask)]
+        ceiling_faces = combined.faces[face_mask]
 
-        return trimesh.Trimesh(vertices=combined.vertices, faces=ceiling_faces, process=False)
+        return Mesh(combined.vertices, ceiling_faces)
 
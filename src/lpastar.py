@@ -0,0 +1,111 @@
+from heapq import heappop, heappush
+from typing import Dict, Iterable, List, Tuple
+from voxels import VoxelSpace
+
+
+class LifelongAStar:
+    INF = float("inf")
+
+    def __init__(self, space: VoxelSpace, source: int, target: int) -> None:
+        self.__space: VoxelSpace = space
+        sx, sy, sz = space.strides
+        self.__steps = (sx, -sx, sy, -sy, sz, -sz)
+        self.__source: int = source
+        self.__target: int = target
+        self.__target_coords: Tuple[int, int, int] = space.coords(target)
+        self.__g: Dict[int, float] = {}
+        self.__rhs: Dict[int, float] = {}
+        self.__open: Dict[int, Tuple[float, float]] = {}
+        self.__heap: List[Tuple[Tuple[float, float], int]] = []
+        self.__expanded: int = 0
+        self.__update_vertex(source)
+
+    @property
+    def source(self) -> int:
+        return self.__source
+
+    @property
+    def target(self) -> int:
+        return self.__target
+
+    @property
+    def expanded(self) -> int:
+        return self.__expanded
+
+    def __heuristic(self, state: int) -> int:
+        x, y, z = self.__space.coords(state)
+        tx, ty, tz = self.__target_coords
+        return abs(x - tx) + abs(y - ty) + abs(z - tz)
+
+    def __key(self, state: int) -> Tuple[float, float]:
+        best = min(self.__g.get(state, self.INF), self.__rhs.get(state, self.INF))
+        return best + self.__heuristic(state), best
+
+    def __update_vertex(self, state: int) -> None:
+        free = self.__space.free(state)
+        if state == self.__source:
+            self.__rhs[state] = 0 if free else self.INF
+        elif not free:
+            self.__rhs.pop(state, None)
+        else:
+            g = self.__g
+            best = min(g.get(state + step, self.INF) for step in self.__steps) + 1
+            if best < self.INF:
+                self.__rhs[state] = best
+            else:
+                self.__rhs.pop(state, None)
+
+        if self.__g.get(state, self.INF) != self.__rhs.get(state, self.INF):
+            key = self.__key(state)
+            self.__open[state] = key
+            heappush(self.__heap, (key, state))
+        else:
+            self.__open.pop(state, None)
+
+    def __top(self) -> Tuple[float, float] | None:
+        heap = self.__heap
+        while heap and self.__open.get(heap[0][1]) != heap[0][0]:
+            heappop(heap)
+        return heap[0][0] if heap else None
+
+    def __compute(self) -> None:
+        target = self.__target
+        while True:
+            top = self.__top()
+            if top is None:
+                break
+            if top >= self.__key(target) and self.__rhs.get(target, self.INF) == self.__g.get(target, self.INF):
+                break
+            _, state = heappop(self.__heap)
+            del self.__open[state]
+            self.__expanded += 1
+            rhs = self.__rhs.get(state, self.INF)
+            if self.__g.get(state, self.INF) > rhs:
+                self.__g[state] = rhs
+            else:
+                self.__g.pop(state, None)
+                self.__update_vertex(state)
+            for step in self.__steps:
+                self.__update_vertex(state + step)
+
+    def update(self, states: Iterable[int]) -> None:
+        touched = set()
+        for state in states:
+            touched.add(state)
+            touched.update(state + step for step in self.__steps)
+        for state in touched:
+            self.__update_vertex(state)
+
+    def search(self) -> List[int]:
+        self.__expanded = 0
+        self.__compute()
+        g = self.__g
+        if g.get(self.__target, self.INF) == self.INF:
+            raise ValueError("Path not found")
+
+        path = [self.__target]
+        state = self.__target
+        while state != self.__source:
+            state = min((state + step for step in self.__steps), key=lambda s: g.get(s, self.INF))
+            path.append(state)
+        return path[::-1]
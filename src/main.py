@@ -1,9 +1,18 @@
 import argparse
+import contextlib
+import sys
+from typing import Callable
 import numpy as np
-from building_model import BuildingModel
+from batch import BatchRouter
+from building_model import BuildingModel, Storey
+from cache import GridCache
+from exporter import RouteExporter
 from grid import Grid
+from octree import OctreeRouter
 from pathfinder import PathFinder
-from visualizer import Visualizer
+from profiler import Profiler
+from storeys import StoreyRouter
+from visibility import VisibilityRouter
 from config import Config
 
 
@@ -13,32 +22,154 @@ def __parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--model",
         type=str,
-        required=True,
         help="Path to building JSON model"
     )
     parser.add_argument(
         "--source",
         type=str,
-        required=True,
-        help="Source coordinates: x,y"
+        help="Source coordinates: x,y or x,y,storey"
     )
     parser.add_argument(
         "--target",
         type=str,
-        required=True,
-        help="Target coordinates: x,y"
+        help="Target coordinates: x,y or x,y,storey"
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="Path to a file of endpoint pairs, one 'source_x,source_y,target_x,target_y' per line"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Path to the .json, .csv, .ply, .gltf or .glb file routes are written to instead of opening the viewer"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used in batch mode"
+    )
+    parser.add_argument(
+        "--negotiate",
+        action="store_true",
+        help="Route batch pairs jointly, resolving overlapping cables by rip-up and reroute"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Answer JSON-lines route requests from stdin, keeping built models in memory"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="-",
+        help="Write per-stage wall time, peak memory and counts as JSON to this file, or to stdout if no file is given"
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Trace allocations to report the peak memory of every stage (slows pure Python stages down)"
     )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.serve:
+        return args
+    if args.model is None:
+        parser.error("--model is required unless --serve is given")
+    if args.batch is None and (args.source is None or args.target is None):
+        parser.error("--source and --target are required unless --batch is given")
+    if args.profile_memory and args.profile is None:
+        args.profile = "-"
+    if args.batch is not None and args.output is None:
+        parser.error("--output is required with --batch")
+    if args.output is not None:
+        try:
+            RouteExporter.check(args.output)
+        except ValueError as e:
+            parser.error(str(e))
 
+    return args
 
-def __parse_point(value: str, z: float) -> np.ndarray:
-    x, y = map(float, value.split(","))
-    return np.array([x, y, z], dtype=float)
 
+def __parse_point(value: str, building: BuildingModel) -> np.ndarray:
+    parts = value.split(",")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Point must be 'x,y' or 'x,y,storey', got '{value}'")
+    storey = int(parts[2]) if len(parts) == 3 else None
+    return building.point(float(parts[0]), float(parts[1]), storey)
 
-def main() -> None:
-    args = __parse_args()
+
+def __build_router(model_path: str, building: BuildingModel, config: Config) -> PathFinder | OctreeRouter | VisibilityRouter | StoreyRouter:
+    if len(building.storeys) > 1:
+        return StoreyRouter(
+            building, config.risers, lambda storey: __build_storey(model_path, storey, config, storey.index)
+        )
+    return __build_storey(model_path, building, config)
+
+
+def __build_storey(
+    model_path: str, building: BuildingModel | Storey, config: Config, storey: int | None = None
+) -> PathFinder | OctreeRouter | VisibilityRouter:
+    if config.algorithm == "visibility":
+        return VisibilityRouter(building, config)
+    if config.algorithm == "octree":
+        grid = Grid(building, config)
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        return OctreeRouter(grid)
+
+    options = {"algorithm": config.algorithm, "cluster_size": config.cluster_size}
+    cache = None
+    if config.cache_dir is not None and config.mask != "tiled":
+        cache = GridCache(config.cache_dir, config.cache_size)
+        key = GridCache.key(model_path, config, storey)
+        cached = cache.load(key, building, config, **options)
+        if cached is not None:
+            return cached[1]
+
+    grid = Grid(building, config)
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    pathfinder = PathFinder(grid, **options)
+
+    if cache is not None:
+        try:
+            cache.store(key, grid, pathfinder)
+        except OSError as e:
+            print(f"CACHE ERROR: {e}")
+
+    return pathfinder
+
+
+def __run_batch(args: argparse.Namespace, pathfinder: PathFinder | OctreeRouter | VisibilityRouter | StoreyRouter, config: Config, point: Callable[..., np.ndarray]) -> None:
+    try:
+        pairs = BatchRouter.read_pairs(args.batch)
+        router = BatchRouter(
+            pathfinder, point, args.workers,
+            capacity=config.capacity if args.negotiate else None,
+            max_iterations=config.max_iterations,
+        )
+        results = router.route(pairs)
+    except (FileNotFoundError, TypeError, ValueError) as e:
+        print(f"BATCH ERROR: {e}")
+        return
+
+    try:
+        RouteExporter(config.width).write(results, args.output)
+    except (OSError, ValueError) as e:
+        print(f"EXPORT ERROR: {e}")
+        return
+    routed = sum("path" in result for result in results)
+    print(f"Routed {routed}/{len(results)} pairs, results written to {args.output}")
+    congested = sum(result.get("congested", False) for result in results)
+    if congested:
+        print(f"{congested} routes still exceed the cable capacity of {config.capacity}")
+
+
+def __route(args: argparse.Namespace) -> None:
+    profiler = Profiler.active()
     try:
         config = Config()
     except ValueError as e:
@@ -46,35 +177,88 @@ def main() -> None:
         return
 
     try:
-        building = BuildingModel(args.model)
-    except (ValueError, TypeError, FileNotFoundError) as e:
+        with profiler.stage("load"):
+            building = BuildingModel(args.model)
+    except (ValueError, TypeError, OSError) as e:
         print(f"BUILDING MODEL ERROR: {e}")
         return
 
-    grid = Grid(building, config)
-    grid.mark_ceiling()
-    grid.mark_obstacles()
-
-    max_z: float = float(building.ceiling.vertices[:, 2].max())
+    try:
+        with profiler.stage("grid"):
+            pathfinder = __build_router(args.model, building, config)
+    except (TypeError, ValueError) as e:
+        print(f"PATHFINDER ERROR: {e}")
+        return
 
-    source_point = __parse_point(args.source, max_z)
-    target_point = __parse_point(args.target, max_z)
+    if args.batch is not None:
+        with profiler.stage("batch"):
+            __run_batch(args, pathfinder, config, building.point)
+        return
 
     try:
-        pathfinder = PathFinder(grid)
-        path_points = pathfinder.find_path(source_point, target_point)
+        source_point = __parse_point(args.source, building)
+        target_point = __parse_point(args.target, building)
+        with profiler.stage("route"):
+            path_points = pathfinder.find_path(source_point, target_point)
     except (TypeError, ValueError) as e:
         print(f"PATHFINDER ERROR: {e}")
         return
 
-    visualizer = Visualizer()
-    visualizer.add_ceiling(building.ceiling)
-    visualizer.add_obstacles(building.obstacles)
-    visualizer.add_points([source_point, target_point])
-    visualizer.add_cable(path_points, config.width)
-    visualizer.add_key_events()
+    if args.output is not None:
+        result = {"source": source_point.tolist(), "target": target_point.tolist(), "path": path_points}
+        try:
+            with profiler.stage("export"):
+                RouteExporter(config.width).write([result], args.output)
+        except (OSError, ValueError) as e:
+            print(f"EXPORT ERROR: {e}")
+            return
+        print(f"Route written to {args.output}")
+        return
+
+    from visualizer import Visualizer
+
+    with profiler.stage("render"):
+        visualizer = Visualizer()
+        for storey in building.storeys:
+            visualizer.add_ceiling(storey.ceiling)
+        visualizer.add_obstacles(list({id(obs): obs for storey in building.storeys for obs in storey.obstacles}.values()))
+        visualizer.add_points([source_point, target_point])
+        visualizer.add_cable(path_points, config.width)
+        visualizer.add_key_events()
     visualizer.show()
 
 
+def __serve() -> None:
+    try:
+        config = Config()
+    except (ValueError, OSError) as e:
+        print(f"CONFIG ERROR: {e}")
+        return
+
+    from server import RouteServer
+
+    server = RouteServer(config, __build_router)
+    output = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        server.serve(sys.stdin, output)
+
+
+def main() -> None:
+    args = __parse_args()
+    if args.serve:
+        __serve()
+        return
+    if args.profile is None:
+        __route(args)
+        return
+
+    with Profiler(memory=args.profile_memory) as profiler:
+        __route(args)
+    try:
+        profiler.write(args.profile)
+    except OSError as e:
+        print(f"PROFILE ERROR: {e}")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,46 @@
+from typing import Any, Iterable
+import numpy as np
+
+
+class Mesh:
+    def __init__(self, vertices: np.ndarray, faces: np.ndarray) -> None:
+        self.vertices = vertices
+        self.__faces: np.ndarray = np.asarray(faces, dtype=np.int64).reshape((-1, 3))
+
+    @staticmethod
+    def concatenate(meshes: Iterable["Mesh"]) -> "Mesh":
+        vertices = []
+        faces = []
+        offset = 0
+        for mesh in meshes:
+            vertices.append(mesh.vertices)
+            faces.append(mesh.faces + offset)
+            offset += mesh.vertices.shape[0]
+        if not vertices:
+            return Mesh(np.empty((0, 3)), np.empty((0, 3), dtype=np.int64))
+
+        return Mesh(np.concatenate(vertices), np.concatenate(faces))
+
+    @property
+    def vertices(self) -> np.ndarray:
+        return self.__vertices
+
+    @vertices.setter
+    def vertices(self, vertices: np.ndarray) -> None:
+        self.__vertices: np.ndarray = np.asarray(vertices, dtype=float).reshape((-1, 3))
+
+    @property
+    def faces(self) -> np.ndarray:
+        return self.__faces
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return np.array([self.__vertices.min(axis=0), self.__vertices.max(axis=0)])
+
+    def to_trimesh(self) -> Any:
+        import trimesh
+
+        return trimesh.Trimesh(vertices=self.__vertices, faces=self.__faces, process=False)
+
+    def __repr__(self) -> str:
+        return f"Mesh(vertices={self.__vertices.shape[0]}, faces={self.__faces.shape[0]})"
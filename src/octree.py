@@ -0,0 +1,296 @@
+from heapq import heappop, heappush
+from itertools import permutations
+from typing import Dict, List, Tuple
+import numpy as np
+from grid import Grid
+from profiler import Profiler
+
+
+class OctreeRouter:
+    def __init__(self, grid: Grid) -> None:
+        self.__grid_min: np.ndarray = grid.grid_min
+        self.__step: float = grid.step
+        self.__orientation: str = grid.orientation
+        self.__axes: Tuple[int, ...] = grid.axes
+        self.__fixed: Tuple[int, ...] = tuple(axis for axis in range(3) if axis not in grid.axes)
+        self.__expanded: int = 0
+
+        profiler = Profiler.active()
+        with profiler.stage("octree"):
+            self.__lo, self.__hi = self.__subdivide(np.asarray(grid.obstacle_mask != 0))
+            self.__levels = self.__index()
+            self.__indptr, self.__indices = self.__link()
+        profiler.record("octree_leaves", int(self.__lo.shape[0]))
+        profiler.record("octree_edges", int(self.__indices.shape[0] // 2))
+
+    @property
+    def leaves(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.__lo, self.__hi
+
+    @property
+    def expanded_nodes(self) -> int:
+        return self.__expanded
+
+    def __subdivide(self, blocked: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        any_levels: List[np.ndarray] = [blocked]
+        all_levels: List[np.ndarray] = [blocked]
+        sizes: List[np.ndarray] = [np.ones(3, dtype=np.int64)]
+        while True:
+            any_mask, all_mask = any_levels[-1], all_levels[-1]
+            size = sizes[-1].copy()
+            reduce = [axis for axis in self.__axes if any_mask.shape[axis] > 1]
+            if not reduce:
+                break
+            for axis in reduce:
+                if any_mask.shape[axis] % 2:
+                    pad = [(0, 0)] * 3
+                    pad[axis] = (0, 1)
+                    any_mask = np.pad(any_mask, pad, constant_values=True)
+                    all_mask = np.pad(all_mask, pad, constant_values=True)
+                even = [slice(None)] * 3
+                odd = [slice(None)] * 3
+                even[axis] = slice(0, None, 2)
+                odd[axis] = slice(1, None, 2)
+                any_mask = any_mask[tuple(even)] | any_mask[tuple(odd)]
+                all_mask = all_mask[tuple(even)] & all_mask[tuple(odd)]
+                size[axis] *= 2
+            any_levels.append(any_mask)
+            all_levels.append(all_mask)
+            sizes.append(size)
+
+        lo: List[np.ndarray] = []
+        hi: List[np.ndarray] = []
+        nodes = np.argwhere(np.ones(any_levels[-1].shape, dtype=bool))
+        for level in range(len(any_levels) - 1, -1, -1):
+            index = tuple(nodes.T)
+            occupied = any_levels[level][index]
+            free = nodes[~occupied]
+            lo.append(free * sizes[level])
+            hi.append((free + 1) * sizes[level] - 1)
+            if level == 0:
+                break
+            nodes = nodes[occupied & ~all_levels[level][index]]
+            split = sizes[level] // sizes[level - 1]
+            offsets = np.argwhere(np.ones(split, dtype=bool))
+            nodes = (nodes[:, None, :] * split + offsets[None, :, :]).reshape(-1, 3)
+            nodes = nodes[np.all(nodes < any_levels[level - 1].shape, axis=1)]
+
+        return np.concatenate(lo), np.concatenate(hi)
+
+    def __link(self) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.__lo, self.__hi
+        sizes = hi - lo + 1
+        rows: List[np.ndarray] = []
+        cols: List[np.ndarray] = []
+        for size, dims, keys, ids in self.__levels:
+            small = np.flatnonzero(np.all(sizes <= size, axis=1))
+            for axis in self.__axes:
+                for face in (hi[small, axis] + 1, lo[small, axis] - 1):
+                    point = lo[small].copy()
+                    point[:, axis] = face
+                    cell = point // size
+                    valid = np.all((point >= 0) & (cell < dims), axis=1)
+                    wanted = np.ravel_multi_index(tuple(cell[valid].T), tuple(dims))
+                    pos = np.minimum(np.searchsorted(keys, wanted), keys.shape[0] - 1)
+                    hit = keys[pos] == wanted
+                    rows.extend((small[valid][hit], ids[pos[hit]]))
+                    cols.extend((ids[pos[hit]], small[valid][hit]))
+
+        n = lo.shape[0]
+        if not rows:
+            return np.zeros(n + 1, dtype=np.int64), np.empty(0, dtype=np.int64)
+        pairs = np.unique(np.concatenate(rows) * n + np.concatenate(cols))
+        rows, cols = pairs // n, pairs % n
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n))))
+        return indptr, cols
+
+    def __index(self) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        sizes = self.__hi - self.__lo + 1
+        extent = self.__hi.max(axis=0) + 1 if self.__hi.shape[0] else np.ones(3, dtype=np.int64)
+        levels = []
+        for size in np.unique(sizes, axis=0):
+            ids = np.flatnonzero(np.all(sizes == size, axis=1))
+            dims = -(-extent // size)
+            keys = np.ravel_multi_index(tuple((self.__lo[ids] // size).T), tuple(dims))
+            order = np.argsort(keys)
+            levels.append((size, dims, keys[order], ids[order]))
+        return levels
+
+    def __leaves_in(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        found = []
+        for size, dims, keys, ids in self.__levels:
+            first, last = lo // size, np.minimum(hi // size, dims - 1)
+            if np.any(first > last) or np.any(last < 0):
+                continue
+            cells = np.meshgrid(*(np.arange(max(a, 0), b + 1) for a, b in zip(first, last)), indexing="ij")
+            wanted = np.ravel_multi_index(tuple(cell.ravel() for cell in cells), tuple(dims))
+            pos = np.minimum(np.searchsorted(keys, wanted), keys.shape[0] - 1)
+            found.append(ids[pos[keys[pos] == wanted]])
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def __index_of(self, point: np.ndarray) -> np.ndarray:
+        return np.round((point - self.__grid_min) / self.__step).astype(np.int64)
+
+    def __leaf_of(self, idx: np.ndarray) -> int:
+        inside = self.__leaves_in(idx, idx)
+        return int(inside[0]) if inside.shape[0] else -1
+
+    def contains(self, point: np.ndarray) -> bool:
+        return self.__leaf_of(self.__index_of(point)) >= 0
+
+    def prepare(self) -> None:
+        return None
+
+    def __portal(self, leaf: int, nbr: int, point: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        lo = np.maximum(self.__lo[leaf], self.__lo[nbr])
+        hi = np.minimum(self.__hi[leaf], self.__hi[nbr])
+        cross = np.clip(point, lo, hi)
+        entry = cross.copy()
+        for axis in self.__axes:
+            if self.__hi[leaf, axis] < self.__lo[nbr, axis]:
+                cross[axis], entry[axis] = self.__hi[leaf, axis], self.__lo[nbr, axis]
+            elif self.__hi[nbr, axis] < self.__lo[leaf, axis]:
+                cross[axis], entry[axis] = self.__lo[leaf, axis], self.__hi[nbr, axis]
+        return cross, entry
+
+    def __search(self, source_idx: np.ndarray, target_idx: np.ndarray) -> np.ndarray:
+        source = self.__leaf_of(source_idx)
+        target = self.__leaf_of(target_idx)
+        g: Dict[int, int] = {source: 0}
+        parent: Dict[int, int] = {source: -1}
+        entry: Dict[int, np.ndarray] = {source: source_idx}
+        closed = set()
+        h0 = int(np.abs(target_idx - source_idx).sum())
+        heap = [(h0, h0, source)]
+        self.__expanded = 0
+
+        while heap:
+            _, _, leaf = heappop(heap)
+            if leaf in closed:
+                continue
+            closed.add(leaf)
+            self.__expanded += 1
+            if leaf == target:
+                chain = []
+                while leaf != -1:
+                    chain.append(leaf)
+                    leaf = parent[leaf]
+                return self.__trace(chain[::-1], source_idx, target_idx)
+
+            point = entry[leaf]
+            for nbr in self.__indices[self.__indptr[leaf]:self.__indptr[leaf + 1]]:
+                nbr = int(nbr)
+                if nbr in closed:
+                    continue
+                cross, nxt = self.__portal(leaf, nbr, point)
+                total = g[leaf] + int(np.abs(cross - point).sum()) + 1
+                if total >= g.get(nbr, total + 1):
+                    continue
+                g[nbr] = total
+                parent[nbr] = leaf
+                entry[nbr] = nxt
+                h = int(np.abs(target_idx - nxt).sum())
+                heappush(heap, (total + h, h, nbr))
+
+        raise ValueError("Path not found")
+
+    def __trace(self, chain: List[int], source_idx: np.ndarray, target_idx: np.ndarray) -> np.ndarray:
+        points = [source_idx]
+        for leaf, nbr in zip(chain[:-1], chain[1:]):
+            points.extend(self.__portal(leaf, nbr, points[-1]))
+        points.append(target_idx)
+
+        path = [points[0]]
+        for point in points[1:]:
+            for axis in self.__axes:
+                if path[-1][axis] != point[axis]:
+                    step = path[-1].copy()
+                    step[axis] = point[axis]
+                    path.append(step)
+        path = self.__straighten(np.array(path))
+        if path.shape[0] > 2:
+            d = np.diff(path, axis=0)
+            turn = np.any((d[:-1] != 0) != (d[1:] != 0), axis=1)
+            path = path[np.r_[True, turn, True]]
+        return path
+
+    def __clear(self, a: np.ndarray, b: np.ndarray) -> bool:
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        hit = self.__leaves_in(lo, hi)
+        overlap = np.minimum(self.__hi[hit], hi) - np.maximum(self.__lo[hit], lo) + 1
+        return int(overlap.prod(axis=1).sum()) == int((hi - lo + 1).prod())
+
+    def __shortcut(self, a: np.ndarray, b: np.ndarray) -> List[np.ndarray] | None:
+        for order in permutations([axis for axis in self.__axes if a[axis] != b[axis]]):
+            points = [a]
+            for axis in order:
+                point = points[-1].copy()
+                point[axis] = b[axis]
+                points.append(point)
+            if all(self.__clear(p, q) for p, q in zip(points[:-1], points[1:])):
+                return points
+        return None
+
+    def __straighten(self, path: np.ndarray) -> np.ndarray:
+        result = [path[0]]
+        i, last = 0, path.shape[0] - 1
+        while i < last:
+            good, bad, step = i + 1, last + 1, 1
+            points = self.__shortcut(path[i], path[good]) or [path[i], path[good]]
+            while good < last and bad > good + 1:
+                j = min(good + step, last) if bad > last else (good + bad) // 2
+                shortcut = self.__shortcut(path[i], path[j])
+                if shortcut is None:
+                    bad = j
+                else:
+                    good, points = j, shortcut
+                    step *= 2
+            result.extend(points[1:])
+            i = good
+        return np.array(result)
+
+    def find_path(self, source_point: np.ndarray, target_point: np.ndarray) -> np.ndarray:
+        source_idx = self.__index_of(source_point)
+        target_idx = self.__index_of(target_point)
+        if self.__leaf_of(source_idx) < 0:
+            raise ValueError(
+                f"Source point {source_point} is inside an obstacle or out of grid bounds"
+            )
+        if self.__leaf_of(target_idx) < 0:
+            raise ValueError(
+                f"Target point {target_point} is inside an obstacle or out of grid bounds"
+            )
+        if any(source_idx[axis] != target_idx[axis] for axis in self.__fixed):
+            raise ValueError(
+                f"Source and target must lie in the same {self.__orientation} plane"
+            )
+
+        profiler = Profiler.active()
+        with profiler.stage("search"):
+            try:
+                path_nodes = self.__search(source_idx, target_idx)
+            finally:
+                profiler.count("nodes_settled", self.__expanded)
+        path_points = self.__grid_min + path_nodes * self.__step
+        profiler.count("path_length", float(np.abs(np.diff(path_points, axis=0)).sum()))
+
+        return path_points
+
+    def find_paths(
+        self, source_point: np.ndarray, target_points: List[np.ndarray]
+    ) -> List[np.ndarray | None]:
+        paths = []
+        for target_point in target_points:
+            try:
+                paths.append(self.find_path(source_point, target_point))
+            except ValueError:
+                paths.append(None)
+        return paths
+
+    def find_nets(
+        self,
+        pairs: List[Tuple[np.ndarray, np.ndarray]],
+        capacity: int = 2,
+        max_iterations: int = 50,
+    ) -> Tuple[List[np.ndarray | None], List[int]]:
+        raise ValueError("Negotiated routing needs a voxel grid, it is not supported by the octree router")
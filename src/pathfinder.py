@@ -1,16 +1,82 @@
-from typing import Dict, Tuple
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import numpy as np
-from scipy.sparse import lil_matrix
-from scipy.sparse.csgraph import dijkstra
+from astar import AStar
+from congestion import NegotiatedRouter
+from graph import GraphBuilder
 from grid import Grid
+from jps import JumpPointSearch
+from lpastar import LifelongAStar
+from profiler import Profiler
+from tiled_mask import TiledMask
+from voxels import TiledVoxelSpace, VoxelSpace
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+    from hpa import HierarchicalRouter
 
 
 class PathFinder:
-    def __init__(self, grid: Grid) -> None:
+    ALGORITHMS = ("dijkstra", "astar", "jps", "hpa")
+
+    def __init__(
+        self,
+        grid: Grid,
+        algorithm: str = "dijkstra",
+        cluster_size: int = 32,
+        free_idx: np.ndarray | None = None,
+        adjacency: csr_matrix | None = None,
+    ) -> None:
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(
+                f"Unknown routing algorithm '{algorithm}', expected one of {'/'.join(self.ALGORITHMS)}"
+            )
         self.__grid: Grid = grid
-        self.__free_idx: np.ndarray = np.argwhere(self.__grid.obstacle_mask == 0)
-        self.__idx_to_node: Dict[Tuple[int, int, int], int] = {tuple(idx): i for i, idx in enumerate(self.__free_idx)}
-        self.__adj: lil_matrix | None = None
+        self.__algorithm: str = algorithm
+        self.__cluster_size: int = cluster_size
+        mask = self.__grid.obstacle_mask
+        self.__shape: Tuple[int, ...] = tuple(mask.shape)
+        self.__node_index: np.ndarray | None = None
+        self.__keys: np.ndarray | None = None
+        self.__tiled: bool = isinstance(mask, TiledMask)
+        self.__free_idx: np.ndarray | None = free_idx
+        self.__alive: np.ndarray | None = None
+        self.__coords: np.ndarray | None = None
+        self.__slots: np.ndarray | None = None
+        self.__pointers: np.ndarray | None = None
+        self.__weights: np.ndarray | None = None
+        self.__overlay: Dict[int, int] = {}
+        self.__overlay_keys: np.ndarray = np.empty(0, dtype=np.int64)
+        self.__overlay_nodes: np.ndarray = np.empty(0, dtype=np.int64)
+        if self.__tiled:
+            if free_idx is None and algorithm in ("dijkstra", "hpa"):
+                self.__free_idx = mask.free_indices()
+            if self.__free_idx is not None:
+                self.__keys = GraphBuilder.keys(self.__free_idx, self.__shape)
+        elif hasattr(mask, "free_indices"):
+            self.__free_idx = mask.free_indices() if free_idx is None else free_idx
+            self.__keys = GraphBuilder.keys(self.__free_idx, self.__shape)
+        elif free_idx is None:
+            self.__free_idx, self.__node_index = GraphBuilder.index(mask == 0)
+        else:
+            self.__free_idx = free_idx
+            self.__node_index = GraphBuilder.lookup(free_idx, self.__shape)
+        if adjacency is not None and adjacency.shape[0] != self.free_indices.shape[0]:
+            raise ValueError(
+                f"Adjacency has {adjacency.shape[0]} nodes, expected {self.__free_idx.shape[0]}"
+            )
+        self.__adj: csr_matrix | None = adjacency
+        fixed = [axis for axis in range(3) if axis not in self.__grid.axes]
+        self.__plane_axis: int | None = (
+            fixed[0] if fixed and self.__shape[fixed[0]] > 1 else None
+        )
+        self.__spaces: Dict[int, VoxelSpace | TiledVoxelSpace] = {}
+        self.__hierarchies: Dict[int, HierarchicalRouter] = {}
+        self.__expanded: int = 0
+        self.__routes: Dict[int, Tuple[LifelongAStar, np.ndarray, np.ndarray | None]] = {}
+        self.__next_route: int = 0
+        if self.__free_idx is not None:
+            Profiler.active().record("free_nodes", int(self.__free_idx.shape[0]))
 
     @property
     def grid(self) -> Grid:
@@ -18,63 +84,525 @@ class PathFinder:
 
     @property
     def free_indices(self) -> np.ndarray:
+        if self.__free_idx is None:
+            self.__free_idx = self.__grid.obstacle_mask.free_indices()
+            self.__keys = GraphBuilder.keys(self.__free_idx, self.__shape)
+            Profiler.active().record("free_nodes", int(self.__free_idx.shape[0]))
+        if self.__alive is not None:
+            return self.__free_idx[self.__live_nodes()]
         return self.__free_idx
 
+    @property
+    def adjacency(self) -> csr_matrix:
+        if self.__adj is None:
+            self.__build_graph()
+        if self.__slots is None:
+            return self.__adj
+        from scipy.sparse import csr_matrix
+
+        live = self.__live_nodes()
+        remap = np.full(self.__free_idx.shape[0], -1, dtype=np.int64)
+        remap[live] = np.arange(live.shape[0])
+        n_nodes = self.__free_idx.shape[0]
+        rows = np.repeat(np.arange(n_nodes), len(self.__directions))
+        cols = self.__slots[:rows.shape[0]]
+        linked = (rows != cols) & (remap[rows] >= 0)
+        return csr_matrix(
+            (np.ones(int(linked.sum()), dtype=np.float32), (remap[rows[linked]], remap[cols[linked]])),
+            shape=(live.shape[0], live.shape[0]),
+        )
+
+    @property
+    def algorithm(self) -> str:
+        return self.__algorithm
+
+    @property
+    def expanded_nodes(self) -> int:
+        return self.__expanded
+
+    @property
+    def __directions(self) -> List[Tuple[int, int]]:
+        return [(axis, direction) for axis in self.__grid.axes for direction in (-1, 1)]
+
+    def __live_nodes(self) -> np.ndarray:
+        live = np.flatnonzero(self.__alive[:self.__free_idx.shape[0]])
+        return live[np.argsort(GraphBuilder.keys(self.__free_idx[live], self.__shape), kind="stable")]
+
     def __build_graph(self) -> None:
-        n_nodes: int = self.__free_idx.shape[0]
-        self.__adj = lil_matrix((n_nodes, n_nodes), dtype=np.float32)
-
-        neighbors = np.array([
-            [1, 0, 0], [-1, 0, 0],
-            [0, 1, 0], [0, -1, 0],
-            [0, 0, 1], [0, 0, -1]
-        ])
-
-        for i, idx in enumerate(self.__free_idx):
-            for d in neighbors:
-                nbr = tuple(idx + d)
-                if nbr in self.__idx_to_node:
-                    j = self.__idx_to_node[nbr]
-                    self.__adj[i, j] = 1
+        if self.__alive is not None:
+            self.__free_idx = self.__free_idx[self.__live_nodes()]
+            self.__alive = None
+            self.__overlay.clear()
+            self.__reindex()
+            if self.__node_index is None:
+                self.__keys = GraphBuilder.keys(self.__free_idx, self.__shape)
+            else:
+                self.__node_index = GraphBuilder.lookup(self.__free_idx, self.__shape)
+        profiler = Profiler.active()
+        with profiler.stage("graph"):
+            if self.__node_index is None:
+                self.__adj = GraphBuilder.sparse_adjacency(self.free_indices, self.__shape, self.__grid.axes)
+            else:
+                self.__adj = GraphBuilder.adjacency(self.__node_index, self.__grid.axes)
+        profiler.record("graph_edges", int(self.__adj.nnz // 2))
 
-    def find_path(self, source_point: np.ndarray, target_point: np.ndarray) -> np.ndarray:
+    def __node_of(self, idx: Tuple[int, ...]) -> int:
+        if any(i < 0 or i >= n for i, n in zip(idx, self.__shape)):
+            return -1
+        if self.__free_idx is None:
+            return 0 if self.__grid.obstacle_mask.voxel(*map(int, idx)) == 0 else -1
+        if self.__node_index is None:
+            key = int(np.ravel_multi_index(idx, self.__shape))
+            return self.__overlay.get(key, GraphBuilder.find(self.__keys, key))
+        return int(self.__node_index[idx])
 
-        if self.__adj is None:
-            self.__build_graph()
+    def __nodes_of(self, idx: np.ndarray) -> np.ndarray:
+        inside = np.all((idx >= 0) & (idx < self.__shape), axis=1)
+        nodes = np.full(idx.shape[0], -1, dtype=np.int64)
+        if self.__node_index is not None:
+            nodes[inside] = self.__node_index[tuple(idx[inside].T)]
+            return nodes
+        inside = np.flatnonzero(inside)
+        keys = GraphBuilder.keys(idx[inside], self.__shape)
+        for table, ids in ((self.__keys, None), (self.__overlay_keys, self.__overlay_nodes)):
+            if table.shape[0] == 0:
+                continue
+            pos = np.minimum(np.searchsorted(table, keys), table.shape[0] - 1)
+            found = table[pos] == keys
+            nodes[inside[found]] = pos[found] if ids is None else ids[pos[found]]
+        return nodes
+
+    def __shortest_tree(self, source_node: int) -> np.ndarray:
+        from scipy.sparse.csgraph import dijkstra
+
+        self.prepare()
+
+        profiler = Profiler.active()
+        with profiler.stage("search"):
+            dist_matrix, predecessors = dijkstra(
+                csgraph=self.__adj,
+                directed=False,
+                indices=source_node,
+                return_predecessors=True
+            )
+        self.__expanded = int(np.isfinite(dist_matrix).sum())
+        profiler.count("nodes_settled", self.__expanded)
+
+        return predecessors
+
+    def __trace(self, predecessors: np.ndarray, target_node: int) -> np.ndarray:
+        if predecessors[target_node] == -9999:
+            raise ValueError("Path not found")
+        path_nodes = []
+        cur: int = target_node
+        while cur != -9999:
+            path_nodes.append(self.__free_idx[cur])
+            cur = predecessors[cur]
+
+        return np.array(path_nodes[::-1])
+
+    def __plane(self, source_idx: Tuple[int, ...], target_idx: Tuple[int, ...]) -> np.ndarray:
+        origin = np.zeros(3, dtype=int)
+        if self.__plane_axis is None:
+            return origin
+        if source_idx[self.__plane_axis] != target_idx[self.__plane_axis]:
+            raise ValueError(
+                f"Source and target must lie in the same {self.__grid.orientation} plane"
+            )
+        origin[self.__plane_axis] = source_idx[self.__plane_axis]
+        return origin
+
+    def __domain(self, origin: np.ndarray) -> Tuple[int, np.ndarray]:
+        if self.__plane_axis is None:
+            return -1, self.__grid.obstacle_mask
+        key = int(origin[self.__plane_axis])
+        box = [slice(None)] * 3
+        box[self.__plane_axis] = slice(key, key + 1)
+        return key, self.__grid.obstacle_mask[tuple(box)]
+
+    def __space(self, origin: np.ndarray) -> VoxelSpace | TiledVoxelSpace:
+        if self.__tiled:
+            key = -1 if self.__plane_axis is None else int(origin[self.__plane_axis])
+            if key not in self.__spaces:
+                self.__spaces[key] = TiledVoxelSpace(self.__grid.obstacle_mask, self.__plane_axis, key)
+            return self.__spaces[key]
+        key, mask = self.__domain(origin)
+        if key not in self.__spaces:
+            with Profiler.active().stage("voxels"):
+                self.__spaces[key] = VoxelSpace(mask)
+        return self.__spaces[key]
+
+    def __hierarchy(self, origin: np.ndarray) -> HierarchicalRouter:
+        from hpa import HierarchicalRouter
+
+        key, mask = self.__domain(origin)
+        if key not in self.__hierarchies:
+            self.__hierarchies[key] = HierarchicalRouter(mask, self.__cluster_size)
+        return self.__hierarchies[key]
+
+    def __search(self, source_idx: Tuple[int, ...], target_idx: Tuple[int, ...]) -> np.ndarray:
+        origin = self.__plane(source_idx, target_idx)
+        space = self.__space(origin)
+        if self.__algorithm == "jps":
+            engine = JumpPointSearch(space)
+        else:
+            engine = AStar(space)
+        try:
+            states = engine.search(
+                space.index(*map(int, np.subtract(source_idx, origin))),
+                space.index(*map(int, np.subtract(target_idx, origin))),
+            )
+        finally:
+            self.__expanded = engine.expanded
+
+        return np.array([space.coords(state) for state in states]) + origin
+
+    def __search_many(
+        self, source_idx: Tuple[int, ...], target_indices: List[Tuple[int, ...]]
+    ) -> List[np.ndarray | None]:
+        paths: List[np.ndarray | None] = [None] * len(target_indices)
+        if self.__node_of(source_idx) < 0:
+            return paths
+
+        origin = self.__plane(source_idx, source_idx)
+        space = self.__space(origin)
+        reachable = [
+            i for i, target_idx in enumerate(target_indices)
+            if self.__node_of(target_idx) >= 0
+            and (self.__plane_axis is None or target_idx[self.__plane_axis] == source_idx[self.__plane_axis])
+        ]
+        engine = AStar(space)
+        profiler = Profiler.active()
+        with profiler.stage("search"):
+            found = engine.search_many(
+                space.index(*map(int, np.subtract(source_idx, origin))),
+                [space.index(*map(int, np.subtract(target_indices[i], origin))) for i in reachable],
+            )
+        self.__expanded = engine.expanded
+        profiler.count("nodes_settled", self.__expanded)
 
-        source_idx = tuple(
-            np.round((source_point - self.__grid.grid_min) / self.__grid.step).astype(int)
+        for i, states in zip(reachable, found):
+            if states is not None:
+                path_nodes = np.array([space.coords(state) for state in states]) + origin
+                paths[i] = self.__grid.grid_min + path_nodes * self.__grid.step
+        return paths
+
+    def __hierarchical(self, source_idx: Tuple[int, ...], target_idx: Tuple[int, ...]) -> np.ndarray:
+        origin = self.__plane(source_idx, target_idx)
+        hierarchy = self.__hierarchy(origin)
+        try:
+            return hierarchy.find_path(
+                tuple(np.subtract(source_idx, origin)), tuple(np.subtract(target_idx, origin))
+            ) + origin
+        finally:
+            self.__expanded = hierarchy.expanded
+
+    def __index_of(self, point: np.ndarray) -> Tuple[int, ...]:
+        return tuple(
+            np.round((point - self.__grid.grid_min) / self.__grid.step).astype(int)
         )
-        target_idx = tuple(
-            np.round((target_point - self.__grid.grid_min) / self.__grid.step).astype(int)
+
+    def contains(self, point: np.ndarray) -> bool:
+        return self.__node_of(self.__index_of(point)) >= 0
+
+    def prepare(self) -> None:
+        if self.__algorithm == "dijkstra":
+            if self.__adj is None:
+                self.__build_graph()
+        elif self.__plane_axis is None:
+            origin = np.zeros(3, dtype=int)
+            if self.__algorithm == "hpa":
+                self.__hierarchy(origin)
+            else:
+                self.__space(origin)
+
+    def find_nets(
+        self,
+        pairs: List[Tuple[np.ndarray, np.ndarray]],
+        capacity: int = 2,
+        max_iterations: int = 50,
+    ) -> Tuple[List[np.ndarray | None], List[int]]:
+        planes: Dict[int, Tuple[np.ndarray, List[int], List[Tuple[int, int]]]] = {}
+        for i, (source_point, target_point) in enumerate(pairs):
+            source_idx = self.__index_of(source_point)
+            target_idx = self.__index_of(target_point)
+            if self.__node_of(source_idx) < 0 or self.__node_of(target_idx) < 0:
+                continue
+            try:
+                origin = self.__plane(source_idx, target_idx)
+            except ValueError:
+                continue
+            key = -1 if self.__plane_axis is None else int(origin[self.__plane_axis])
+            plane = planes.setdefault(key, (origin, [], []))
+            space = self.__space(origin)
+            plane[1].append(i)
+            plane[2].append((
+                space.index(*map(int, np.subtract(source_idx, origin))),
+                space.index(*map(int, np.subtract(target_idx, origin))),
+            ))
+
+        paths: List[np.ndarray | None] = [None] * len(pairs)
+        congested: List[int] = []
+        self.__expanded = 0
+        for origin, members, nets in planes.values():
+            space = self.__space(origin)
+            router = NegotiatedRouter(space, capacity, 2 * self.__grid.width, max_iterations)
+            for i, states in zip(members, router.route(nets)):
+                if states is not None:
+                    path_nodes = np.array([space.coords(state) for state in states]) + origin
+                    paths[i] = self.__grid.grid_min + path_nodes * self.__grid.step
+            congested.extend(members[j] for j in router.congested)
+            self.__expanded += router.expanded
+
+        return paths, sorted(congested)
+
+    def update(self, region: Tuple[slice, slice]) -> List[int]:
+        xs, ys = (
+            range(n)[axis] for n, axis in zip(self.__shape, region)
         )
-        if source_idx not in self.__idx_to_node:
+        if len(xs) == 0 or len(ys) == 0:
+            return []
+        corner = np.array([xs.start, ys.start, 0])
+        box = (slice(xs.start, xs.stop), slice(ys.start, ys.stop))
+        cells = np.argwhere(np.ones((len(xs), len(ys), self.__shape[2]), dtype=bool)) + corner
+        if self.__free_idx is None:
+            return self.__repair(cells)
+        before = self.__nodes_of(cells) >= 0
+        after = np.asarray(self.__grid.obstacle_mask[box]).reshape(-1) == 0
+        if np.array_equal(before, after):
+            return []
+
+        self.__editable()
+        removed = self.__nodes_of(cells[before & ~after])
+        self.__alive[removed] = False
+        self.__index_nodes(cells[before & ~after], np.full(removed.shape[0], -1, dtype=np.int64))
+        added = cells[after & ~before]
+        self.__index_nodes(added, self.__append(added))
+        if self.__slots is not None:
+            self.__link(xs, ys, removed)
+
+        self.__hierarchies.clear()
+        for key, space in self.__spaces.items():
+            if self.__plane_axis is None:
+                space.update(self.__domain(np.zeros(3, dtype=int))[1], box[0])
+            elif self.__plane_axis != 0:
+                origin = np.zeros(3, dtype=int)
+                origin[self.__plane_axis] = key
+                space.update(self.__domain(origin)[1], box[0])
+            elif xs.start <= key < xs.stop:
+                space.update(self.__domain(np.array([key, 0, 0]))[1], slice(0, 1))
+
+        return self.__repair(cells[before != after])
+
+    def __editable(self) -> None:
+        if self.__alive is not None:
+            return
+        n_nodes = self.__free_idx.shape[0]
+        self.__alive = np.ones(n_nodes, dtype=bool)
+        if self.__adj is not None:
+            width = len(self.__directions)
+            adj = self.__adj.tocoo()
+            step = self.__free_idx[adj.col] - self.__free_idx[adj.row]
+            slot = np.zeros(adj.nnz, dtype=np.int64)
+            for k, (axis, direction) in enumerate(self.__directions):
+                slot[step[:, axis] == direction] = k
+            self.__slots = np.repeat(np.arange(n_nodes, dtype=np.int64), width)
+            self.__slots[adj.row * width + slot] = adj.col
+        self.__grow(n_nodes + max(n_nodes // 8, 64))
+
+    def __grow(self, capacity: int) -> None:
+        n_nodes = self.__free_idx.shape[0]
+        self.__coords = np.empty((capacity, 3), dtype=self.__free_idx.dtype)
+        self.__coords[:n_nodes] = self.__free_idx
+        self.__free_idx = self.__coords[:n_nodes]
+        self.__alive = np.concatenate((self.__alive[:n_nodes], np.zeros(capacity - n_nodes, dtype=bool)))
+        if self.__slots is None:
+            return
+        width = len(self.__directions)
+        dtype = np.int32 if capacity * width < np.iinfo(np.int32).max else np.int64
+        slots = np.repeat(np.arange(capacity, dtype=dtype), width)
+        slots[:n_nodes * width] = self.__slots[:n_nodes * width]
+        self.__slots = slots
+        self.__pointers = np.arange(0, (capacity + 1) * width, width, dtype=dtype)
+        self.__weights = np.ones(capacity * width, dtype=np.float32)
+
+    def __append(self, cells: np.ndarray) -> np.ndarray:
+        n_nodes = self.__free_idx.shape[0]
+        nodes = np.arange(n_nodes, n_nodes + cells.shape[0])
+        if self.__alive.shape[0] < n_nodes + cells.shape[0]:
+            self.__grow(max(2 * self.__alive.shape[0], n_nodes + cells.shape[0]))
+        self.__free_idx = self.__coords[:n_nodes + cells.shape[0]]
+        self.__free_idx[nodes] = cells
+        self.__alive[nodes] = True
+        return nodes
+
+    def __index_nodes(self, cells: np.ndarray, nodes: np.ndarray) -> None:
+        if cells.shape[0] == 0:
+            return
+        if self.__node_index is not None:
+            self.__node_index[tuple(cells.T)] = nodes
+            return
+        self.__overlay.update(zip(GraphBuilder.keys(cells, self.__shape).tolist(), nodes.tolist()))
+        self.__reindex()
+
+    def __reindex(self) -> None:
+        self.__overlay_keys = np.fromiter(self.__overlay.keys(), dtype=np.int64, count=len(self.__overlay))
+        self.__overlay_nodes = np.fromiter(self.__overlay.values(), dtype=np.int64, count=len(self.__overlay))
+        order = np.argsort(self.__overlay_keys)
+        self.__overlay_keys = self.__overlay_keys[order]
+        self.__overlay_nodes = self.__overlay_nodes[order]
+
+    def __link(self, xs: range, ys: range, removed: np.ndarray) -> None:
+        from scipy.sparse import csr_matrix
+
+        width = len(self.__directions)
+        self.__slots[(removed[:, None] * width + np.arange(width)).ravel()] = np.repeat(removed, width)
+        xs = range(max(xs.start - 1, 0), min(xs.stop + 1, self.__shape[0]))
+        ys = range(max(ys.start - 1, 0), min(ys.stop + 1, self.__shape[1]))
+        cells = np.argwhere(np.ones((len(xs), len(ys), self.__shape[2]), dtype=bool)) + [xs.start, ys.start, 0]
+        nodes = self.__nodes_of(cells)
+        cells, nodes = cells[nodes >= 0], nodes[nodes >= 0]
+        for k, (axis, direction) in enumerate(self.__directions):
+            neighbour = cells.copy()
+            neighbour[:, axis] += direction
+            linked = self.__nodes_of(neighbour)
+            self.__slots[nodes * width + k] = np.where(linked >= 0, linked, nodes)
+
+        n_nodes = self.__free_idx.shape[0]
+        self.__adj = csr_matrix(
+            (self.__weights[:n_nodes * width], self.__slots[:n_nodes * width], self.__pointers[:n_nodes + 1]),
+            shape=(n_nodes, n_nodes),
+            copy=False,
+        )
+
+    def track(self, source_point: np.ndarray, target_point: np.ndarray) -> int:
+        source_idx = self.__index_of(source_point)
+        target_idx = self.__index_of(target_point)
+        if self.__node_of(source_idx) < 0:
             raise ValueError(
                 f"Source point {source_point} is inside an obstacle or out of grid bounds"
             )
-        if target_idx not in self.__idx_to_node:
+        if self.__node_of(target_idx) < 0:
             raise ValueError(
                 f"Target point {target_point} is inside an obstacle or out of grid bounds"
             )
+        origin = self.__plane(source_idx, target_idx)
+        space = self.__space(origin)
+        planner = LifelongAStar(
+            space,
+            space.index(*map(int, np.subtract(source_idx, origin))),
+            space.index(*map(int, np.subtract(target_idx, origin))),
+        )
+        path_nodes = self.__replan(planner, origin)
+        if path_nodes is None:
+            raise ValueError("Path not found")
 
-        source_node: int = self.__idx_to_node[source_idx]
-        target_node: int = self.__idx_to_node[target_idx]
+        route_id = self.__next_route
+        self.__next_route += 1
+        self.__routes[route_id] = (planner, origin, path_nodes)
+        return route_id
 
-        dist_matrix, predecessors = dijkstra(
-            csgraph=self.__adj,
-            directed=False,
-            indices=source_node,
-            return_predecessors=True
-        )
+    def untrack(self, route_id: int) -> None:
+        if self.__routes.pop(route_id, None) is None:
+            raise ValueError(f"Unknown route {route_id}")
 
-        if predecessors[target_node] == -9999:
-            raise ValueError("Path not found")
-        path_nodes = []
-        cur: int = target_node
-        while cur != -9999:
-            path_nodes.append(self.__free_idx[cur])
-            cur = predecessors[cur]
-        path_nodes = np.array(path_nodes[::-1])
+    def route(self, route_id: int) -> np.ndarray:
+        if route_id not in self.__routes:
+            raise ValueError(f"Unknown route {route_id}")
+        path_nodes = self.__routes[route_id][2]
+        if path_nodes is None:
+            raise ValueError(f"Route {route_id} has no path")
+        return self.__grid.grid_min + path_nodes * self.__grid.step
+
+    def __replan(self, planner: LifelongAStar, origin: np.ndarray) -> np.ndarray | None:
+        space = self.__space(origin)
+        try:
+            states = planner.search()
+        except ValueError:
+            return None
+        finally:
+            self.__expanded = planner.expanded
+        return np.array([space.coords(state) for state in states]) + origin
+
+    def __repair(self, changed: np.ndarray) -> List[int]:
+        rerouted = []
+        expanded = 0
+        for route_id, (planner, origin, path_nodes) in self.__routes.items():
+            cells = changed
+            if self.__plane_axis is not None:
+                cells = changed[changed[:, self.__plane_axis] == origin[self.__plane_axis]]
+            if cells.shape[0] == 0:
+                continue
+            space = self.__space(origin)
+            planner.update(space.index(*map(int, cell - origin)) for cell in cells)
+            repaired = self.__replan(planner, origin)
+            expanded += planner.expanded
+            if not np.array_equal(repaired, path_nodes):
+                rerouted.append(route_id)
+            self.__routes[route_id] = (planner, origin, repaired)
+        self.__expanded = expanded
+
+        return rerouted
+
+    def find_path(self, source_point: np.ndarray, target_point: np.ndarray) -> np.ndarray:
+        source_idx = self.__index_of(source_point)
+        target_idx = self.__index_of(target_point)
+        source_node: int = self.__node_of(source_idx)
+        target_node: int = self.__node_of(target_idx)
+        if source_node < 0:
+            raise ValueError(
+                f"Source point {source_point} is inside an obstacle or out of grid bounds"
+            )
+        if target_node < 0:
+            raise ValueError(
+                f"Target point {target_point} is inside an obstacle or out of grid bounds"
+            )
+
+        profiler = Profiler.active()
+        if self.__algorithm == "dijkstra":
+            self.__plane(source_idx, target_idx)
+            path_nodes = self.__trace(self.__shortest_tree(source_node), target_node)
+        else:
+            with profiler.stage("search"):
+                if self.__algorithm == "hpa":
+                    path_nodes = self.__hierarchical(source_idx, target_idx)
+                else:
+                    path_nodes = self.__search(source_idx, target_idx)
+            profiler.count("nodes_settled", self.__expanded)
         path_points = self.__grid.grid_min + path_nodes * self.__grid.step
+        profiler.count("path_length", float(np.abs(np.diff(path_points, axis=0)).sum()))
 
         return path_points
+
+    def find_paths(
+        self, source_point: np.ndarray, target_points: List[np.ndarray]
+    ) -> List[np.ndarray | None]:
+        if self.__algorithm not in ("dijkstra", "astar"):
+            paths = []
+            for target_point in target_points:
+                try:
+                    paths.append(self.find_path(source_point, target_point))
+                except ValueError:
+                    paths.append(None)
+            return paths
+
+        source_idx = self.__index_of(source_point)
+        if self.__algorithm == "astar":
+            return self.__search_many(source_idx, [self.__index_of(point) for point in target_points])
+        source_node: int = self.__node_of(source_idx)
+        if source_node < 0:
+            raise ValueError(
+                f"Source point {source_point} is inside an obstacle or out of grid bounds"
+            )
+        predecessors = self.__shortest_tree(source_node)
+
+        paths = []
+        for target_point in target_points:
+            target_node = self.__node_of(self.__index_of(target_point))
+            if target_node < 0 or predecessors[target_node] == -9999:
+                paths.append(None)
+                continue
+            path_nodes = self.__trace(predecessors, target_node)
+            paths.append(self.__grid.grid_min + path_nodes * self.__grid.step)
+
+        return paths
@@ -0,0 +1,126 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Profiler:
+    def __init__(self, memory: bool = False) -> None:
+        self.__memory: bool = memory
+        self.__stages: Dict[str, Dict[str, Any]] = {}
+        self.__counts: Dict[str, Any] = {}
+        self.__stack: List[List[Any]] = []
+        self.__token: Token | None = None
+        self.__tracing: bool = False
+
+    @staticmethod
+    def active() -> "Profiler":
+        return _active.get()
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    @property
+    def stages(self) -> Dict[str, Dict[str, Any]]:
+        return self.__stages
+
+    @property
+    def counts(self) -> Dict[str, Any]:
+        return self.__counts
+
+    def __enter__(self) -> "Profiler":
+        self.__token = _active.set(self)
+        if self.__memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__tracing = True
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.__tracing:
+            tracemalloc.stop()
+            self.__tracing = False
+        _active.reset(self.__token)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        tracing = self.__memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            for entry in self.__stack:
+                entry[2] = max(entry[2], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        key = f"{self.__stack[-1][0]}/{name}" if self.__stack else name
+        entry = [key, current, current]
+        self.__stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.__stack.pop()
+            record = self.__stages.setdefault(key, {"calls": 0, "seconds": 0.0})
+            record["calls"] += 1
+            record["seconds"] += seconds
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                for parent in self.__stack:
+                    parent[2] = max(parent[2], peak)
+                record["peak_bytes"] = max(record.get("peak_bytes", 0), max(entry[2], peak) - entry[1])
+            elif resource is not None:
+                scale = 1 if sys.platform == "darwin" else 1024
+                record["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def record(self, name: str, value: Any) -> None:
+        self.__counts[name] = value
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.__counts[name] = self.__counts.get(name, 0) + value
+
+    def report(self) -> Dict[str, Any]:
+        return {"stages": self.__stages, "counts": self.__counts}
+
+    def write(self, output_path: str | Path | None = None) -> None:
+        if output_path is None or str(output_path) == "-":
+            json.dump(self.report(), sys.stdout, indent=2)
+            sys.stdout.write("\n")
+            return
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class NullProfiler(Profiler):
+    __NULL_STAGE = nullcontext()
+
+    @property
+    def enabled(self) -> bool:
+        return False
+
+    def __enter__(self) -> "Profiler":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return self.__NULL_STAGE
+
+    def record(self, name: str, value: Any) -> None:
+        return None
+
+    def count(self, name: str, value: int = 1) -> None:
+        return None
+
+
+_active: ContextVar[Profiler] = ContextVar("profiler", default=NullProfiler())
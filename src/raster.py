@@ -0,0 +1,178 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+class Rasterizer:
+    BATCH = 1 << 18
+
+    @staticmethod
+    def triangles(vertices: np.ndarray, faces: List[np.ndarray] | np.ndarray) -> np.ndarray:
+        tris = []
+        for face in faces:
+            face = np.asarray(face)
+            if face.shape[0] < 3:
+                continue
+            fan = np.column_stack((
+                np.full(face.shape[0] - 2, face[0]), face[1:-1], face[2:]
+            ))
+            tris.append(vertices[fan][:, :, :2])
+        if not tris:
+            return np.empty((0, 3, 2), dtype=float)
+        tris = np.concatenate(tris).astype(float)
+
+        area = (
+            (tris[:, 1, 0] - tris[:, 0, 0]) * (tris[:, 2, 1] - tris[:, 0, 1])
+            - (tris[:, 1, 1] - tris[:, 0, 1]) * (tris[:, 2, 0] - tris[:, 0, 0])
+        )
+        tris = tris[area != 0]
+        clockwise = area[area != 0] < 0
+        tris[clockwise] = tris[clockwise][:, ::-1]
+
+        return tris
+
+    @staticmethod
+    def open_edges(tris: np.ndarray) -> np.ndarray:
+        directed: Dict[Tuple[float, ...], int] = {}
+        for t, tri in enumerate(tris):
+            for k in range(3):
+                a, b = tri[k], tri[(k + 1) % 3]
+                directed[(*a, *b)] = directed.get((*a, *b), 0) + 1
+
+        open_edges = np.zeros((tris.shape[0], 3), dtype=bool)
+        for t, tri in enumerate(tris):
+            for k in range(3):
+                a, b = tri[k], tri[(k + 1) % 3]
+                open_edges[t, k] = (*b, *a) not in directed
+
+        return open_edges
+
+    @staticmethod
+    def fill(tris: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        covered = np.zeros((xs.shape[0], ys.shape[0]), dtype=bool)
+        boundary = np.zeros_like(covered)
+        interior = np.zeros_like(covered)
+        open_edges = Rasterizer.open_edges(tris)
+
+        for tri, is_open in zip(tris, open_edges):
+            lo = tri.min(axis=0)
+            hi = tri.max(axis=0)
+            i0, i1 = np.searchsorted(xs, lo[0], "left"), np.searchsorted(xs, hi[0], "right")
+            j0, j1 = np.searchsorted(ys, lo[1], "left"), np.searchsorted(ys, hi[1], "right")
+            if i0 >= i1 or j0 >= j1:
+                continue
+            px = xs[i0:i1, None]
+            py = ys[None, j0:j1]
+
+            edges = []
+            for k in range(3):
+                a, b = tri[k], tri[(k + 1) % 3]
+                edges.append((b[0] - a[0]) * (py - a[1]) - (b[1] - a[1]) * (px - a[0]))
+            closed = (edges[0] >= 0) & (edges[1] >= 0) & (edges[2] >= 0)
+            if not closed.any():
+                continue
+
+            block = (slice(i0, i1), slice(j0, j1))
+            covered[block] |= closed
+            interior[block] |= (edges[0] > 0) & (edges[1] > 0) & (edges[2] > 0)
+            for k in range(3):
+                if is_open[k]:
+                    boundary[block] |= closed & (edges[k] == 0)
+
+        return covered & ~(boundary & ~interior)
+
+    @staticmethod
+    def bottoms(
+        tris: np.ndarray, origin: np.ndarray, step: float, shape: Tuple[int, int],
+        window: Tuple[int, int, int, int] | None = None, boxes: np.ndarray | None = None, grow: int = 0,
+    ) -> np.ndarray:
+        wlo = np.array((0, 0) if window is None else window[:2])
+        whi = np.array(shape if window is None else window[2:])
+        bottom = np.full(tuple(whi - wlo), np.inf)
+        if boxes is not None and boxes.shape[0] > 0:
+            lo = np.floor((boxes[:, 0, :2] - origin[:2]) // step).astype(int) - grow
+            hi = np.floor((boxes[:, 1, :2] - origin[:2]) // step).astype(int) + grow
+            lo = np.maximum(lo, wlo) - wlo
+            hi = np.minimum(hi, whi - 1) - wlo
+            keep = np.all(lo <= hi, axis=1)
+            for (i0, j0), (i1, j1), z in zip(lo[keep].tolist(), hi[keep].tolist(), boxes[keep, 0, 2].tolist()):
+                block = bottom[i0:i1 + 1, j0:j1 + 1]
+                np.minimum(block, z, out=block)
+        if tris.shape[0] == 0:
+            return bottom
+        if grow > 0:
+            from scipy.ndimage import minimum_filter
+
+            glo, ghi = np.maximum(wlo - grow, 0), np.minimum(whi + grow, shape)
+            spread = minimum_filter(
+                Rasterizer.bottoms(tris, origin, step, shape, window=(*glo, *ghi)),
+                size=2 * grow + 1, mode="constant", cval=np.inf,
+            )
+            inner = spread[wlo[0] - glo[0]:whi[0] - glo[0], wlo[1] - glo[1]:whi[1] - glo[1]]
+            return np.minimum(bottom, inner, out=bottom)
+
+        lo = np.floor((tris.min(axis=1)[:, :2] - origin[:2]) // step).astype(int)
+        hi = np.floor((tris.max(axis=1)[:, :2] - origin[:2]) // step).astype(int)
+        lo = np.maximum(lo, wlo)
+        hi = np.minimum(hi, whi - 1)
+        keep = np.all(lo <= hi, axis=1)
+        tris, lo, hi = tris[keep], lo[keep], hi[keep]
+        if tris.shape[0] == 0:
+            return bottom
+        local = tris.astype(float)
+        local[:, :, :2] -= origin[:2] + step / 2
+        local[:, :, :2] /= step
+        gx, gy, z0, z_min = Rasterizer.__planes(local)
+
+        rows = hi[:, 0] - lo[:, 0] + 1
+        tri = np.repeat(np.arange(tris.shape[0]), rows)
+        ci = np.arange(tri.shape[0]) - np.repeat(np.cumsum(rows) - rows, rows) + lo[tri, 0]
+        y0, y1 = Rasterizer.__spans(local[tri, :, :2], ci)
+        cj0 = np.maximum(np.ceil(y0 - 0.5), lo[tri, 1]).astype(int)
+        cj1 = np.minimum(np.floor(y1 + 0.5), hi[tri, 1]).astype(int)
+        counts = np.maximum(cj1 - cj0 + 1, 0)
+        base = z0[tri] + gx[tri] * ci - (np.abs(gx[tri]) + np.abs(gy[tri])) / 2
+
+        batch = np.cumsum(counts) // Rasterizer.BATCH
+        for b in np.unique(batch):
+            part = batch == b
+            n = counts[part]
+            cj = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n) + np.repeat(cj0[part], n)
+            slope = np.repeat(gy[tri[part]], n)
+            z = np.maximum(np.repeat(base[part], n) + slope * cj, np.repeat(z_min[tri[part]], n))
+            np.minimum.at(bottom, (np.repeat(ci[part], n) - wlo[0], cj - wlo[1]), z)
+
+        return bottom
+
+    @staticmethod
+    def __spans(corners: np.ndarray, ci: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        y0 = np.full(ci.shape[0], np.inf)
+        y1 = np.full(ci.shape[0], -np.inf)
+        for k in range(3):
+            p, q = corners[:, k], corners[:, (k + 1) % 3]
+            xa = np.maximum(np.minimum(p[:, 0], q[:, 0]), ci - 0.5)
+            xb = np.minimum(np.maximum(p[:, 0], q[:, 0]), ci + 0.5)
+            hit = xa <= xb
+            dx = q[:, 0] - p[:, 0]
+            flat = dx == 0
+            slope = (q[:, 1] - p[:, 1]) / np.where(flat, 1.0, dx)
+            low, high = np.minimum(p[:, 1], q[:, 1]), np.maximum(p[:, 1], q[:, 1])
+            ya = np.clip(np.where(flat, p[:, 1], p[:, 1] + (xa - p[:, 0]) * slope), low, high)
+            yb = np.clip(np.where(flat, q[:, 1], p[:, 1] + (xb - p[:, 0]) * slope), low, high)
+            y0 = np.where(hit, np.minimum(y0, np.minimum(ya, yb)), y0)
+            y1 = np.where(hit, np.maximum(y1, np.maximum(ya, yb)), y1)
+
+        return y0, y1
+
+    @staticmethod
+    def __planes(local: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        e1 = local[:, 1] - local[:, 0]
+        e2 = local[:, 2] - local[:, 0]
+        normal_z = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+        projected = normal_z != 0
+        safe = np.where(projected, normal_z, 1.0)
+        gx = np.where(projected, (e1[:, 2] * e2[:, 1] - e1[:, 1] * e2[:, 2]) / safe, 0.0)
+        gy = np.where(projected, (e1[:, 0] * e2[:, 2] - e1[:, 2] * e2[:, 0]) / safe, 0.0)
+        z_min = local[:, :, 2].min(axis=1)
+        z0 = np.where(projected, local[:, 0, 2] - gx * local[:, 0, 0] - gy * local[:, 0, 1], z_min)
+
+        return gx, gy, z0, z_min
@@ -0,0 +1,150 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, TextIO, Tuple
+import json
+import threading
+import time
+import numpy as np
+from building_model import BuildingModel
+from config import Config
+from exporter import RouteExporter
+from octree import OctreeRouter
+from pathfinder import PathFinder
+from storeys import StoreyRouter
+from visibility import VisibilityRouter
+
+Router = PathFinder | OctreeRouter | VisibilityRouter | StoreyRouter
+Builder = Callable[[str, BuildingModel, Config], Router]
+
+
+class ModelCache:
+    def __init__(self, builder: Builder, capacity: int = 4) -> None:
+        if capacity < 1:
+            raise ValueError(f"Model cache capacity must be >= 1, got {capacity}")
+        self.__builder: Builder = builder
+        self.__capacity: int = capacity
+        self.__entries: OrderedDict[Tuple, Future] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    @staticmethod
+    def key(model_path: str | Path, config: Config) -> Tuple:
+        path = Path(model_path).resolve()
+        stat = path.stat()
+        return (
+            str(path), stat.st_mtime_ns, stat.st_size,
+            config.step, config.offset, config.width, config.orientation, config.mask,
+            config.algorithm, config.cluster_size, tuple(config.risers),
+        )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self.__lock:
+            return {
+                "models": len(self.__entries),
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "evictions": self.__evictions,
+            }
+
+    def get(self, model_path: str | Path, config: Config) -> Tuple[BuildingModel, Router, bool]:
+        key = self.key(model_path, config)
+        with self.__lock:
+            future = self.__entries.get(key)
+            hit = future is not None
+            if hit:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+            else:
+                self.__misses += 1
+                for stale in [k for k in self.__entries if k[0] == key[0] and k[3:] == key[3:]]:
+                    del self.__entries[stale]
+                    self.__evictions += 1
+                future = Future()
+                self.__entries[key] = future
+                while len(self.__entries) > self.__capacity:
+                    self.__entries.popitem(last=False)
+                    self.__evictions += 1
+
+        if not hit:
+            try:
+                building = BuildingModel(model_path)
+                future.set_result((building, self.__builder(str(model_path), building, config)))
+            except BaseException as e:
+                future.set_exception(e)
+                with self.__lock:
+                    if self.__entries.get(key) is future:
+                        del self.__entries[key]
+
+        building, pathfinder = future.result()
+        return building, pathfinder, hit
+
+
+class RouteServer:
+    def __init__(self, config: Config, builder: Builder) -> None:
+        self.__config: Config = config
+        self.__models: ModelCache = ModelCache(builder, config.max_models)
+        self.__workers: int = config.workers
+        self.__write_lock: threading.Lock = threading.Lock()
+
+    @property
+    def models(self) -> ModelCache:
+        return self.__models
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        response: Dict[str, Any] = {"id": request.get("id")}
+        start = time.perf_counter()
+        try:
+            if request.get("command") == "stats":
+                response.update(self.__models.stats)
+                return response
+            config = self.__config if request.get("config") is None else Config(request["config"])
+            if "model" not in request:
+                raise ValueError("Request must contain a 'model' path")
+            building, pathfinder, hit = self.__models.get(request["model"], config)
+            response["cache"] = "hit" if hit else "miss"
+
+            source_point, target_point = (self.__point(building, request[name]) for name in ("source", "target"))
+            path_points = pathfinder.find_path(source_point, target_point)
+            response["path"] = path_points.tolist()
+            response["length"] = float(np.abs(np.diff(path_points, axis=0)).sum())
+            response["bends"] = RouteExporter.bends(path_points)
+        except KeyError as e:
+            response["error"] = f"Request is missing {e}"
+        except (OSError, TypeError, ValueError) as e:
+            response["error"] = str(e)
+        except Exception as e:
+            response["error"] = f"Internal error: {type(e).__name__}: {e}"
+        finally:
+            response["seconds"] = time.perf_counter() - start
+
+        return response
+
+    @staticmethod
+    def __point(building: BuildingModel, value: Any) -> np.ndarray:
+        if len(value) not in (2, 3):
+            raise ValueError(f"Point must be [x, y] or [x, y, storey], got {value}")
+        return building.point(float(value[0]), float(value[1]), int(value[2]) if len(value) == 3 else None)
+
+    def serve(self, lines: Iterable[str], output: TextIO) -> None:
+        with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError(f"Request must be a JSON object, got {type(request).__name__}")
+                except ValueError as e:
+                    self.__write(output, {"id": None, "error": f"Invalid request: {e}"})
+                    continue
+                executor.submit(lambda request=request: self.__write(output, self.handle(request)))
+
+    def __write(self, output: TextIO, response: Dict[str, Any]) -> None:
+        with self.__write_lock:
+            output.write(json.dumps(response, ensure_ascii=False) + "\n")
+            output.flush()
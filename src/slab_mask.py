@@ -0,0 +1,220 @@
+from typing import Any, List, Tuple
+import numpy as np
+
+
+class SlabMask:
+    def __init__(self, shape: Tuple[int, int, int], fill: int = 1) -> None:
+        if len(shape) != 3:
+            raise ValueError(f"Slab mask shape must be 3D, got {shape}")
+        self.__shape: Tuple[int, int, int] = tuple(int(n) for n in shape)
+        self.__layers: List[int | np.ndarray] = [int(fill != 0)] * self.__shape[2]
+
+    @staticmethod
+    def from_dense(mask: np.ndarray) -> "SlabMask":
+        slab = SlabMask(mask.shape)
+        slab.__assign(mask)
+        return slab
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.__shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.uint8)
+
+    @property
+    def ndim(self) -> int:
+        return 3
+
+    @property
+    def size(self) -> int:
+        return self.__shape[0] * self.__shape[1] * self.__shape[2]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(layer.nbytes for layer in self.__layers if isinstance(layer, np.ndarray))
+
+    @property
+    def packed_layers(self) -> int:
+        return sum(isinstance(layer, np.ndarray) for layer in self.__layers)
+
+    def __len__(self) -> int:
+        return self.__shape[0]
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        dense = np.empty(self.__shape, dtype=np.uint8)
+        for z in range(self.__shape[2]):
+            dense[:, :, z] = self.__unpack(z, slice(None))
+        return dense if dtype is None else dense.astype(dtype, copy=False)
+
+    def __eq__(self, other: Any) -> np.ndarray:
+        return np.asarray(self) == np.asarray(other)
+
+    def __ne__(self, other: Any) -> np.ndarray:
+        return np.asarray(self) != np.asarray(other)
+
+    def __repr__(self) -> str:
+        return f"SlabMask(shape={self.__shape}, packed_layers={self.packed_layers}, nbytes={self.nbytes})"
+
+    def __normalize(self, key: Any) -> Tuple[Any, Any, Any] | None:
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(isinstance(k, np.ndarray) and k.dtype == bool and k.ndim > 1 for k in key):
+            return None
+        if any(k is None for k in key) or sum(k is Ellipsis for k in key) > 1:
+            return None
+        ellipsis = [i for i, k in enumerate(key) if k is Ellipsis]
+        if ellipsis:
+            at = ellipsis[0]
+            key = key[:at] + (slice(None),) * (4 - len(key)) + key[at + 1:]
+        if len(key) > 3:
+            raise IndexError(f"Too many indices for slab mask: {len(key)}")
+        return key + (slice(None),) * (3 - len(key))
+
+    @staticmethod
+    def __basic(k: Any) -> bool:
+        return isinstance(k, (int, np.integer, slice))
+
+    def __rows(self, k0: Any, k1: Any) -> Tuple[int, ...]:
+        return np.broadcast_to(np.uint8(0), self.__shape[:2])[k0, k1].shape
+
+    def __unpack(self, z: int, k0: Any) -> np.ndarray:
+        layer = self.__layers[z]
+        if isinstance(layer, np.ndarray):
+            return np.unpackbits(layer[k0], axis=-1, count=self.__shape[1])
+        rows = np.broadcast_to(np.uint8(0), self.__shape[:2])[k0].shape
+        return np.full(rows, layer, dtype=np.uint8)
+
+    def __store(self, z: int, k0: Any, rows: np.ndarray) -> None:
+        layer = self.__layers[z]
+        if not isinstance(layer, np.ndarray):
+            if np.all(rows == layer):
+                return
+            layer = np.full(
+                (self.__shape[0], (self.__shape[1] + 7) // 8), 0xFF if layer else 0, dtype=np.uint8
+            )
+            self.__layers[z] = layer
+        layer[k0] = np.packbits(rows, axis=-1)
+
+    def __compact(self, z: int) -> None:
+        layer = self.__layers[z]
+        if not isinstance(layer, np.ndarray):
+            return
+        bits = np.unpackbits(layer, axis=-1, count=self.__shape[1])
+        if bits.all():
+            self.__layers[z] = 1
+        elif not bits.any():
+            self.__layers[z] = 0
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        normalized = self.__normalize(key)
+        if normalized is None:
+            return np.asarray(self)[key]
+        k0, k1, k2 = normalized
+
+        if self.__basic(k0) and self.__basic(k1) and self.__basic(k2):
+            zs = range(self.__shape[2])[k2]
+            if isinstance(zs, int):
+                return self.__unpack(zs, k0)[..., k1]
+            out = np.empty(self.__rows(k0, k1) + (len(zs),), dtype=np.uint8)
+            for i, z in enumerate(zs):
+                out[..., i] = self.__unpack(z, k0)[..., k1]
+            return out
+
+        unique, k2 = self.__layers_of(k2)
+        dense = np.empty(self.__shape[:2] + (unique.shape[0],), dtype=np.uint8)
+        for i, z in enumerate(unique):
+            dense[:, :, i] = self.__unpack(int(z), slice(None))
+        return dense[k0, k1, k2]
+
+    def __layers_of(self, k2: Any) -> Tuple[np.ndarray, Any]:
+        zs = np.arange(self.__shape[2])[k2]
+        if isinstance(k2, slice):
+            return zs, slice(None)
+        unique, inverse = np.unique(zs, return_inverse=True)
+        return unique, inverse.reshape(np.shape(zs))
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        normalized = self.__normalize(key)
+        if normalized is None:
+            dense = np.asarray(self)
+            dense[key] = value
+            self.__assign(dense)
+            return
+        k0, k1, k2 = normalized
+        value = np.asarray(value)
+
+        if self.__basic(k0) and self.__basic(k1) and self.__basic(k2):
+            zs = range(self.__shape[2])[k2]
+            if isinstance(zs, int):
+                zs, planes = [zs], [np.broadcast_to(value, self.__rows(k0, k1))]
+            else:
+                full = np.broadcast_to(value, self.__rows(k0, k1) + (len(zs),))
+                planes = [full[..., i] for i in range(len(zs))]
+            whole = k0 == slice(None) and k1 == slice(None)
+            for z, plane in zip(zs, planes):
+                if whole and value.ndim == 0:
+                    self.__layers[z] = int(value != 0)
+                    continue
+                rows = self.__unpack(z, k0)
+                rows[..., k1] = plane != 0
+                self.__store(z, k0, rows)
+                if whole:
+                    self.__compact(z)
+            return
+
+        if self.__basic(k2) and value.ndim == 0 and not (self.__basic(k0) or self.__basic(k1)):
+            xs, ys = np.broadcast_arrays(np.asarray(k0), np.asarray(k1))
+            if xs.dtype.kind in "iu" and ys.dtype.kind in "iu":
+                self.__scatter(xs.ravel(), ys.ravel(), range(self.__shape[2])[k2], value != 0)
+                return
+
+        unique, k2 = self.__layers_of(k2)
+        dense = np.empty(self.__shape[:2] + (unique.shape[0],), dtype=np.uint8)
+        for i, z in enumerate(unique):
+            dense[:, :, i] = self.__unpack(int(z), slice(None))
+        dense[k0, k1, k2] = value
+        for i, z in enumerate(unique):
+            self.__store(int(z), slice(None), dense[:, :, i] != 0)
+            self.__compact(int(z))
+
+    def __scatter(self, xs: np.ndarray, ys: np.ndarray, zs: range | int, value: bool) -> None:
+        xs = np.where(xs < 0, xs + self.__shape[0], xs)
+        ys = np.where(ys < 0, ys + self.__shape[1], ys)
+        rows, pos = np.unique(xs, return_inverse=True)
+        for z in [zs] if isinstance(zs, int) else zs:
+            layer = self.__layers[z]
+            if not isinstance(layer, np.ndarray) and layer == value:
+                continue
+            bits = self.__unpack(z, rows)
+            bits[pos, ys] = value
+            self.__store(z, rows, bits)
+
+    def __assign(self, dense: np.ndarray) -> None:
+        for z in range(self.__shape[2]):
+            layer = dense[:, :, z] != 0
+            if layer.all():
+                self.__layers[z] = 1
+            elif not layer.any():
+                self.__layers[z] = 0
+            else:
+                self.__layers[z] = np.packbits(layer, axis=-1)
+
+    def free_indices(self) -> np.ndarray:
+        chunks = []
+        for z in range(self.__shape[2]):
+            layer = self.__layers[z]
+            if isinstance(layer, np.ndarray):
+                xy = np.argwhere(np.unpackbits(layer, axis=-1, count=self.__shape[1]) == 0)
+            elif layer == 0:
+                xy = np.argwhere(np.ones(self.__shape[:2], dtype=bool))
+            else:
+                continue
+            chunks.append(np.column_stack((xy, np.full(xy.shape[0], z, dtype=xy.dtype))))
+        if not chunks:
+            return np.empty((0, 3), dtype=np.intp)
+
+        free_idx = np.concatenate(chunks)
+        order = np.argsort(np.ravel_multi_index(tuple(free_idx.T), self.__shape), kind="stable")
+        return free_idx[order]
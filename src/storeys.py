@@ -0,0 +1,155 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+import threading
+import numpy as np
+from building_model import BuildingModel, Storey
+from profiler import Profiler
+
+if TYPE_CHECKING:
+    from octree import OctreeRouter
+    from pathfinder import PathFinder
+    from visibility import VisibilityRouter
+
+    Router = PathFinder | OctreeRouter | VisibilityRouter
+
+
+class StoreyRouter:
+    def __init__(
+        self,
+        building: BuildingModel,
+        risers: List[Tuple[float, float]],
+        builder: Callable[[Storey], Router],
+    ) -> None:
+        self.__building: BuildingModel = building
+        self.__risers: List[np.ndarray] = [np.asarray(riser, dtype=float) for riser in risers]
+        self.__builder: Callable[[Storey], Router] = builder
+        self.__routers: Dict[int, Router] = {}
+        self.__shafts: Dict[Tuple[int, int], List[np.ndarray]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def built(self) -> List[int]:
+        return sorted(self.__routers)
+
+    @property
+    def expanded_nodes(self) -> int:
+        return sum(router.expanded_nodes for router in list(self.__routers.values()))
+
+    def router(self, index: int) -> Router:
+        with self.__lock:
+            router = self.__routers.get(index)
+            if router is None:
+                with Profiler.active().stage(f"storey_{index}"):
+                    router = self.__builder(self.__building.storeys[index])
+                self.__routers[index] = router
+                Profiler.active().record("storeys_built", len(self.__routers))
+        return router
+
+    def __riser(self, riser: np.ndarray, index: int) -> np.ndarray:
+        return np.array([*riser, self.__building.storeys[index].elevation])
+
+    def shafts(self, lower: int, upper: int) -> List[np.ndarray]:
+        key = (min(lower, upper), max(lower, upper))
+        shafts = self.__shafts.get(key)
+        if shafts is None:
+            shafts = [
+                riser for riser in self.__risers
+                if all(self.router(index).contains(self.__riser(riser, index)) for index in key)
+            ]
+            self.__shafts[key] = shafts
+        return shafts
+
+    def contains(self, point: np.ndarray) -> bool:
+        try:
+            storey = self.__building.storey_at(point[2])
+        except ValueError:
+            return False
+        return self.router(storey.index).contains(point)
+
+    def prepare(self) -> None:
+        return None
+
+    @staticmethod
+    def __length(path: np.ndarray) -> float:
+        return float(np.abs(np.diff(path, axis=0)).sum())
+
+    def __check(self, point: np.ndarray, storey: int, name: str) -> None:
+        if not self.router(storey).contains(point):
+            raise ValueError(f"{name} point {point} is inside an obstacle or out of grid bounds")
+
+    def __legs(self, index: int, point: np.ndarray, targets: List[np.ndarray]) -> List[np.ndarray | None]:
+        legs: List[np.ndarray | None] = [point[None] if np.allclose(point, target) else None for target in targets]
+        rest = [i for i, leg in enumerate(legs) if leg is None]
+        if rest:
+            for i, path in zip(rest, self.router(index).find_paths(point, [targets[i] for i in rest])):
+                legs[i] = path
+        return legs
+
+    def find_path(self, source_point: np.ndarray, target_point: np.ndarray) -> np.ndarray:
+        source = self.__building.storey_at(source_point[2]).index
+        target = self.__building.storey_at(target_point[2]).index
+        if source == target:
+            return self.router(source).find_path(source_point, target_point)
+        self.__check(source_point, source, "Source")
+        self.__check(target_point, target, "Target")
+
+        step = 1 if target > source else -1
+        layer: List[Tuple[float, np.ndarray, List[np.ndarray]]] = [(0.0, source_point, [])]
+        for here in range(source, target, step):
+            there = here + step
+            shafts = self.shafts(here, there)
+            if not shafts:
+                raise ValueError(f"No riser links storeys {here} and {there}")
+            climb = abs(self.__building.storeys[there].elevation - self.__building.storeys[here].elevation)
+            exits = [self.__riser(riser, here) for riser in shafts]
+            best: List[Tuple[float, np.ndarray, List[np.ndarray]] | None] = [None] * len(shafts)
+            for cost, point, pieces in layer:
+                for i, path in enumerate(self.__legs(here, point, exits)):
+                    if path is None:
+                        continue
+                    total = cost + self.__length(path) + climb
+                    if best[i] is None or total < best[i][0]:
+                        best[i] = (total, self.__riser(shafts[i], there), pieces + [path])
+            layer = [entry for entry in best if entry is not None]
+            if not layer:
+                raise ValueError("Path not found")
+
+        paths = self.__legs(target, target_point, [point for _, point, _ in layer])
+        routes = [
+            (cost + self.__length(path), pieces + [path[::-1]])
+            for (cost, _, pieces), path in zip(layer, paths)
+            if path is not None
+        ]
+        if not routes:
+            raise ValueError("Path not found")
+
+        pieces = min(routes, key=lambda route: route[0])[1]
+        path_points = [pieces[0]]
+        for piece in pieces[1:]:
+            end, start = path_points[-1][-1], piece[0]
+            if not np.allclose(end[:2], start[:2]):
+                path_points.append(np.array([[end[0], end[1], start[2]]]))
+            path_points.append(piece)
+        path_points = np.concatenate(path_points)
+        keep = np.r_[True, np.any(np.diff(path_points, axis=0) != 0, axis=1)]
+
+        return path_points[keep]
+
+    def find_paths(
+        self, source_point: np.ndarray, target_points: List[np.ndarray]
+    ) -> List[np.ndarray | None]:
+        paths = []
+        for target_point in target_points:
+            try:
+                paths.append(self.find_path(source_point, target_point))
+            except ValueError:
+                paths.append(None)
+        return paths
+
+    def find_nets(
+        self,
+        pairs: List[Tuple[np.ndarray, np.ndarray]],
+        capacity: int = 2,
+        max_iterations: int = 50,
+    ) -> Tuple[List[np.ndarray | None], List[int]]:
+        raise ValueError("Negotiated routing is not supported across storeys")
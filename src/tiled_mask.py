@@ -0,0 +1,266 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Set, Tuple
+import tempfile
+import threading
+import numpy as np
+
+Builder = Callable[[slice, slice], None]
+Key = Tuple[int, int]
+
+
+class TiledMask:
+    def __init__(
+        self,
+        shape: Tuple[int, int, int],
+        tile: int,
+        builder: Builder,
+        memory: int | None = None,
+        directory: str | Path | None = None,
+        fill: int = 1,
+    ) -> None:
+        if len(shape) != 3:
+            raise ValueError(f"Tiled mask shape must be 3D, got {shape}")
+        if tile < 1:
+            raise ValueError(f"Tile size must be >= 1, got {tile}")
+        self.__shape: Tuple[int, int, int] = tuple(int(n) for n in shape)
+        self.__tile: int = int(tile)
+        self.__counts: Tuple[int, int] = (-(-self.__shape[0] // tile), -(-self.__shape[1] // tile))
+        self.__builder: Builder = builder
+        self.__fill: int = int(fill != 0)
+        self.__tiles: OrderedDict[Key, np.ndarray] = OrderedDict()
+        self.__built: Set[Key] = set()
+        self.__building: Dict[Key, np.ndarray] = {}
+        self.__lock: threading.RLock = threading.RLock()
+        self.__evictions: int = 0
+
+        tile_bytes = tile * tile * self.__shape[2]
+        self.__max_tiles: int | None = None
+        self.__temp: tempfile.TemporaryDirectory | None = None
+        self.__directory: Path | None = None
+        if memory is not None and self.size > memory:
+            self.__max_tiles = max(1, int(memory // tile_bytes))
+            if directory is None:
+                self.__temp = tempfile.TemporaryDirectory(prefix="tiles-")
+                directory = self.__temp.name
+            self.__directory = Path(directory)
+            self.__directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.__shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.uint8)
+
+    @property
+    def ndim(self) -> int:
+        return 3
+
+    @property
+    def size(self) -> int:
+        return self.__shape[0] * self.__shape[1] * self.__shape[2]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(tile.nbytes for tile in self.__tiles.values())
+
+    @property
+    def tile_size(self) -> int:
+        return self.__tile
+
+    @property
+    def on_disk(self) -> bool:
+        return self.__directory is not None
+
+    @property
+    def max_tiles(self) -> int | None:
+        return self.__max_tiles
+
+    @property
+    def tiles_built(self) -> int:
+        return len(self.__built)
+
+    @property
+    def resident_tiles(self) -> int:
+        return len(self.__tiles)
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    def __len__(self) -> int:
+        return self.__shape[0]
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        dense = self[:, :, :]
+        return dense if dtype is None else dense.astype(dtype, copy=False)
+
+    def __eq__(self, other: Any) -> np.ndarray:
+        return np.asarray(self) == np.asarray(other)
+
+    def __ne__(self, other: Any) -> np.ndarray:
+        return np.asarray(self) != np.asarray(other)
+
+    def __repr__(self) -> str:
+        return (
+            f"TiledMask(shape={self.__shape}, tile={self.__tile}, built={self.tiles_built}, "
+            f"resident={self.resident_tiles}, on_disk={self.on_disk})"
+        )
+
+    def __path(self, key: Key) -> Path:
+        return self.__directory / f"tile_{key[0]}_{key[1]}.npy"
+
+    def __bounds(self, key: Key) -> Tuple[slice, slice]:
+        return tuple(
+            slice(k * self.__tile, min((k + 1) * self.__tile, n))
+            for k, n in zip(key, self.__shape[:2])
+        )
+
+    def __get(self, key: Key) -> np.ndarray:
+        with self.__lock:
+            tile = self.__building.get(key)
+            if tile is not None:
+                return tile
+            tile = self.__tiles.get(key)
+            if tile is not None:
+                self.__tiles.move_to_end(key)
+                return tile
+
+            if key in self.__built:
+                tile = np.load(self.__path(key), mmap_mode="r+")
+                self.__store(key, tile)
+                return tile
+
+            xs, ys = self.__bounds(key)
+            shape = (xs.stop - xs.start, ys.stop - ys.start, self.__shape[2])
+            if self.__directory is None:
+                tile = np.full(shape, self.__fill, dtype=np.uint8)
+            else:
+                tile = np.lib.format.open_memmap(self.__path(key), mode="w+", dtype=np.uint8, shape=shape)
+                tile[:] = self.__fill
+            self.__building[key] = tile
+            try:
+                self.__builder(xs, ys)
+            finally:
+                del self.__building[key]
+            self.__built.add(key)
+            self.__store(key, tile)
+            return tile
+
+    def __store(self, key: Key, tile: np.ndarray) -> None:
+        self.__tiles[key] = tile
+        if self.__max_tiles is None:
+            return
+        while len(self.__tiles) > self.__max_tiles:
+            self.__tiles.popitem(last=False)[1].flush()
+            self.__evictions += 1
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__tiles.clear()
+            self.__built.clear()
+
+    def flush(self) -> None:
+        with self.__lock:
+            for tile in self.__tiles.values():
+                if isinstance(tile, np.memmap):
+                    tile.flush()
+
+    def voxel(self, x: int, y: int, z: int) -> int:
+        tile = self.__get((x // self.__tile, y // self.__tile))
+        return int(tile[x % self.__tile, y % self.__tile, z])
+
+    def __normalize(self, key: Any) -> Tuple[Any, Any, Any, Tuple[bool, bool, bool]]:
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            raise TypeError("Tiled mask does not support Ellipsis indexing")
+        key = key + (slice(None),) * (3 - len(key))
+        parts, scalar = [], []
+        for k, n in zip(key, self.__shape):
+            if isinstance(k, (int, np.integer)):
+                k = int(k) + n if k < 0 else int(k)
+                parts.append(slice(k, k + 1))
+                scalar.append(True)
+            elif isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                if step != 1:
+                    raise TypeError("Tiled mask only supports unit-step slices")
+                parts.append(slice(start, max(start, stop)))
+                scalar.append(False)
+            else:
+                parts.append(np.asarray(k, dtype=np.int64))
+                scalar.append(False)
+        return parts[0], parts[1], parts[2], tuple(scalar)
+
+    def __blocks(self, xs: slice, ys: slice) -> Iterator[Tuple[np.ndarray, Tuple[slice, slice], Tuple[slice, slice]]]:
+        t = self.__tile
+        for i in range(xs.start // t, -(-xs.stop // t)):
+            for j in range(ys.start // t, -(-ys.stop // t)):
+                x0, x1 = max(xs.start, i * t), min(xs.stop, (i + 1) * t)
+                y0, y1 = max(ys.start, j * t), min(ys.stop, (j + 1) * t)
+                yield (
+                    self.__get((i, j)),
+                    (slice(x0 - i * t, x1 - i * t), slice(y0 - j * t, y1 - j * t)),
+                    (slice(x0 - xs.start, x1 - xs.start), slice(y0 - ys.start, y1 - ys.start)),
+                )
+
+    def __groups(self, xs: np.ndarray, ys: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        if xs.shape != ys.shape:
+            raise TypeError("Tiled mask needs paired x and y index arrays")
+        xs = np.where(xs < 0, xs + self.__shape[0], xs)
+        ys = np.where(ys < 0, ys + self.__shape[1], ys)
+        keys = (xs // self.__tile) * self.__counts[1] + ys // self.__tile
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order], prepend=-1))
+        for start, stop in zip(bounds, [*bounds[1:], order.shape[0]]):
+            rows = order[start:stop]
+            tile = self.__get(divmod(int(keys[rows[0]]), self.__counts[1]))
+            yield tile, rows, xs[rows] % self.__tile, ys[rows] % self.__tile
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        kx, ky, kz, scalar = self.__normalize(key)
+        depth = np.empty(self.__shape[2])[kz].shape
+        if isinstance(kx, np.ndarray) or isinstance(ky, np.ndarray):
+            out = np.empty(np.broadcast(kx, ky).shape + depth, dtype=np.uint8)
+            for tile, rows, lx, ly in self.__groups(*np.broadcast_arrays(kx, ky)):
+                out[rows] = tile[lx, ly, kz]
+            return out[..., 0] if scalar[2] else out
+
+        out = np.empty((kx.stop - kx.start, ky.stop - ky.start) + depth, dtype=np.uint8)
+        for tile, local, target in self.__blocks(kx, ky):
+            out[target] = tile[local + (kz,)]
+        return out[tuple(0 if s else slice(None) for s in scalar)]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        kx, ky, kz, scalar = self.__normalize(key)
+        depth = np.empty(self.__shape[2])[kz].shape
+        value = np.asarray(value)
+        if isinstance(kx, np.ndarray) or isinstance(ky, np.ndarray):
+            kx, ky = np.broadcast_arrays(kx, ky)
+            full = kx.shape + depth
+            value = np.broadcast_to(value, full[:-1] if scalar[2] else full).reshape(full)
+            for tile, rows, lx, ly in self.__groups(kx, ky):
+                tile[lx, ly, kz] = value[rows]
+            return
+
+        full = (kx.stop - kx.start, ky.stop - ky.start) + depth
+        squeezed = tuple(n for n, s in zip(full, scalar) if not s)
+        value = np.broadcast_to(value, squeezed).reshape(full)
+        for tile, local, target in self.__blocks(kx, ky):
+            tile[local + (kz,)] = value[target]
+
+    def free_indices(self) -> np.ndarray:
+        chunks = []
+        for i in range(self.__counts[0]):
+            for j in range(self.__counts[1]):
+                xs, ys = self.__bounds((i, j))
+                chunks.append(np.argwhere(self.__get((i, j)) == 0) + (xs.start, ys.start, 0))
+        if not chunks:
+            return np.empty((0, 3), dtype=np.intp)
+
+        free_idx = np.concatenate(chunks)
+        order = np.argsort(np.ravel_multi_index(tuple(free_idx.T), self.__shape), kind="stable")
+        return free_idx[order]
@@ -0,0 +1,280 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, List, Tuple
+import numpy as np
+from building_model import BuildingModel
+from config import Config
+from profiler import Profiler
+from raster import Rasterizer
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+
+class VisibilityRouter:
+    EPS = 1e-6
+    CHUNK = 1 << 22
+
+    def __init__(self, building: BuildingModel, config: Config, bend_cost: float = 1e-3) -> None:
+        if bend_cost <= 0:
+            raise ValueError(f"Bend cost must be > 0, got {bend_cost}")
+        ceiling = building.ceiling
+        self.__z: float = float(ceiling.vertices[:, 2].max())
+        self.__margin: float = config.width / 2
+        self.__bend_cost: float = bend_cost
+        self.__triangles: np.ndarray = Rasterizer.triangles(ceiling.vertices, ceiling.faces)
+        if self.__triangles.shape[0] == 0:
+            raise ValueError("Ceiling mesh has no faces")
+        self.__walls: np.ndarray = self.__outline(self.__triangles)
+
+        clearance = config.offset + self.__margin
+        self.__boxes: np.ndarray = np.array([
+            np.concatenate((
+                obstacle.vertices[:, :2].min(axis=0) - clearance,
+                obstacle.vertices[:, :2].max(axis=0) + clearance,
+            ))
+            for obstacle in building.obstacles
+            if obstacle.vertices.size
+        ]).reshape(-1, 4)
+
+        corners = self.__walls.reshape(-1, 2)
+        self.__lines: Tuple[np.ndarray, np.ndarray] = tuple(
+            np.concatenate((
+                self.__boxes[:, [axis, axis + 2]].ravel(),
+                corners[:, axis] - self.__margin,
+                corners[:, axis] + self.__margin,
+            ))
+            for axis in range(2)
+        )
+        self.__expanded: int = 0
+
+    @property
+    def walls(self) -> np.ndarray:
+        return self.__walls
+
+    @property
+    def boxes(self) -> np.ndarray:
+        return self.__boxes
+
+    @property
+    def expanded_nodes(self) -> int:
+        return self.__expanded
+
+    @staticmethod
+    def __outline(tris: np.ndarray) -> np.ndarray:
+        vertices = np.unique(tris.reshape(-1, 2), axis=0)
+        walls = []
+        for tri, is_open in zip(tris, Rasterizer.open_edges(tris)):
+            for k in np.flatnonzero(is_open):
+                a, b = tri[k], tri[(k + 1) % 3]
+                d = b - a
+                length = float(np.hypot(*d))
+                t = ((vertices - a) @ d) / length ** 2
+                off = np.abs(d[0] * (vertices[:, 1] - a[1]) - d[1] * (vertices[:, 0] - a[0])) / length
+                inner = t[(off < VisibilityRouter.EPS) & (t > 0) & (t < 1)]
+                cuts = np.concatenate(([0.0], np.sort(inner), [1.0]))
+                for t0, t1 in zip(cuts[:-1], cuts[1:]):
+                    walls.append((a + t0 * d, a + t1 * d))
+        if not walls:
+            return np.empty((0, 2, 2))
+        walls = np.array(walls)
+
+        d = walls[:, 1] - walls[:, 0]
+        normal = np.column_stack((-d[:, 1], d[:, 0])) / np.hypot(d[:, 0], d[:, 1])[:, None]
+        middle = walls.mean(axis=1)
+        shift = 1e3 * VisibilityRouter.EPS
+        inner = (
+            VisibilityRouter.__covered(tris, middle + shift * normal)
+            & VisibilityRouter.__covered(tris, middle - shift * normal)
+        )
+
+        return walls[~inner]
+
+    @staticmethod
+    def __covered(tris: np.ndarray, points: np.ndarray) -> np.ndarray:
+        covered = np.zeros(points.shape[0], dtype=bool)
+        step = max(1, VisibilityRouter.CHUNK // max(tris.shape[0], 1))
+        for i in range(0, points.shape[0], step):
+            p = points[i:i + step, None, :]
+            inside = np.ones((p.shape[0], tris.shape[0]), dtype=bool)
+            for k in range(3):
+                a, b = tris[:, k], tris[:, (k + 1) % 3]
+                edge = (b[:, 0] - a[:, 0]) * (p[..., 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (p[..., 0] - a[:, 0])
+                inside &= edge >= -VisibilityRouter.EPS * np.hypot(*(b - a).T)
+            covered[i:i + step] = inside.any(axis=1)
+        return covered
+
+    @staticmethod
+    def __point_distance(p: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        d = b - a
+        length = (d * d).sum(axis=-1)
+        t = np.clip(((p - a) * d).sum(axis=-1) / np.where(length > 0, length, 1), 0, 1)
+        return np.linalg.norm(p - a - t[..., None] * d, axis=-1)
+
+    @staticmethod
+    def __side(a: np.ndarray, b: np.ndarray, p: np.ndarray) -> np.ndarray:
+        return (b[..., 0] - a[..., 0]) * (p[..., 1] - a[..., 1]) - (b[..., 1] - a[..., 1]) * (p[..., 0] - a[..., 0])
+
+    def __clear(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        clear = np.ones(a.shape[0], dtype=bool)
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        boxes = self.__boxes
+        if boxes.shape[0]:
+            step = max(1, self.CHUNK // boxes.shape[0])
+            for i in range(0, a.shape[0], step):
+                l, h = lo[i:i + step, None, :], hi[i:i + step, None, :]
+                clear[i:i + step] = ~(
+                    (l[..., 0] < boxes[:, 2] - self.EPS) & (h[..., 0] > boxes[:, 0] + self.EPS)
+                    & (l[..., 1] < boxes[:, 3] - self.EPS) & (h[..., 1] > boxes[:, 1] + self.EPS)
+                ).any(axis=1)
+
+        walls = self.__walls
+        if walls.shape[0]:
+            p, q = walls[:, 0], walls[:, 1]
+            step = max(1, self.CHUNK // walls.shape[0])
+            for i in range(0, a.shape[0], step):
+                s, e = a[i:i + step, None, :], b[i:i + step, None, :]
+                distance = np.minimum.reduce([
+                    self.__point_distance(s, p, q),
+                    self.__point_distance(e, p, q),
+                    self.__point_distance(p, s, e),
+                    self.__point_distance(q, s, e),
+                ])
+                crossing = (
+                    (self.__side(s, e, p) * self.__side(s, e, q) < 0)
+                    & (self.__side(p, q, s) * self.__side(p, q, e) < 0)
+                )
+                distance[crossing] = -1.0
+                clear[i:i + step] &= distance.min(axis=1) >= self.__margin - self.EPS
+
+        return clear
+
+    def __free(self, points: np.ndarray) -> np.ndarray:
+        free = self.__covered(self.__triangles, points)
+        free[free] = self.__clear(points[free], points[free])
+        return free
+
+    def contains(self, point: np.ndarray) -> bool:
+        return bool(self.__free(np.asarray(point, dtype=float)[None, :2])[0])
+
+    def prepare(self) -> None:
+        return None
+
+    def __axis_lines(self, axis: int, extra: np.ndarray) -> np.ndarray:
+        lines = np.unique(np.round(np.concatenate((self.__lines[axis], extra)), 6))
+        lo = self.__triangles[:, :, axis].min() + self.__margin - self.EPS
+        hi = self.__triangles[:, :, axis].max() - self.__margin + self.EPS
+        return lines[(lines >= lo) & (lines <= hi)]
+
+    def __graph(self, endpoints: np.ndarray) -> Tuple[np.ndarray, csr_matrix]:
+        from scipy.sparse import csr_matrix
+
+        xs = self.__axis_lines(0, endpoints[:, 0])
+        ys = self.__axis_lines(1, endpoints[:, 1])
+        gx, gy = np.meshgrid(xs, ys, indexing="ij")
+        nodes = np.column_stack((gx.ravel(), gy.ravel()))
+        free = self.__free(nodes)
+        ids = np.arange(nodes.shape[0]).reshape(xs.shape[0], ys.shape[0])
+        n = nodes.shape[0]
+
+        rows, cols, weights = [], [], []
+        for layer, (a, b) in enumerate(((ids[:-1, :], ids[1:, :]), (ids[:, :-1], ids[:, 1:]))):
+            a, b = a.ravel(), b.ravel()
+            keep = free[a] & free[b]
+            a, b = a[keep], b[keep]
+            keep = self.__clear(nodes[a], nodes[b])
+            a, b = a[keep], b[keep]
+            rows.append(a + layer * n)
+            cols.append(b + layer * n)
+            weights.append(np.abs(nodes[b] - nodes[a]).sum(axis=1))
+        turns = np.flatnonzero(free)
+        rows.append(turns)
+        cols.append(turns + n)
+        weights.append(np.full(turns.shape[0], self.__bend_cost))
+
+        rows, cols, weights = map(np.concatenate, (rows, cols, weights))
+        graph = csr_matrix((weights, (rows, cols)), shape=(2 * n, 2 * n))
+        profiler = Profiler.active()
+        profiler.record("visibility_nodes", int(free.sum()))
+        profiler.record("visibility_edges", int(rows.shape[0] - turns.shape[0]))
+
+        return nodes, graph
+
+    def __node(self, nodes: np.ndarray, point: np.ndarray) -> int:
+        return int(np.argmin(np.abs(nodes - np.round(point[:2], 6)).sum(axis=1)))
+
+    def __trace(self, nodes: np.ndarray, predecessors: np.ndarray, state: int) -> np.ndarray:
+        n = nodes.shape[0]
+        states = [state]
+        while predecessors[states[-1]] >= 0:
+            states.append(int(predecessors[states[-1]]))
+        points = nodes[np.array(states[::-1]) % n]
+        points = points[np.r_[True, np.any(points[1:] != points[:-1], axis=1)]]
+        if points.shape[0] > 2:
+            d = np.diff(points, axis=0)
+            turn = (d[:-1, 0] != 0) != (d[1:, 0] != 0)
+            points = points[np.r_[True, turn, True]]
+        return np.column_stack((points, np.full(points.shape[0], self.__z)))
+
+    def __search(
+        self, source_point: np.ndarray, target_points: List[np.ndarray]
+    ) -> List[np.ndarray | None]:
+        from scipy.sparse.csgraph import dijkstra
+
+        profiler = Profiler.active()
+        endpoints = np.array([np.asarray(p, dtype=float)[:2] for p in [source_point, *target_points]])
+        with profiler.stage("graph"):
+            nodes, graph = self.__graph(endpoints)
+        n = nodes.shape[0]
+        source = self.__node(nodes, endpoints[0])
+        with profiler.stage("search"):
+            dist, predecessors, _ = dijkstra(
+                graph, directed=False, indices=[source, source + n], min_only=True, return_predecessors=True
+            )
+            self.__expanded = int(np.isfinite(dist).sum())
+            profiler.count("nodes_settled", self.__expanded)
+
+        paths: List[np.ndarray | None] = []
+        for point in endpoints[1:]:
+            target = self.__node(nodes, point)
+            state = target if dist[target] <= dist[target + n] else target + n
+            paths.append(None if not np.isfinite(dist[state]) else self.__trace(nodes, predecessors, state))
+        return paths
+
+    def find_path(self, source_point: np.ndarray, target_point: np.ndarray) -> np.ndarray:
+        if not self.contains(source_point):
+            raise ValueError(
+                f"Source point {source_point} is inside an obstacle or out of grid bounds"
+            )
+        if not self.contains(target_point):
+            raise ValueError(
+                f"Target point {target_point} is inside an obstacle or out of grid bounds"
+            )
+        path_points = self.__search(source_point, [target_point])[0]
+        if path_points is None:
+            raise ValueError("Path not found")
+        Profiler.active().count("path_length", float(np.abs(np.diff(path_points, axis=0)).sum()))
+
+        return path_points
+
+    def find_paths(
+        self, source_point: np.ndarray, target_points: List[np.ndarray]
+    ) -> List[np.ndarray | None]:
+        if not self.contains(source_point):
+            raise ValueError(
+                f"Source point {source_point} is inside an obstacle or out of grid bounds"
+            )
+        reachable = [i for i, point in enumerate(target_points) if self.contains(point)]
+        paths: List[np.ndarray | None] = [None] * len(target_points)
+        if reachable:
+            found = self.__search(source_point, [target_points[i] for i in reachable])
+            for i, path_points in zip(reachable, found):
+                paths[i] = path_points
+        return paths
+
+    def find_nets(
+        self,
+        pairs: List[Tuple[np.ndarray, np.ndarray]],
+        capacity: int = 2,
+        max_iterations: int = 50,
+    ) -> Tuple[List[np.ndarray | None], List[int]]:
+        raise ValueError("Negotiated routing needs a voxel grid, it is not supported by the visibility router")
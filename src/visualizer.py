@@ -1,40 +1,73 @@
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Tuple
 import numpy as np
 import pyvista as pv
-import trimesh
 from cablegeometry import CableGeometry
+from mesh import Mesh
 
 
 class Visualizer:
     def __init__(self) -> None:
         self.__plotter: pv.Plotter = pv.Plotter()
-        self.__ceiling_actor = None
+        self.__ceiling_actors: List = []
         self.__obstacle_actors: List = []
-        self.__cable_actors: List = []
+        self.__cable_actor = None
+        self.__cable_boxes: List[np.ndarray] = []
+        self.__cable_colors: List[np.ndarray] = []
+        self.__point_groups: Dict[Tuple[str, float], List[np.ndarray]] = {}
+        self.__dirty: bool = False
 
     @property
     def plotter(self) -> pv.Plotter:
+        self.__flush()
         return self.__plotter
 
+    @staticmethod
+    def merge(meshes: Iterable[Mesh]) -> pv.PolyData:
+        vertices = []
+        faces = []
+        offset = 0
+        for mesh in meshes:
+            mesh_faces = np.asarray(mesh.faces)
+            vertices.append(np.asarray(mesh.vertices, dtype=float))
+            faces.append(np.column_stack((
+                np.full(mesh_faces.shape[0], mesh_faces.shape[1]), mesh_faces + offset
+            )).ravel())
+            offset += vertices[-1].shape[0]
+        if not vertices:
+            return pv.PolyData()
+
+        return pv.PolyData(np.concatenate(vertices), np.concatenate(faces))
+
+    @staticmethod
+    def boxes(centers: np.ndarray, sizes: np.ndarray) -> pv.PolyData:
+        points, sides = CableGeometry.box_mesh(centers, sizes)
+        faces = np.column_stack((np.full(sides.shape[0], 4), sides)).ravel()
+
+        return pv.PolyData(points, faces)
+
     def add_ceiling(
         self,
-        mesh: trimesh.Trimesh,
+        mesh: Mesh,
         color: str = "lightgray",
         opacity: float = 0.3
     ) -> None:
-        self.__ceiling_actor = self.__plotter.add_mesh(
-            mesh, color=color, opacity=opacity
-        )
+        actor = self.__plotter.add_mesh(self.merge([mesh]), color=color, opacity=opacity)
+        self.__ceiling_actors.append(actor)
 
     def add_obstacles(
         self,
-        meshes: Iterable[trimesh.Trimesh],
+        meshes: Iterable[Mesh],
         color: str = "orange",
-        opacity: float = 0.7
+        opacity: float = 0.7,
+        max_faces: int | None = None
     ) -> None:
-        for mesh in meshes:
-            actor = self.__plotter.add_mesh(mesh, color=color, opacity=opacity)
-            self.__obstacle_actors.append(actor)
+        merged = self.merge(meshes)
+        if merged.n_cells == 0:
+            return
+        if max_faces is not None and merged.n_cells > max_faces:
+            merged = merged.triangulate().decimate(1 - max_faces / merged.n_cells)
+        actor = self.__plotter.add_mesh(merged, color=color, opacity=opacity)
+        self.__obstacle_actors.append(actor)
 
     def add_cable(
         self,
@@ -44,11 +77,14 @@ class Visualizer:
         color: str = "red"
     ) -> None:
         boxes = CableGeometry.generate_cable_boxes(path_points, width, height)
+        if boxes.shape[0] == 0:
+            return
 
-        for box in boxes:
-            cube = pv.Cube(**box)
-            self.__plotter.add_mesh(cube, color=color)
-            self.__cable_actors.append(cube)
+        self.__cable_boxes.append(boxes)
+        self.__cable_colors.append(
+            np.tile(pv.Color(color).int_rgb, (len(boxes) * len(CableGeometry.SIDES), 1)).astype(np.uint8)
+        )
+        self.__dirty = True
 
     def add_points(
         self,
@@ -56,20 +92,39 @@ class Visualizer:
         color: str = "red",
         radius: float = 50.0
     ) -> None:
-        for pt in points:
-            self.__plotter.add_mesh(
-                pv.Sphere(radius=radius, center=pt),
-                color=color
+        group = self.__point_groups.setdefault((color, radius), [])
+        group.extend(np.asarray(pt, dtype=float) for pt in points)
+        self.__dirty = True
+
+    def __flush(self) -> None:
+        if not self.__dirty:
+            return
+        self.__dirty = False
+
+        if self.__cable_boxes:
+            boxes = np.concatenate(self.__cable_boxes)
+            mesh = self.boxes(boxes["center"], boxes["size"])
+            mesh.cell_data["colors"] = np.concatenate(self.__cable_colors)
+            self.__cable_actor = self.__plotter.add_mesh(
+                mesh, scalars="colors", rgb=True, name="cables"
+            )
+
+        for i, ((color, radius), points) in enumerate(self.__point_groups.items()):
+            glyphs = pv.PolyData(np.array(points)).glyph(
+                geom=pv.Sphere(radius=radius), scale=False, orient=False
             )
+            self.__plotter.add_mesh(glyphs, color=color, name=f"points-{i}")
 
     def add_key_events(self) -> None:
-        if self.__ceiling_actor:
+        self.__flush()
+        if self.__ceiling_actors:
             self.__plotter.add_key_event(
                 "1",
                 lambda: (
-                    self.__ceiling_actor.SetVisibility(
-                        not self.__ceiling_actor.GetVisibility()
-                    ),
+                    [
+                        actor.SetVisibility(not actor.GetVisibility())
+                        for actor in self.__ceiling_actors
+                    ],
                     self.__plotter.render(),
                 ),
             )
@@ -86,11 +141,23 @@ class Visualizer:
                 ),
             )
 
+        if self.__cable_actor:
+            self.__plotter.add_key_event(
+                "3",
+                lambda: (
+                    self.__cable_actor.SetVisibility(
+                        not self.__cable_actor.GetVisibility()
+                    ),
+                    self.__plotter.render(),
+                ),
+            )
+
         self.__plotter.add_text(
-            "1 - Ceiling\n2 - Obstacles",
+            "1 - Ceiling\n2 - Obstacles\n3 - Cables",
             position="upper_left",
             font_size=10
         )
 
     def show(self) -> None:
+        self.__flush()
         self.__plotter.show()
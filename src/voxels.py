@@ -0,0 +1,104 @@
+from typing import List, Tuple
+import numpy as np
+from tiled_mask import TiledMask
+
+
+class VoxelSpace:
+    def __init__(self, mask: np.ndarray) -> None:
+        self.__shape: Tuple[int, int, int] = tuple(int(n) for n in mask.shape)
+        nx, ny, nz = self.__shape
+        self.__row: int = (ny // 8 + 1) * 8
+        self.__layer: int = (nx + 1) * self.__row
+        self.__blocked_layer: bytes = self.__pack(np.ones((nx, ny), dtype=bool))
+        self.__free_layer: bytes = self.__pack(np.zeros((nx, ny), dtype=bool))
+        self.__layers: List[bytes] = [self.__blocked_layer]
+        for z in range(nz):
+            self.__layers.append(self.__pack_layer(np.asarray(mask[:, :, z]) != 0))
+        self.__layers.append(self.__blocked_layer)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.__shape
+
+    @property
+    def strides(self) -> Tuple[int, int, int]:
+        return self.__row, 1, self.__layer
+
+    def __pack(self, blocked: np.ndarray) -> bytes:
+        padded = np.ones((self.__shape[0] + 1, self.__row), dtype=bool)
+        padded[:blocked.shape[0], :blocked.shape[1]] = blocked
+        return np.packbits(padded, axis=1).tobytes()
+
+    def __pack_layer(self, blocked: np.ndarray) -> bytes:
+        if blocked.all():
+            return self.__blocked_layer
+        if not blocked.any():
+            return self.__free_layer
+        return self.__pack(blocked)
+
+    def update(self, mask: np.ndarray, rows: slice) -> None:
+        x0, x1, _ = rows.indices(self.__shape[0])
+        width = self.__row // 8
+        for z in range(self.__shape[2]):
+            padded = np.ones((x1 - x0, self.__row), dtype=bool)
+            padded[:, :self.__shape[1]] = np.asarray(mask[x0:x1, :, z]) != 0
+            chunk = np.packbits(padded, axis=1).tobytes()
+            layer = self.__layers[z + 1]
+            if layer[x0 * width:x1 * width] == chunk:
+                continue
+            patched = bytearray(layer)
+            patched[x0 * width:x1 * width] = chunk
+            self.__layers[z + 1] = bytes(patched)
+
+    def index(self, x: int, y: int, z: int) -> int:
+        return (z + 1) * self.__layer + x * self.__row + y
+
+    def coords(self, state: int) -> Tuple[int, int, int]:
+        z, rest = divmod(state, self.__layer)
+        x, y = divmod(rest, self.__row)
+        return x, y, z - 1
+
+    def free(self, state: int) -> bool:
+        layer = self.__layers[state // self.__layer]
+        bit = state % self.__layer
+        return not (layer[bit >> 3] >> (7 - (bit & 7))) & 1
+
+
+class TiledVoxelSpace:
+    def __init__(self, mask: TiledMask, axis: int | None = None, key: int = 0) -> None:
+        self.__mask: TiledMask = mask
+        shape = list(mask.shape)
+        self.__origin: List[int] = [0, 0, 0]
+        if axis is not None:
+            shape[axis] = 1
+            self.__origin[axis] = key
+        self.__shape: Tuple[int, int, int] = tuple(shape)
+        self.__row: int = self.__shape[1] + 1
+        self.__layer: int = (self.__shape[0] + 1) * self.__row
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.__shape
+
+    @property
+    def strides(self) -> Tuple[int, int, int]:
+        return self.__row, 1, self.__layer
+
+    def update(self, mask: TiledMask, rows: slice) -> None:
+        return None
+
+    def index(self, x: int, y: int, z: int) -> int:
+        return (z + 1) * self.__layer + x * self.__row + y
+
+    def coords(self, state: int) -> Tuple[int, int, int]:
+        z, rest = divmod(state, self.__layer)
+        x, y = divmod(rest, self.__row)
+        return x, y, z - 1
+
+    def free(self, state: int) -> bool:
+        x, y, z = self.coords(state)
+        nx, ny, nz = self.__shape
+        if x >= nx or y >= ny or z < 0 or z >= nz:
+            return False
+        ox, oy, oz = self.__origin
+        return self.__mask.voxel(x + ox, y + oy, z + oz) == 0
@@ -0,0 +1,97 @@
+import json
+import pytest
+import numpy as np
+from src.batch import BatchRouter
+from src.exporter import RouteExporter
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from test.test_pathfinder import SimpleBuilding, SimpleConfig
+
+
+@pytest.fixture
+def pathfinder():
+    grid = Grid(SimpleBuilding(), SimpleConfig())
+    grid.obstacle_mask[:] = 1
+    grid.obstacle_mask[:, :, 5] = 0
+    grid.obstacle_mask[5, 5, 5] = 1
+    return PathFinder(grid)
+
+
+def flat(x, y, storey=1):
+    return np.array([x, y, 5.0 * storey])
+
+
+def test_read_pairs(tmp_path):
+    pairs_path = tmp_path / "pairs.csv"
+    pairs_path.write_text("# header\n1,1,8,8\n\n2.5,3,4,5\n", encoding="utf-8")
+    pairs = BatchRouter.read_pairs(pairs_path)
+    assert len(pairs) == 2
+    assert np.all(pairs[1][0] == [2.5, 3])
+    assert np.all(pairs[1][1] == [4, 5])
+
+
+def test_read_pairs_with_storeys(tmp_path):
+    pairs_path = tmp_path / "pairs.csv"
+    pairs_path.write_text("1,1,0,8,8,2\n", encoding="utf-8")
+    pairs = BatchRouter.read_pairs(pairs_path)
+    assert np.all(pairs[0][0] == [1, 1, 0])
+    assert np.all(pairs[0][1] == [8, 8, 2])
+
+
+@pytest.mark.parametrize("line", ["1,1,8", "1,1,0,8,8", "1,1,0.5,8,8,1"])
+def test_read_pairs_invalid_line(tmp_path, line):
+    pairs_path = tmp_path / "pairs.csv"
+    pairs_path.write_text(f"{line}\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="pairs.csv:1"):
+        BatchRouter.read_pairs(pairs_path)
+
+
+def test_route_keeps_input_order(pathfinder, tmp_path):
+    pairs = [
+        (np.array([1, 1]), np.array([8, 8])),
+        (np.array([2, 2]), np.array([1, 1])),
+        (np.array([1, 1]), np.array([5, 5])),
+        (np.array([1, 1]), np.array([1, 2])),
+    ]
+    results = BatchRouter(pathfinder, flat).route(pairs)
+    assert [r["target"][:2] for r in results] == [[8, 8], [1, 1], [5, 5], [1, 2]]
+    assert results[0]["length"] == 14
+    assert results[1]["length"] == 2
+    assert results[2]["error"] == "Target point is inside an obstacle or out of grid bounds"
+    assert results[3]["path"] == [[1, 1, 5], [1, 2, 5]]
+
+    output_path = tmp_path / "results.json"
+    RouteExporter(1).write(results, output_path)
+    routes = json.loads(output_path.read_text(encoding="utf-8"))
+    assert [route["target"] for route in routes] == [r["target"] for r in results]
+    assert routes[2] == results[2]
+    assert routes[3]["path"] == results[3]["path"]
+    assert routes[3]["bends"] == 0
+
+
+def test_route_with_workers(pathfinder):
+    pairs = [(np.array([1, 1]), np.array([8, 8])), (np.array([8, 1]), np.array([1, 8]))]
+    serial = BatchRouter(pathfinder, flat).route(pairs)
+    parallel = BatchRouter(pathfinder, flat, workers=2).route(pairs)
+    assert serial == parallel
+
+
+def test_route_resolves_storeys(pathfinder):
+    pairs = [
+        (np.array([1, 1, 1]), np.array([8, 8, 1])),
+        (np.array([1, 1, 0]), np.array([8, 8, 1])),
+        (np.array([1, 1]), np.array([8, 8])),
+    ]
+    results = BatchRouter(pathfinder, flat).route(pairs)
+    assert results[0]["length"] == 14
+    assert results[1]["source"] == [1, 1, 0]
+    assert results[1]["error"] == "Source point is inside an obstacle or out of grid bounds"
+    assert results[2] == results[0]
+
+
+@pytest.mark.parametrize("capacity", [1, 2])
+def test_negotiated_route_flags_congestion(pathfinder, capacity):
+    pairs = [(np.array([1, 1]), np.array([8, 8])), (np.array([8, 1]), np.array([1, 8]))]
+    results = BatchRouter(pathfinder, flat, capacity=capacity, max_iterations=3).route(pairs)
+    assert all(result["length"] == 14 for result in results)
+    assert [result.get("congested", False) for result in results] == [capacity == 1] * 2
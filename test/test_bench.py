@@ -0,0 +1,63 @@
+import copy
+import pytest
+import numpy as np
+from bench.benchmark import STAGES, cases, compare, run
+from bench.generator import BuildingGenerator
+from src.loader import Loader
+from src.raster import Rasterizer
+
+
+def ceiling_area(tmp_path, shape):
+    ceiling, _ = Loader(BuildingGenerator(1000, 500, shape, ducts=0).write(tmp_path / f"{shape}.json")).load()
+    tris = Rasterizer.triangles(ceiling.vertices, ceiling.faces)
+    return int(Rasterizer.fill(tris, np.arange(0, 1001, 10.0), np.arange(0, 501, 10.0)).sum())
+
+
+def test_generated_shapes(tmp_path):
+    areas = {shape: ceiling_area(tmp_path, shape) for shape in BuildingGenerator.SHAPES}
+    assert areas["rectangle"] > areas["sloped"] > areas["sloped_cutout"]
+    assert areas["rectangle"] > areas["cutout"] > areas["sloped_cutout"]
+
+
+@pytest.mark.parametrize("orientation, axis", [("x", 0), ("y", 1)])
+def test_generated_ducts(tmp_path, orientation, axis):
+    building = BuildingGenerator(20000, 10000, ducts=5, orientation=orientation, seed=3)
+    ceiling, obstacles = Loader(building.write(tmp_path / "model.json")).load()
+    assert len(obstacles) == 5
+    source, target = building.endpoints()
+    for duct in obstacles:
+        extent = np.ptp(duct.vertices, axis=0)
+        assert extent[axis] > extent[1 - axis]
+        assert duct.vertices[:, 2].max() < ceiling.vertices[:, 2].max()
+        lo, hi = duct.vertices[:, :2].min(axis=0), duct.vertices[:, :2].max(axis=0)
+        assert not np.all((source >= lo) & (source <= hi))
+        assert not np.all((target >= lo) & (target <= hi))
+
+
+def test_run_and_compare():
+    building = BuildingGenerator(3000, 1500, "cutout", ducts=2)
+    case = {
+        "name": "tiny",
+        "building": building,
+        "config": {"grid": {"cell_size": 50, "orientation": "xy"}, "cable": {"width": 50}},
+    }
+    current = run([case], repeat=1)
+    result = current["cases"]["tiny"]
+    assert tuple(result["stages"]) == STAGES
+    assert result["counts"]["path_length"] >= 2700
+    assert compare(current, current) == []
+
+    slower = copy.deepcopy(current)
+    slower["cases"]["tiny"]["stages"]["find_path"]["seconds"] += 1.0
+    regressions = compare(current, slower)
+    assert len(regressions) == 1 and regressions[0].startswith("tiny find_path seconds")
+
+
+def test_thread_cases():
+    names = [case["name"] for case in cases(["small"], ["rectangle"], [20], "dijkstra", [1, 4])]
+    assert names == ["small-rectangle-20mm-dijkstra", "small-rectangle-20mm-dijkstra-4threads"]
+
+
+def test_unknown_shape():
+    with pytest.raises(ValueError, match="Building shape must be one of"):
+        BuildingGenerator(shape="round")
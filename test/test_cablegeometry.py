@@ -0,0 +1,32 @@
+import numpy as np
+from src.cablegeometry import CableGeometry
+
+
+def test_straight_path_is_one_box():
+    path = np.column_stack((np.arange(0, 1000, 10), np.zeros(100), np.full(100, 5)))
+    boxes = CableGeometry.generate_cable_boxes(path, width=4, height=2)
+    assert boxes.dtype == CableGeometry.BOX_DTYPE
+    assert boxes.shape == (1,)
+    assert np.allclose(boxes["center"][0], [495, 0, 5])
+    assert np.allclose(boxes["size"][0], [990, 4, 2])
+
+
+def test_turns_add_corner_boxes():
+    path = np.array([
+        [0, 0, 0], [10, 0, 0], [20, 0, 0], [20, 10, 0], [20, 20, 0], [20, 20, 10], [20, 20, 20],
+    ], dtype=float)
+    boxes = CableGeometry.generate_cable_boxes(path, width=4, height=2)
+    assert np.allclose(boxes["center"], [[10, 0, 0], [20, 0, 0], [20, 10, 0], [20, 20, 10]])
+    assert np.allclose(boxes["size"], [[20, 4, 2], [4, 4, 2], [4, 20, 2], [2, 4, 20]])
+
+
+def test_runs_skip_repeated_points():
+    path = np.array([[0, 0, 0], [0, 0, 0], [10, 0, 0], [10, 0, 0], [10, 10, 0]], dtype=float)
+    assert CableGeometry.runs(path).tolist() == [0, 3, 4]
+    assert CableGeometry.generate_cable_boxes(path[:1], width=4).shape == (0,)
+
+
+def test_sparse_polyline_gets_every_corner():
+    path = np.array([[0, 0, 0], [100, 0, 0], [100, 50, 0], [200, 50, 0]], dtype=float)
+    boxes = CableGeometry.generate_cable_boxes(path, width=4, height=2)
+    assert np.allclose(boxes["center"], [[50, 0, 0], [100, 0, 0], [100, 25, 0], [100, 50, 0], [150, 50, 0]])
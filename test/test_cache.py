@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from src.cache import GridCache
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from test.test_pathfinder import SimpleBuilding
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(step=1, offset=0, width=0, orientation="xyz", mask="dense", threads=1, tile_size=256)
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "model.json"
+    path.write_text("[]", encoding="utf-8")
+    return path
+
+
+def build(config):
+    grid = Grid(SimpleBuilding(), config)
+    grid.obstacle_mask[:] = 0
+    grid.obstacle_mask[3:7, 2:8, :3] = 1
+    return grid, PathFinder(grid)
+
+
+def test_key_depends_on_model_and_config(model_path, config):
+    key = GridCache.key(model_path, config)
+    assert key == GridCache.key(model_path, config)
+    assert key != GridCache.key(model_path, SimpleNamespace(**{**vars(config), "step": 2}))
+    assert key != GridCache.key(model_path, SimpleNamespace(**{**vars(config), "orientation": "xy"}))
+    assert key != GridCache.key(model_path, SimpleNamespace(**{**vars(config), "mask": "slab"}))
+    model_path.write_text("[ ]", encoding="utf-8")
+    assert key != GridCache.key(model_path, config)
+
+
+def test_key_depends_on_cache_version(model_path, config, monkeypatch):
+    key = GridCache.key(model_path, config)
+    monkeypatch.setattr(GridCache, "VERSION", GridCache.VERSION + 1)
+    assert key != GridCache.key(model_path, config)
+
+
+def test_store_and_load(tmp_path, model_path, config):
+    cache = GridCache(tmp_path / "cache", 1 << 30)
+    key = GridCache.key(model_path, config)
+    assert cache.load(key, SimpleBuilding(), config) is None
+
+    grid, pathfinder = build(config)
+    cache.store(key, grid, pathfinder)
+    cached_grid, cached_pathfinder = cache.load(key, SimpleBuilding(), config)
+
+    assert np.array_equal(cached_grid.obstacle_mask, grid.obstacle_mask)
+    assert np.array_equal(cached_grid.ceiling_mask, grid.ceiling_mask)
+    assert np.array_equal(cached_pathfinder.free_indices, pathfinder.free_indices)
+    assert (cached_pathfinder.adjacency != pathfinder.adjacency).nnz == 0
+    source = np.array([1, 1, 0])
+    target = np.array([8, 8, 1])
+    assert np.array_equal(
+        cached_pathfinder.find_path(source, target), pathfinder.find_path(source, target)
+    )
+
+    cached_grid.obstacle_mask[:] = 1
+    reloaded_grid, _ = cache.load(key, SimpleBuilding(), config)
+    assert np.array_equal(reloaded_grid.obstacle_mask, grid.obstacle_mask)
+
+
+def test_eviction_keeps_newest_entry(tmp_path, model_path, config):
+    grid, pathfinder = build(config)
+    probe = GridCache(tmp_path / "probe", 1 << 30)
+    probe.store("probe", grid, pathfinder)
+    entry_size = sum(f.stat().st_size for f in (tmp_path / "probe" / "probe").iterdir())
+
+    cache = GridCache(tmp_path / "cache", int(entry_size * 1.5))
+    cache.store("first", grid, pathfinder)
+    cache.store("second", grid, pathfinder)
+    assert cache.load("first", SimpleBuilding(), config) is None
+    assert cache.load("second", SimpleBuilding(), config) is not None
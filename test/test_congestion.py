@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+from src.config import Config
+from src.congestion import NegotiatedRouter
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from src.voxels import VoxelSpace
+from test.test_pathfinder import SimpleBuilding, SimpleConfig
+
+
+def plane(free_cells, shape):
+    mask = np.ones(shape + (1,), dtype=np.uint8)
+    for x, y in free_cells:
+        mask[x, y, 0] = 0
+    return VoxelSpace(mask)
+
+
+def cells(space, path):
+    return {space.coords(state)[:2] for state in path}
+
+
+def test_negotiation_moves_the_flexible_net():
+    ring = [(x, y) for x in range(7) for y in (0, 4)] + [(x, y) for x in (0, 6) for y in range(5)]
+    space = plane(ring, (7, 5))
+    nets = [
+        (space.index(0, 2, 0), space.index(6, 2, 0)),
+        (space.index(1, 4, 0), space.index(5, 4, 0)),
+    ]
+    router = NegotiatedRouter(space, capacity=1)
+    first, second = router.route(nets)
+    assert router.congested == []
+    assert len(second) == 5
+    assert len(first) == 11
+    assert not cells(space, first) & cells(space, second)
+
+
+@pytest.mark.parametrize("capacity, congested", [(1, [0, 1]), (2, [])])
+def test_crossing_needs_capacity(capacity, congested):
+    space = plane([(1, 0), (0, 1), (1, 1), (2, 1), (1, 2)], (3, 3))
+    nets = [
+        (space.index(0, 1, 0), space.index(2, 1, 0)),
+        (space.index(1, 0, 0), space.index(1, 2, 0)),
+    ]
+    router = NegotiatedRouter(space, capacity=capacity, max_iterations=5)
+    paths = router.route(nets)
+    assert all(len(path) == 3 for path in paths)
+    assert router.congested == congested
+    assert router.iterations == (5 if congested else 1)
+
+
+def test_radius_keeps_cables_apart():
+    space = plane([(x, y) for x in range(10) for y in range(7)], (10, 7))
+    nets = [
+        (space.index(0, 2, 0), space.index(9, 2, 0)),
+        (space.index(0, 3, 0), space.index(9, 3, 0)),
+    ]
+    router = NegotiatedRouter(space, capacity=1, radius=2)
+    first, second = router.route(nets)
+    assert router.congested == []
+    middle = [space.coords(state) for state in second if 2 < space.coords(state)[0] < 7]
+    assert middle and all(abs(y - 2) > 2 for _, y, _ in middle)
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError, match="Capacity"):
+        NegotiatedRouter(plane([(0, 0)], (1, 1)), capacity=0)
+
+
+def test_default_capacity_lets_two_nets_share_a_corridor(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("{}", encoding="utf-8")
+    assert Config(path).capacity == 2
+
+    space = plane([(x, 0) for x in range(6)], (6, 1))
+    nets = [
+        (space.index(0, 0, 0), space.index(5, 0, 0)),
+        (space.index(1, 0, 0), space.index(4, 0, 0)),
+    ]
+    router = NegotiatedRouter(space, max_iterations=3)
+    assert [len(path) for path in router.route(nets)] == [6, 4]
+    assert router.congested == []
+
+    grid = Grid(SimpleBuilding(), SimpleConfig())
+    grid.obstacle_mask[:] = 1
+    grid.obstacle_mask[:, 5, 0] = 0
+    pairs = [
+        (np.array([0, 5, 0]), np.array([10, 5, 0])),
+        (np.array([1, 5, 0]), np.array([9, 5, 0])),
+    ]
+    paths, congested = PathFinder(grid).find_nets(pairs, max_iterations=3)
+    assert [len(path) for path in paths] == [11, 9]
+    assert congested == []
+    assert PathFinder(grid).find_nets(pairs, capacity=1, max_iterations=3)[1] == [0, 1]
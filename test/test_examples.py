@@ -0,0 +1,59 @@
+import re
+import pytest
+import numpy as np
+from pathlib import Path
+from src.batch import BatchRouter
+from src.building_model import BuildingModel
+from src.config import Config
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from src.storeys import StoreyRouter
+
+ROOT = Path(__file__).parent.parent
+README = (ROOT / "README.md").read_text(encoding="utf-8")
+EXAMPLES = [
+    (model, source, target)
+    for model, source, target in dict.fromkeys(
+        re.findall(r"--model data\\(\S+\.json) --source=(\S+) --target=(\S+?)(?:\s|$)", README)
+    )
+    if (ROOT / "data" / model).is_file()
+]
+BATCHES = list(dict.fromkeys(re.findall(r"--model data\\(\S+\.json) --batch data\\(\S+)", README)))
+
+
+def route(building, config):
+    def build(storey):
+        grid = Grid(storey, config)
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        return PathFinder(grid, config.algorithm)
+
+    return StoreyRouter(building, config.risers, build) if len(building.storeys) > 1 else build(building)
+
+
+def test_examples_are_found():
+    assert len(EXAMPLES) >= 8
+    assert BATCHES
+
+
+@pytest.mark.parametrize("model, source, target", EXAMPLES, ids=[model for model, _, _ in EXAMPLES])
+def test_readme_example_routes_with_shipped_config(model, source, target):
+    config = Config()
+    building = BuildingModel(ROOT / "data" / model)
+    x0, y0, *storey0 = map(float, source.split(","))
+    x1, y1, *storey1 = map(float, target.split(","))
+    source_point = building.point(x0, y0, *map(int, storey0))
+    target_point = building.point(x1, y1, *map(int, storey1))
+    path = route(building, config).find_path(source_point, target_point)
+    assert np.allclose(path[[0, -1]], [source_point, target_point], atol=config.step)
+
+
+@pytest.mark.parametrize("model, pairs", BATCHES)
+def test_readme_batch_example_routes_with_shipped_config(model, pairs):
+    config = Config()
+    building = BuildingModel(ROOT / "data" / model)
+    router = route(building, config)
+    for source, target in BatchRouter.read_pairs(ROOT / "data" / pairs):
+        (x0, y0, *storey0), (x1, y1, *storey1) = source, target
+        path = router.find_path(building.point(x0, y0, *map(int, storey0)), building.point(x1, y1, *map(int, storey1)))
+        assert np.allclose(path[[0, -1], :2], [source[:2], target[:2]], atol=config.step)
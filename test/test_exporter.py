@@ -0,0 +1,58 @@
+import csv
+import json
+import pytest
+import numpy as np
+from src.exporter import RouteExporter
+
+PATH = np.array([[0, 0, 5], [10, 0, 5], [20, 0, 5], [20, 10, 5], [20, 20, 5]], dtype=float)
+RESULTS = [
+    {"source": [0, 0, 5], "target": [20, 20, 5], "path": PATH},
+    {"source": [0, 0, 5], "target": [90, 90, 5], "error": "Path not found"},
+]
+
+
+def test_describe_route():
+    route = RouteExporter(width=4, height=2).describe(PATH)
+    assert route["length"] == 40
+    assert route["bends"] == 1
+    assert route["path"] == PATH.tolist()
+    assert [box["center"] for box in route["boxes"]] == [[10, 0, 5], [20, 0, 5], [20, 10, 5]]
+    assert route["boxes"][1]["size"] == [4, 4, 2]
+    assert RouteExporter.bends(PATH[:2]) == 0
+
+
+def test_write_json(tmp_path):
+    output_path = tmp_path / "routes.json"
+    RouteExporter(width=4).write(RESULTS, output_path)
+    routes = json.loads(output_path.read_text(encoding="utf-8"))
+    assert routes[0]["bends"] == 1
+    assert len(routes[0]["boxes"]) == 3
+    assert routes[1] == RESULTS[1]
+
+
+def test_write_csv(tmp_path):
+    output_path = tmp_path / "routes.csv"
+    RouteExporter(width=4).write(RESULTS, output_path)
+    with open(output_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(PATH) + 1
+    assert [float(rows[3][axis]) for axis in "xyz"] == [20, 10, 5]
+    assert rows[0]["length"] == "40.0" and rows[0]["bends"] == "1"
+    assert rows[-1]["route"] == "1" and rows[-1]["error"] == "Path not found"
+
+
+@pytest.mark.parametrize("suffix", [".ply", ".glb", ".gltf"])
+def test_write_mesh(tmp_path, suffix):
+    trimesh = pytest.importorskip("trimesh")
+    output_path = tmp_path / f"routes{suffix}"
+    RouteExporter(width=4).write(RESULTS, output_path)
+    mesh = trimesh.load(output_path, force="mesh")
+    assert mesh.faces.shape == (3 * 12, 3)
+    assert mesh.is_watertight
+
+
+def test_write_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported output format '.txt'"):
+        RouteExporter(width=4).write(RESULTS, tmp_path / "routes.txt")
+    with pytest.raises(ValueError, match="No routed cables"):
+        RouteExporter(width=4).write(RESULTS[1:], tmp_path / "routes.ply")
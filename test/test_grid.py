@@ -1,6 +1,10 @@
+import json
+import pickle
 import pytest
 import numpy as np
 from types import SimpleNamespace
+from bench.generator import BuildingGenerator
+from src.building_model import BuildingModel
 from src.grid import Grid
 
 
@@ -41,7 +45,9 @@ def simple_building():
 
 @pytest.fixture
 def config():
-    return SimpleNamespace(step=1, offset=2, width=1)
+    return SimpleNamespace(
+        step=1, offset=2, width=1, orientation="xyz", mask="dense", tile_size=8, memory_mb=1024, tile_dir=None, threads=1
+    )
 
 @pytest.fixture
 def grid(simple_building, config):
@@ -101,3 +107,151 @@ def test_mark_obstacles(grid):
     mask_outer = np.ones_like(mask_layer, dtype=bool)
     mask_outer[1:-1, 1:-1, 1:-1] = False
     assert np.all(mask_layer[mask_outer] == 0)
+
+def test_xy_orientation_keeps_ceiling_slab(simple_building, config):
+    config.orientation = "xy"
+    full = Grid(simple_building, SimpleNamespace(**{**vars(config), "orientation": "xyz"}))
+    grid = Grid(simple_building, config)
+    assert grid.obstacle_mask.shape == (21, 21, 1)
+    assert grid.nz == 0
+    assert grid.axes == (0, 1)
+    assert grid.grid_min[2] == full.grid_min[2] + full.nz * full.step
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    full.mark_ceiling()
+    full.mark_obstacles()
+    assert np.array_equal(grid.obstacle_mask[:, :, 0], full.obstacle_mask[:, :, full.nz])
+
+def test_invalid_orientation(simple_building, config):
+    config.orientation = "zx"
+    with pytest.raises(ValueError, match="Grid orientation"):
+        Grid(simple_building, config)
+
+def test_slab_mask_matches_dense(simple_building, config):
+    dense = Grid(simple_building, config)
+    config.mask = "slab"
+    slab = Grid(simple_building, config)
+    for grid in (dense, slab):
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+    assert slab.obstacle_mask.shape == dense.obstacle_mask.shape
+    assert np.array_equal(slab.obstacle_mask, dense.obstacle_mask)
+    assert slab.obstacle_mask.nbytes < dense.obstacle_mask.nbytes
+
+def test_invalid_mask(simple_building, config):
+    config.mask = "sparse"
+    with pytest.raises(ValueError, match="Grid mask"):
+        Grid(simple_building, config)
+
+def test_mark_obstacles_follows_diagonal_shape(simple_building, config):
+    diamond = SimpleNamespace(
+        vertices=np.array([
+            [10, 4, 3], [16, 10, 3], [10, 16, 3], [4, 10, 3],
+            [10, 4, 6], [16, 10, 6], [10, 16, 6], [4, 10, 6],
+        ], dtype=float),
+        faces=np.array([
+            [0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7],
+            [0, 1, 5], [0, 5, 4], [1, 2, 6], [1, 6, 5],
+            [2, 3, 7], [2, 7, 6], [3, 0, 4], [3, 4, 7],
+        ]),
+    )
+    simple_building.obstacles = [diamond]
+    config.offset = 0
+    grid = Grid(simple_building, config)
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    top = grid.obstacle_mask[:, :, grid.nz]
+    assert top[5, 5] == 0
+    assert top[15, 15] == 0
+    assert top[10, 10] == 1
+    assert np.all(grid.obstacle_mask[10, 10, 3:] == [0, *([1] * (grid.nz - 3))])
+
+def box(x0, y0, z0, x1, y1, z1):
+    return SimpleNamespace(vertices=np.array(
+        [[x, y, z] for z in (z0, z1) for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))],
+        dtype=float,
+    ))
+
+@pytest.mark.parametrize("mask", Grid.MASKS)
+def test_obstacle_edits_match_rebuild(simple_building, config, mask):
+    config.mask = mask
+    grid = Grid(simple_building, config)
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    added = box(13, 2, 1, 16, 6, 4)
+    region = grid.add_obstacle(added)
+    assert region == (slice(10, 20), slice(0, 10))
+    grid.move_obstacle(added, np.array([1.5, 8, 0]))
+    grid.remove_obstacle(simple_building.obstacles[0])
+    assert grid.obstacles == [added]
+
+    simple_building.obstacles = [added]
+    rebuilt = Grid(simple_building, config)
+    rebuilt.mark_ceiling()
+    rebuilt.mark_obstacles()
+    assert np.array_equal(grid.obstacle_mask, rebuilt.obstacle_mask)
+
+def test_remove_unknown_obstacle(grid):
+    with pytest.raises(ValueError, match="not part of the grid"):
+        grid.remove_obstacle(box(0, 0, 0, 1, 1, 1))
+
+@pytest.mark.parametrize("mask", ["dense", "slab"])
+def test_threaded_build_matches_serial(simple_building, config, mask, monkeypatch):
+    monkeypatch.setattr(Grid, "MIN_BUILD_TILE", 1)
+    simple_building.obstacles.append(box(12, 3, 2, 19, 7, 6))
+    config.mask = mask
+    serial = Grid(simple_building, config)
+    config.threads, config.tile_size = 3, 4
+    threaded = Grid(simple_building, config)
+    for grid in (serial, threaded):
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+    assert threaded.threads == 3
+    assert np.array_equal(threaded.ceiling_mask, serial.ceiling_mask)
+    assert np.array_equal(threaded.obstacle_mask, serial.obstacle_mask)
+
+@pytest.mark.parametrize("mask", ["dense", "slab"])
+def test_threaded_grid_pickles(tmp_path, config, mask):
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps(BuildingGenerator(3000, 1500, ducts=3, seed=1).objects()), encoding="utf-8")
+    config.step, config.offset, config.width, config.mask = 20, 100, 50, mask
+    serial = Grid(BuildingModel(path), config)
+    config.threads = 2
+    threaded = Grid(BuildingModel(path), config)
+    for grid in (serial, threaded):
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+    restored = pickle.loads(pickle.dumps(threaded))
+    assert np.array_equal(restored.obstacle_mask, serial.obstacle_mask)
+    assert np.array_equal(restored.ceiling_mask, serial.ceiling_mask)
+
+def test_invalid_threads(simple_building, config):
+    config.threads = 0
+    with pytest.raises(ValueError, match="Grid threads"):
+        Grid(simple_building, config)
+
+def prism(points, z0, z1):
+    n = len(points)
+    vertices = np.array([[x, y, z] for z in (z0, z1) for x, y in points], dtype=float)
+    faces = [[0, i + 1, i] for i in range(1, n - 1)] + [[n, n + i, n + i + 1] for i in range(1, n - 1)]
+    for i in range(n):
+        j = (i + 1) % n
+        faces += [[i, j, j + n], [j + n, i + n, i]]
+    return SimpleNamespace(vertices=vertices, faces=np.array(faces))
+
+def test_triangulated_shapes_follow_their_footprint(simple_building, config):
+    config.offset = 0
+    marked = {}
+    for name, obstacle in (
+        ("faceless", box(4, 4, 3, 12, 14, 6)),
+        ("cuboid", prism([(4, 4), (12, 4), (12, 14), (4, 14)], 3, 6)),
+        ("wedge", prism([(4, 4), (12, 4), (4, 14)], 3, 6)),
+    ):
+        simple_building.obstacles = [obstacle]
+        grid = Grid(simple_building, config)
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        marked[name] = np.asarray(grid.obstacle_mask)
+    assert np.array_equal(marked["cuboid"], marked["faceless"])
+    assert marked["faceless"][11, 13, 3] == 0
+    assert marked["wedge"][11, 13, 3] == 1
@@ -0,0 +1,78 @@
+import json
+import pytest
+import numpy as np
+from pathlib import Path
+from src.loader import Loader
+
+DATA = Path(__file__).parent.parent / "data"
+
+
+def box(x0, y0, z0, x1, y1, z1):
+    coords = [x0, y0, z0, x1, y0, z0, x1, y1, z0, x0, y1, z0,
+              x0, y0, z1, x1, y0, z1, x1, y1, z1, x0, y1, z1]
+    indices = [0, 1, 2, 2, 3, 0, 4, 5, 6, 6, 7, 4, 0, 1, 5, 5, 4, 0,
+               1, 2, 6, 6, 5, 1, 2, 3, 7, 7, 6, 2, 3, 0, 4, 4, 7, 3]
+    return {"Coords": coords, "Indices": indices}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+@pytest.mark.parametrize("path", sorted(DATA.glob("*.json")), ids=lambda p: p.stem)
+def test_streaming_matches_json_load(monkeypatch, path, chunk_size):
+    monkeypatch.setattr(Loader, "CHUNK_SIZE", chunk_size)
+    ceiling, obstacles = Loader(path).load()
+
+    with open(path, "r", encoding="utf-8") as f:
+        objects = json.load(f)
+    raw = [obj for obj in objects if "floor" not in obj.get("Category", "").lower()]
+    assert len(obstacles) == len(raw)
+    for mesh, obj in zip(obstacles, raw):
+        assert np.array_equal(mesh.vertices, np.reshape(obj["Coords"], (-1, 3)))
+    assert np.allclose(ceiling.vertices[ceiling.faces][:, :, 2], ceiling.vertices[:, 2].max())
+
+
+def test_ceiling_keeps_only_top_faces(tmp_path):
+    floor = {**box(0, 0, 0, 10, 10, 3), "Category": "Floors"}
+    duct = {**box(2, 2, 1, 4, 4, 2), "Category": "Ducts"}
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps([floor, duct], indent=2), encoding="utf-8")
+
+    ceiling, obstacles = Loader(path).load()
+    assert len(obstacles) == 1
+    assert ceiling.faces.tolist() == [[4, 5, 6], [6, 7, 4]]
+
+
+def test_floors_are_grouped_into_storeys(tmp_path):
+    objects = [
+        {**box(0, 0, 3500, 10, 10, 4000), "Category": "Floors"},
+        {**box(0, 0, 7500, 5, 10, 8000), "Category": "Floors"},
+        {**box(5, 0, 7600, 10, 10, 7900), "Category": "Floors"},
+        {**box(2, 2, 3000, 4, 4, 3200), "Category": "Ducts"},
+        {**box(6, 6, 2000, 7, 7, 7000), "Category": "Ducts"},
+    ]
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps(objects), encoding="utf-8")
+
+    loader = Loader(path)
+    ceiling, obstacles = loader.load()
+    assert len(obstacles) == 2
+    assert len(loader.storeys) == 2
+    assert loader.storeys[-1][0] is ceiling
+    assert [float(c.vertices[:, 2].max()) for c, _ in loader.storeys] == [4000, 8000]
+    assert [len(obs) for _, obs in loader.storeys] == [2, 1]
+    assert loader.storeys[1][1][0] is obstacles[1]
+
+
+OBJ = json.dumps(box(0, 0, 0, 1, 1, 1))
+
+
+@pytest.mark.parametrize("text, message", [
+    ('{"Coords": []}', "JSON root must be a list"),
+    (f'[{OBJ} {OBJ}]', "Invalid JSON format"),
+    (f'[{OBJ}, {OBJ}', "Invalid JSON format"),
+    ('[] []', "Invalid JSON format"),
+])
+def test_malformed_json(tmp_path, text, message):
+    path = tmp_path / "model.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        Loader(path).load()
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+from src.grid import Grid
+from src.octree import OctreeRouter
+from src.pathfinder import PathFinder
+from test.test_pathfinder import SimpleBuilding, SimpleConfig
+
+
+def build(size, orientation="xyz", seed=0, density=0.2):
+    grid = Grid(SimpleBuilding(size), SimpleConfig(orientation=orientation))
+    grid.obstacle_mask[:] = np.random.default_rng(seed).random(grid.obstacle_mask.shape) < density
+    return grid
+
+
+def covered(path, mask):
+    for a, b in zip(path[:-1].astype(int), path[1:].astype(int)):
+        axis = int(np.flatnonzero(a != b)[0])
+        for value in range(min(a[axis], b[axis]), max(a[axis], b[axis]) + 1):
+            cell = a.copy()
+            cell[axis] = value
+            if mask[tuple(cell)]:
+                return False
+    return True
+
+
+@pytest.mark.parametrize("size", [(10, 10, 5), (12, 7, 0), (20, 13, 6)])
+def test_leaves_tile_free_space(size):
+    grid = build(size)
+    lo, hi = OctreeRouter(grid).leaves
+    tiled = np.zeros(grid.obstacle_mask.shape, dtype=int)
+    for a, b in zip(lo, hi):
+        tiled[a[0]:b[0] + 1, a[1]:b[1] + 1, a[2]:b[2] + 1] += 1
+    assert np.array_equal(tiled, (grid.obstacle_mask == 0).astype(int))
+
+    router = OctreeRouter(grid)
+    free = [router.contains(grid.grid_min + cell * grid.step) for cell in np.ndindex(grid.obstacle_mask.shape)]
+    assert np.array_equal(np.reshape(free, grid.obstacle_mask.shape), grid.obstacle_mask == 0)
+
+
+def test_open_space_is_few_leaves():
+    grid = build((63, 31, 0), "xy", density=0)
+    router = OctreeRouter(grid)
+    assert router.leaves[0].shape[0] < 20
+    path = router.find_path(np.array([0, 5, 0]), np.array([60, 5, 0]))
+    assert path.tolist() == [[0, 5, 0], [60, 5, 0]]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_routes_are_free_and_near_optimal(seed):
+    grid = build((24, 24, 6), seed=seed)
+    grid.obstacle_mask[0, 0, 0] = grid.obstacle_mask[23, 23, 5] = 0
+    source, target = np.array([0, 0, 0]), np.array([23, 23, 5])
+    try:
+        expected = PathFinder(grid, "astar").find_path(source, target)
+    except ValueError:
+        pytest.skip("no route in this sample")
+    path = OctreeRouter(grid).find_path(source, target)
+    assert np.array_equal(path[0], source) and np.array_equal(path[-1], target)
+    assert covered(path, grid.obstacle_mask)
+    length = np.abs(np.diff(path, axis=0)).sum()
+    assert np.abs(np.diff(expected, axis=0)).sum() <= length <= 1.5 * np.abs(np.diff(expected, axis=0)).sum()
+
+
+def test_blocked_endpoints_and_planes():
+    grid = build((10, 10, 0), "xy", density=0)
+    grid.obstacle_mask[5, 5, 0] = 1
+    router = OctreeRouter(grid)
+    assert not router.contains(np.array([5, 5, 0]))
+    with pytest.raises(ValueError, match="Target point .* is inside an obstacle or out of grid bounds"):
+        router.find_path(np.array([0, 0, 0]), np.array([5, 5, 0]))
+    grid.obstacle_mask[:, 4, 0] = 1
+    with pytest.raises(ValueError, match="Path not found"):
+        OctreeRouter(grid).find_path(np.array([0, 0, 0]), np.array([9, 9, 0]))
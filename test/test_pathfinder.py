@@ -1,5 +1,7 @@
+import time
 import pytest
 import numpy as np
+from types import SimpleNamespace
 from src.grid import Grid
 from src.pathfinder import PathFinder
 
@@ -21,10 +23,16 @@ class SimpleBuilding:
 
 
 class SimpleConfig:
-    def __init__(self, step=1, offset=0, width=0):
+    def __init__(self, step=1, offset=0, width=0, orientation="xyz", mask="dense", tile_size=4, memory_mb=1024, threads=1):
         self.step = step
         self.offset = offset
         self.width = width
+        self.orientation = orientation
+        self.mask = mask
+        self.tile_size = tile_size
+        self.memory_mb = memory_mb
+        self.tile_dir = None
+        self.threads = threads
 
 
 @pytest.fixture
@@ -73,3 +81,229 @@ def test_no_path(grid):
     target = np.array([1, 1, 0])
     with pytest.raises(ValueError, match="Path not found"):
         pf.find_path(source, target)
+
+def test_path_is_shortest(pathfinder):
+    source = np.array([1, 2, 0])
+    target = np.array([8, 6, 3])
+    path = pathfinder.find_path(source, target)
+    assert path.shape[0] == np.abs(target - source).sum() + 1
+    steps = np.abs(np.diff(path, axis=0)).sum(axis=1)
+    assert np.all(steps == 1)
+
+def test_astar_matches_dijkstra(grid):
+    rng = np.random.default_rng(7)
+    grid.obstacle_mask[:] = (rng.random(grid.obstacle_mask.shape) < 0.3).astype(np.uint8)
+    grid.obstacle_mask[1, 1, 0] = 0
+    grid.obstacle_mask[9, 8, 4] = 0
+    source = np.array([1, 1, 0])
+    target = np.array([9, 8, 4])
+    expected = PathFinder(grid).find_path(source, target)
+    astar = PathFinder(grid, "astar")
+    path = astar.find_path(source, target)
+    assert path.shape == expected.shape
+    assert np.all(path[0] == source)
+    assert np.all(path[-1] == target)
+    assert np.all(np.abs(np.diff(path, axis=0)).sum(axis=1) == 1)
+    assert np.all(grid.obstacle_mask[tuple(path.astype(int).T)] == 0)
+    assert 0 < astar.expanded_nodes
+
+
+def test_astar_no_path(grid):
+    grid.obstacle_mask[:, 5, :] = 1
+    pf = PathFinder(grid, "astar")
+    with pytest.raises(ValueError, match="Path not found"):
+        pf.find_path(np.array([1, 1, 0]), np.array([1, 8, 0]))
+
+
+def test_astar_shares_one_search_per_source(grid):
+    rng = np.random.default_rng(3)
+    grid.obstacle_mask[:] = (rng.random(grid.obstacle_mask.shape) < 0.3).astype(np.uint8)
+    grid.obstacle_mask[1, 1, 0] = 0
+    grid.obstacle_mask[:2, 8:, 3:] = 1
+    grid.obstacle_mask[0, 9, 4] = 0
+    free = np.argwhere(grid.obstacle_mask == 0)
+    targets = [*free[rng.choice(len(free), 6, replace=False)], free[-1], np.array([0, 9, 4]), np.array([5, 5, 9])]
+    source = np.array([1, 1, 0])
+    expected = PathFinder(grid).find_paths(source, targets)
+    astar = PathFinder(grid, "astar")
+    paths = astar.find_paths(source, targets)
+    assert [path is None for path in paths] == [path is None for path in expected]
+    assert paths[-1] is None and paths[-2] is None
+    for target, path, shortest in zip(targets, paths, expected):
+        if path is not None:
+            assert path.shape == shortest.shape
+            assert np.all(path[[0, -1]] == [source, target])
+            assert np.all(np.abs(np.diff(path, axis=0)).sum(axis=1) == 1)
+            assert np.all(grid.obstacle_mask[tuple(path.astype(int).T)] == 0)
+
+
+def test_unknown_algorithm(grid):
+    with pytest.raises(ValueError, match="Unknown routing algorithm"):
+        PathFinder(grid, "bfs")
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_jps_matches_dijkstra(grid, seed):
+    rng = np.random.default_rng(seed)
+    grid.obstacle_mask[:] = (rng.random(grid.obstacle_mask.shape) < 0.25).astype(np.uint8)
+    grid.obstacle_mask[0, 0, 0] = 0
+    grid.obstacle_mask[10, 9, 5] = 0
+    source = np.array([0, 0, 0])
+    target = np.array([10, 9, 5])
+    try:
+        expected = PathFinder(grid).find_path(source, target)
+    except ValueError:
+        expected = None
+    jps = PathFinder(grid, "jps")
+    if expected is None:
+        with pytest.raises(ValueError, match="Path not found"):
+            jps.find_path(source, target)
+        return
+    path = jps.find_path(source, target)
+    assert path.shape == expected.shape
+    assert np.all(np.abs(np.diff(path, axis=0)).sum(axis=1) == 1)
+    assert np.all(grid.obstacle_mask[tuple(path.astype(int).T)] == 0)
+
+
+def test_jps_expands_fewer_nodes(grid):
+    source = np.array([0, 0, 0])
+    target = np.array([10, 10, 5])
+    astar = PathFinder(grid, "astar")
+    jps = PathFinder(grid, "jps")
+    assert len(jps.find_path(source, target)) == len(astar.find_path(source, target))
+    assert jps.expanded_nodes < astar.expanded_nodes
+
+
+def test_hpa_path_is_valid(grid):
+    grid.obstacle_mask[:, 5, :] = 1
+    grid.obstacle_mask[9, 5, 2] = 0
+    pf = PathFinder(grid, "hpa", cluster_size=4)
+    for source, target in (([1, 1, 0], [1, 8, 0]), ([0, 9, 4], [10, 0, 1])):
+        source = np.array(source)
+        target = np.array(target)
+        path = pf.find_path(source, target)
+        assert np.all(path[0] == source)
+        assert np.all(path[-1] == target)
+        assert np.all(np.abs(np.diff(path, axis=0)).sum(axis=1) == 1)
+        assert np.all(grid.obstacle_mask[tuple(path.astype(int).T)] == 0)
+        assert 0 < pf.expanded_nodes
+
+
+def test_hpa_no_path(grid):
+    grid.obstacle_mask[:, 5, :] = 1
+    pf = PathFinder(grid, "hpa", cluster_size=4)
+    with pytest.raises(ValueError, match="Path not found"):
+        pf.find_path(np.array([1, 1, 0]), np.array([1, 8, 0]))
+
+
+@pytest.mark.parametrize("algorithm", PathFinder.ALGORITHMS)
+def test_plane_orientation_stays_in_plane(algorithm):
+    grid = Grid(SimpleBuilding(), SimpleConfig(orientation="xz"))
+    grid.obstacle_mask[:] = 0
+    grid.obstacle_mask[5, :, :4] = 1
+    pf = PathFinder(grid, algorithm, cluster_size=4)
+    path = pf.find_path(np.array([1, 3, 0]), np.array([8, 3, 0]))
+    assert np.all(path[:, 1] == 3)
+    assert np.any(path[:, 2] == 4)
+    with pytest.raises(ValueError, match="same xz plane"):
+        pf.find_path(np.array([1, 3, 0]), np.array([8, 4, 0]))
+
+
+def test_xy_orientation_is_planar():
+    grid = Grid(SimpleBuilding(), SimpleConfig(orientation="xy"))
+    grid.obstacle_mask[:] = 0
+    pf = PathFinder(grid)
+    assert pf.free_indices.shape[0] == 11 * 11
+    assert pf.adjacency.nnz == 2 * 2 * 10 * 11
+    path = pf.find_path(np.array([1, 1, 5]), np.array([8, 8, 5]))
+    assert np.all(path[:, 2] == 5)
+
+
+@pytest.mark.parametrize("algorithm", ["dijkstra", "astar"])
+def test_slab_mask_routes_like_dense(algorithm):
+    rng = np.random.default_rng(11)
+    blocked = (rng.random((11, 11, 6)) < 0.3).astype(np.uint8)
+    blocked[1, 1, 0] = 0
+    blocked[9, 8, 4] = 0
+    grids = []
+    for mask in ("dense", "slab"):
+        grid = Grid(SimpleBuilding(), SimpleConfig(mask=mask))
+        grid.obstacle_mask[:] = blocked
+        grids.append(grid)
+    dense, slab = (PathFinder(grid, algorithm=algorithm) for grid in grids)
+    assert np.array_equal(slab.free_indices, dense.free_indices)
+    assert (slab.adjacency != dense.adjacency).nnz == 0
+    source = np.array([1, 1, 0])
+    target = np.array([9, 8, 4])
+    assert np.array_equal(slab.find_path(source, target), dense.find_path(source, target))
+    assert slab.contains(source) and not slab.contains(np.array([-1, 0, 0]))
+
+
+def box(x0, y0, z0, x1, y1, z1):
+    return SimpleNamespace(vertices=np.array(
+        [[x, y, z] for z in (z0, z1) for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))],
+        dtype=float,
+    ))
+
+
+@pytest.mark.parametrize("mask", Grid.MASKS)
+def test_update_repairs_tracked_routes(mask):
+    grid = Grid(SimpleBuilding(), SimpleConfig(orientation="xy", mask=mask))
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    pf = PathFinder(grid, "astar")
+    assert pf.adjacency.nnz > 0
+    source = np.array([1, 5, 5])
+    target = np.array([9, 5, 5])
+    route = pf.track(source, target)
+    assert len(pf.route(route)) == 9
+    searched = pf.expanded_nodes
+
+    aside = box(6.5, 8.5, 0, 9.5, 10.5, 5)
+    assert pf.update(grid.add_obstacle(aside)) == []
+    assert pf.expanded_nodes < searched
+    assert len(pf.route(route)) == 9
+
+    barrier = box(3.5, 1.5, 0, 6.5, 8.5, 5)
+    assert pf.update(grid.add_obstacle(barrier)) == [route]
+    fresh = PathFinder(grid, "astar")
+    assert np.array_equal(pf.free_indices, fresh.free_indices)
+    assert (pf.adjacency != fresh.adjacency).nnz == 0
+    path = pf.route(route)
+    assert len(path) == len(fresh.find_path(source, target))
+    assert np.all(np.abs(np.diff(path, axis=0)).sum(axis=1) == 1)
+    assert all(pf.contains(point) for point in path)
+
+    sealed = box(7.5, 3.5, 0, 10.5, 6.5, 5)
+    assert pf.update(grid.add_obstacle(sealed)) == [route]
+    with pytest.raises(ValueError, match="has no path"):
+        pf.route(route)
+
+    assert pf.update(grid.remove_obstacle(sealed)) == [route]
+    assert pf.update(grid.remove_obstacle(barrier)) == [route]
+    assert len(pf.route(route)) == 9
+    pf.untrack(route)
+    with pytest.raises(ValueError, match="Unknown route"):
+        pf.route(route)
+
+
+@pytest.mark.parametrize("mask", ["dense", "slab"])
+def test_update_cost_does_not_grow_with_volume(mask):
+    def edit_seconds(size):
+        grid = Grid(SimpleBuilding((size, size, 5)), SimpleConfig(mask=mask))
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        pf = PathFinder(grid)
+        pf.prepare()
+        duct = box(10.5, 10.5, 0, 14.5, 14.5, 3)
+        pf.update(grid.add_obstacle(duct))
+        seconds = []
+        for i in range(10):
+            region = grid.move_obstacle(duct, np.array([0, 1 - 2 * (i % 2), 0]))
+            start = time.perf_counter()
+            pf.update(region)
+            seconds.append(time.perf_counter() - start)
+        assert (pf.adjacency != PathFinder(grid).adjacency).nnz == 0
+        return min(seconds)
+
+    assert edit_seconds(300) < 4 * edit_seconds(30)
@@ -0,0 +1,59 @@
+import json
+import numpy as np
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from profiler import NullProfiler, Profiler
+from test.test_pathfinder import SimpleBuilding, SimpleConfig
+
+
+def test_disabled_profiler_is_shared_noop():
+    profiler = Profiler.active()
+    assert not profiler.enabled
+    assert isinstance(profiler, NullProfiler)
+    assert profiler.stage("a") is profiler.stage("b")
+    with profiler.stage("a"):
+        profiler.count("nodes")
+    assert profiler.report() == {"stages": {}, "counts": {}}
+
+
+def test_nested_stages_and_counts():
+    with Profiler() as profiler:
+        assert Profiler.active() is profiler
+        for _ in range(2):
+            with profiler.stage("route"):
+                with profiler.stage("search"):
+                    profiler.count("nodes_settled", 5)
+        profiler.record("grid_shape", [3, 3, 1])
+    assert isinstance(Profiler.active(), NullProfiler)
+    assert list(profiler.stages) == ["route/search", "route"]
+    assert profiler.stages["route"]["calls"] == 2
+    assert profiler.stages["route"]["seconds"] >= profiler.stages["route/search"]["seconds"]
+    assert profiler.counts == {"nodes_settled": 10, "grid_shape": [3, 3, 1]}
+
+
+def test_memory_peaks_include_children():
+    with Profiler(memory=True) as profiler:
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                block = np.ones(1 << 20)
+            del block
+    assert profiler.stages["outer/inner"]["peak_bytes"] >= 8 << 20
+    assert profiler.stages["outer"]["peak_bytes"] >= profiler.stages["outer/inner"]["peak_bytes"]
+
+
+def test_pipeline_reports_stages(tmp_path):
+    with Profiler() as profiler:
+        grid = Grid(SimpleBuilding(), SimpleConfig())
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        grid.obstacle_mask[:, :, 5] = 0
+        path = PathFinder(grid).find_path(np.array([0, 0, 5]), np.array([9, 9, 5]))
+    assert {"ceiling_mask", "mark_ceiling", "mark_obstacles", "graph", "search"} <= set(profiler.stages)
+    assert profiler.counts["grid_shape"] == [11, 11, 6]
+    assert profiler.counts["free_nodes"] == 121
+    assert profiler.counts["graph_edges"] == 220
+    assert profiler.counts["path_length"] == np.abs(np.diff(path, axis=0)).sum() == 18
+
+    output_path = tmp_path / "profile.json"
+    profiler.write(output_path)
+    assert json.loads(output_path.read_text(encoding="utf-8"))["counts"]["free_nodes"] == 121
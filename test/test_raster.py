@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+from pathlib import Path
+from src.raster import Rasterizer
+
+DATA = Path(__file__).parent.parent / "data"
+
+
+def test_shared_diagonal_is_inside_and_outline_is_not():
+    vertices = np.array([[0, 0, 5], [4, 0, 5], [4, 4, 5], [0, 4, 5]], dtype=float)
+    faces = np.array([[0, 1, 2], [0, 3, 2]])
+    xs = ys = np.arange(5, dtype=float)
+    inside = Rasterizer.fill(Rasterizer.triangles(vertices, faces), xs, ys)
+    expected = np.zeros((5, 5), dtype=bool)
+    expected[1:4, 1:4] = True
+    assert np.array_equal(inside, expected)
+
+
+def test_degenerate_faces_are_skipped():
+    vertices = np.array([[0, 0, 0], [2, 2, 0], [4, 4, 0]], dtype=float)
+    tris = Rasterizer.triangles(vertices, [np.array([0, 1, 2])])
+    assert tris.shape == (0, 3, 2)
+    assert not Rasterizer.fill(tris, np.arange(5.0), np.arange(5.0)).any()
+
+
+@pytest.mark.parametrize("step", [10.0, 25.0])
+@pytest.mark.parametrize("path", sorted(DATA.glob("*.json")), ids=lambda p: p.stem)
+def test_matches_shapely_on_models(path, step):
+    shapely = pytest.importorskip("shapely")
+    from src.loader import Loader
+
+    ceiling, _ = Loader(path).load()
+    lo = ceiling.vertices[:, :2].min(axis=0)
+    hi = ceiling.vertices[:, :2].max(axis=0)
+    xs = lo[0] + np.arange(int((hi[0] - lo[0]) // step) + 1) * step
+    ys = lo[1] + np.arange(int((hi[1] - lo[1]) // step) + 1) * step
+
+    merged = shapely.unary_union([shapely.Polygon(ceiling.vertices[face, :2]) for face in ceiling.faces])
+    xx, yy = np.meshgrid(xs, ys, indexing="ij")
+    expected = shapely.contains_xy(merged, xx, yy)
+
+    inside = Rasterizer.fill(Rasterizer.triangles(ceiling.vertices, ceiling.faces), xs, ys)
+    assert np.array_equal(inside, expected)
+
+
+def test_bottoms_take_lowest_surface_per_column():
+    tris = np.array([
+        [[0, 0, 5], [4, 0, 5], [4, 4, 5]],
+        [[0, 0, 5], [4, 4, 5], [0, 4, 5]],
+        [[0, 0, 2], [2, 0, 2], [2, 2, 4]],
+    ], dtype=float)
+    bottom = Rasterizer.bottoms(tris, np.zeros(3), 1.0, (6, 6))
+    assert np.all(np.isinf(bottom[5, :])) and np.all(np.isinf(bottom[:, 5]))
+    assert bottom[0, 0] == 2
+    assert bottom[1, 0] == 2
+    assert bottom[1, 1] == 3
+    assert bottom[3, 3] == 5
+    assert bottom[4, 4] == 5
+
+
+def test_vertical_triangle_bottom_ignores_vertex_order():
+    tri = np.array([[5, 5, 10], [5, 9, 0], [5, 1, 0]], dtype=float)
+    bottoms = [
+        Rasterizer.bottoms(np.roll(tri, shift, axis=0)[None], np.zeros(3), 1.0, (11, 11))
+        for shift in range(3)
+    ]
+    assert all(np.array_equal(bottom, bottoms[0]) for bottom in bottoms[1:])
+    assert bottoms[0][5, 5] == 0
+
+
+def test_boxes_match_their_triangles_when_grown():
+    boxes = np.array([[[2, 3, 4], [5, 4, 6]], [[9, 9, 1], [11, 10, 2]]], dtype=float)
+    tris = np.concatenate([
+        [[[x0, y0, z], [x1, y0, z], [x1, y1, z]], [[x0, y0, z], [x1, y1, z], [x0, y1, z]]]
+        for (x0, y0, z), (x1, y1, _) in boxes
+    ])
+    shape, window = (14, 14), (4, 1, 12, 9)
+    as_boxes = Rasterizer.bottoms(np.empty((0, 3, 3)), np.zeros(3), 1.0, shape, window=window, boxes=boxes, grow=2)
+    as_tris = Rasterizer.bottoms(tris, np.zeros(3), 1.0, shape, window=window, grow=2)
+    assert np.array_equal(as_boxes, as_tris)
+    full = Rasterizer.bottoms(tris, np.zeros(3), 1.0, shape, grow=2)
+    assert np.array_equal(as_tris, full[4:12, 1:9])
+    assert as_boxes[0, 0] == 4 and as_boxes[5, 7] == 1
@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import pytest
+from bench.generator import BuildingGenerator
+from src.config import Config
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from src.server import ModelCache, RouteServer
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(json.dumps({
+        "grid": {"cell_size": 50, "orientation": "xy"},
+        "cable": {"width": 50},
+        "routing": {"algorithm": "astar"},
+        "server": {"max_models": 2, "workers": 4},
+    }), encoding="utf-8")
+    return Config(path)
+
+
+@pytest.fixture
+def models(tmp_path):
+    return [BuildingGenerator(3000, 1500, ducts=2, seed=i).write(tmp_path / f"model{i}.json") for i in range(3)]
+
+
+class CountingBuilder:
+    def __init__(self):
+        self.built = []
+
+    def __call__(self, model_path, building, config):
+        self.built.append(model_path)
+        grid = Grid(building, config)
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        return PathFinder(grid, config.algorithm)
+
+
+def test_cache_reuses_models(config, models):
+    builder = CountingBuilder()
+    cache = ModelCache(builder, capacity=2)
+    first = cache.get(models[0], config)
+    second = cache.get(models[0], config)
+    assert (first[2], second[2]) == (False, True)
+    assert second[1] is first[1]
+
+    os.utime(models[0], ns=(0, 0))
+    assert cache.get(models[0], config)[2] is False
+    assert cache.stats == {"models": 1, "hits": 1, "misses": 2, "evictions": 1}
+
+    cache.get(models[1], config)
+    cache.get(models[0], config)
+    cache.get(models[2], config)
+    assert cache.get(models[0], config)[2] is True
+    assert cache.get(models[1], config)[2] is False
+    assert len(builder.built) == 5
+
+
+def test_failed_build_is_not_cached(config, tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("[]", encoding="utf-8")
+    cache = ModelCache(CountingBuilder())
+    for _ in range(2):
+        with pytest.raises(ValueError, match="No floor meshes"):
+            cache.get(broken, config)
+    assert cache.stats["misses"] == 2
+
+
+def test_serve_json_lines(config, models):
+    builder = CountingBuilder()
+    server = RouteServer(config, builder)
+    requests = [
+        {"id": i, "model": str(models[0]), "source": [200, 750], "target": [2800, 750]} for i in range(6)
+    ]
+    lines = [json.dumps(request) for request in requests]
+    lines += ["", "[1]", json.dumps({"id": "bad", "model": str(models[0]), "source": [200, 750]})]
+    output = io.StringIO()
+    server.serve(lines, output)
+
+    responses = {r["id"]: r for r in map(json.loads, output.getvalue().splitlines())}
+    assert len(builder.built) == 1
+    assert sorted(r["cache"] for i, r in responses.items() if isinstance(i, int)) == ["hit"] * 5 + ["miss"]
+    assert len({json.dumps(responses[i]["path"]) for i in range(6)}) == 1
+    assert responses[0]["length"] >= 2600
+    assert responses[None]["error"] == "Invalid request: Request must be a JSON object, got list"
+    assert responses["bad"]["error"] == "Request is missing 'target'"
+    assert server.handle({"id": 7, "command": "stats"})["hits"] == 6
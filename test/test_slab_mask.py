@@ -0,0 +1,83 @@
+import numpy as np
+from src.slab_mask import SlabMask
+
+
+def test_new_mask_is_blocked_and_uniform():
+    mask = SlabMask((4, 5, 6))
+    assert mask.shape == (4, 5, 6)
+    assert mask.nbytes == 0
+    assert np.all(np.asarray(mask) == 1)
+
+
+def test_indexing_matches_numpy():
+    rng = np.random.default_rng(3)
+    dense = np.ones((7, 11, 5), dtype=np.uint8)
+    mask = SlabMask(dense.shape)
+    writes = [
+        ((slice(None), slice(None), 2), 0),
+        ((3, slice(2, 9), slice(1, None)), 0),
+        ((slice(1, 4), slice(None), 4), 1),
+        ((slice(None), slice(None), 0), (rng.random((7, 11)) < 0.5).astype(np.uint8)),
+        ((5, 5, 3), 0),
+        ((slice(None), slice(None), slice(None)), 0),
+        ((slice(2, 6), slice(3, 8), slice(0, 4)), 1),
+    ]
+    for key, value in writes:
+        dense[key] = value
+        mask[key] = value
+        assert np.array_equal(mask, dense)
+
+    reads = [
+        (slice(None), slice(None), 2),
+        (4, slice(None), slice(None)),
+        (slice(1, -1), 3, slice(None, None, 2)),
+        (2, 4, 1),
+        (slice(None), slice(None), slice(3, 3)),
+        (slice(4, 5), slice(None), slice(None)),
+    ]
+    for key in reads:
+        assert np.array_equal(mask[key], dense[key])
+
+    idx = (np.array([0, 3, 6]), np.array([1, 5, 10]), np.array([4, 0, 4]))
+    assert np.array_equal(mask[idx], dense[idx])
+    mask[idx] = 0
+    dense[idx] = 0
+    assert np.array_equal(mask, dense)
+
+    columns = (np.array([1, 1, 6, -1]), np.array([0, 7, 3, 2]), slice(2, None))
+    mask[columns] = 1
+    dense[columns] = 1
+    assert np.array_equal(mask, dense)
+
+
+def test_uniform_layers_are_not_stored():
+    mask = SlabMask((8, 8, 4))
+    mask[:, :, 3] = 0
+    mask[2, 2, 3] = 1
+    assert mask.packed_layers == 1
+    mask[2, 2, 3] = 0
+    mask[:, :, 3] = mask[:, :, 3]
+    assert mask.packed_layers == 0
+
+
+def test_free_indices_match_argwhere():
+    rng = np.random.default_rng(5)
+    dense = (rng.random((6, 9, 4)) < 0.4).astype(np.uint8)
+    dense[:, :, 1] = 0
+    dense[:, :, 2] = 1
+    mask = SlabMask.from_dense(dense)
+    assert np.array_equal(mask.free_indices(), np.argwhere(dense == 0))
+
+
+def test_fancy_columns_keep_requested_layer_order():
+    rng = np.random.default_rng(8)
+    dense = (rng.random((6, 9, 7)) < 0.5).astype(np.uint8)
+    mask = SlabMask(dense.shape)
+    mask[:, :, :] = dense
+    for k2 in (slice(None, None, -1), slice(5, 1, -2), slice(1, 6, 2), slice(-2, None), slice(3, 3)):
+        xs, ys = rng.integers(0, 6, 5), rng.integers(-9, 9, 5)
+        assert np.array_equal(mask[xs, ys, k2], dense[xs, ys, k2])
+        value = (rng.random(dense[xs, ys, k2].shape) < 0.5).astype(np.uint8)
+        mask[xs, ys, k2] = value
+        dense[xs, ys, k2] = value
+        assert np.array_equal(mask, dense)
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+SRC = Path(__file__).parent.parent / "src"
+IMPORT_BUDGET = 0.5
+DEFERRED = ("pyvista", "vtk", "trimesh", "scipy.ndimage", "scipy.sparse", "hpa")
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], cwd=SRC, capture_output=True, text=True, check=True)
+
+
+def test_cli_defers_heavy_imports():
+    loaded = run("-c", "import sys, main; print(' '.join(sys.modules))").stdout.split()
+    assert [name for name in DEFERRED if name in loaded] == []
+
+
+def test_loader_builds_plain_meshes():
+    code = (
+        "import sys; from pathlib import Path; from loader import Loader; "
+        "ceiling, obstacles = Loader(Path(sys.argv[1])).load(); "
+        "print(type(ceiling).__name__, 'trimesh' in sys.modules)"
+    )
+    model = SRC.parent / "data" / "потолок_и_вентиляция.json"
+    assert run("-c", code, str(model)).stdout.split() == ["Mesh", "False"]
+
+
+def test_cli_import_time_budget():
+    best = float("inf")
+    for _ in range(3):
+        lines = run("-X", "importtime", "-c", "import main").stderr.splitlines()
+        cumulative = [int(line.split("|")[1]) for line in lines if line.rstrip().endswith("| main")]
+        if not cumulative:
+            pytest.skip("-X importtime output not available")
+        best = min(best, cumulative[0] / 1e6)
+    assert best < IMPORT_BUDGET, f"importing main took {best:.3f}s, budget is {IMPORT_BUDGET}s"
@@ -0,0 +1,114 @@
+import json
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from bench.generator import BuildingGenerator
+from src.building_model import BuildingModel
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from src.storeys import StoreyRouter
+
+CONFIG = SimpleNamespace(step=20, offset=100, width=50, orientation="xy", mask="dense", threads=1, tile_size=256)
+
+
+@pytest.fixture
+def building(tmp_path):
+    objects = []
+    for i in range(3):
+        slab = (3530 + 4000 * i, 4000 + 4000 * i)
+        objects += BuildingGenerator(3000, 1500, ducts=3, seed=i, slab=slab).objects()
+    path = tmp_path / "model.json"
+    path.write_text(json.dumps(objects), encoding="utf-8")
+    return BuildingModel(path)
+
+
+@pytest.fixture(params=PathFinder.ALGORITHMS)
+def build(request):
+    def build(storey):
+        grid = Grid(storey, CONFIG)
+        grid.mark_ceiling()
+        grid.mark_obstacles()
+        return PathFinder(grid, request.param)
+
+    return build
+
+
+def length(path_points):
+    return float(np.abs(np.diff(path_points, axis=0)).sum())
+
+
+def test_floors_are_split_into_storeys(building):
+    assert [storey.elevation for storey in building.storeys] == [4000, 8000, 12000]
+    assert [storey.floor for storey in building.storeys] == [None, 4000, 8000]
+    assert [len(storey.obstacles) for storey in building.storeys] == [3, 3, 3]
+    assert building.storeys[1].get_bounds_z(100) == (7030, 8000)
+    assert building.storeys[1].get_bounds_z(5000) == (4000, 8000)
+    assert building.ceiling is building.storeys[2].ceiling
+    assert building.storey_at(8000.0) is building.storeys[1]
+    assert building.point(1, 2, 0).tolist() == [1, 2, 4000]
+    with pytest.raises(ValueError, match="No storey ceiling"):
+        building.storey_at(5000.0)
+    with pytest.raises(ValueError, match="Storey must be in"):
+        building.point(1, 2, 3)
+
+
+def test_same_storey_builds_only_that_storey(building, build):
+    router = StoreyRouter(building, [], build)
+    source, target = building.point(150, 750, 1), building.point(2850, 750, 1)
+    path = router.find_path(source, target)
+    assert router.built == [1]
+    assert np.array_equal(path, build(building.storeys[1]).find_path(source, target))
+
+
+@pytest.mark.parametrize("source, target", [(0, 1), (1, 0), (0, 2)])
+def test_cross_storey_route_only_builds_crossed_storeys(building, build, source, target):
+    router = StoreyRouter(building, [(2800, 200), (200, 1300), (1500, 750)], build)
+    path = router.find_path(building.point(150, 750, source), building.point(2850, 750, target))
+    assert router.built == list(range(min(source, target), max(source, target) + 1))
+
+    rise = np.flatnonzero(np.diff(path[:, 2]) != 0)
+    assert len(rise) == abs(target - source)
+    assert np.array_equal(path[rise, :2], path[rise + 1, :2])
+    assert np.all(np.any(path[1:] != path[:-1], axis=1))
+
+
+def test_cross_storey_route_takes_the_cheapest_riser(building, build):
+    risers = [(2800, 200), (200, 1300), (1500, 750)]
+    router = StoreyRouter(building, risers, build)
+    source_point, target_point = building.point(150, 750, 0), building.point(2850, 750, 1)
+    path = router.find_path(source_point, target_point)
+
+    shafts = router.shafts(0, 1)
+    assert 0 < len(shafts) < len(risers)
+    lengths = [
+        length(router.router(0).find_path(source_point, np.array([*riser, 4000])))
+        + length(router.router(1).find_path(np.array([*riser, 8000]), target_point))
+        for riser in shafts
+    ]
+    assert length(path) == pytest.approx(min(lengths) + 4000, abs=4 * CONFIG.step)
+
+
+def test_route_runs_straight_through_storeys(building, build):
+    source_point, target_point = building.point(2800, 750, 0), building.point(2800, 750, 2)
+    router = StoreyRouter(building, [(2800, 200)], build)
+    path = router.find_path(source_point, target_point)
+    riser = [
+        router.router(0).find_path(source_point, np.array([2800, 200, 4000])),
+        router.router(2).find_path(np.array([2800, 200, 12000]), target_point),
+    ]
+    assert length(path) == pytest.approx(sum(map(length, riser)) + 8000, abs=4 * CONFIG.step)
+    middle = path[(path[:, 2] > riser[0][-1, 2]) & (path[:, 2] < riser[1][0, 2])]
+    assert np.all(middle[:, :2] == riser[0][-1, :2])
+
+    detour = StoreyRouter(building, [(2800, 200), (200, 1300)], build)
+    assert length(detour.find_path(source_point, target_point)) <= length(path)
+
+
+def test_storeys_without_riser(building, build):
+    router = StoreyRouter(building, [(1500, -500)], build)
+    with pytest.raises(ValueError, match="No riser links storeys 0 and 1"):
+        router.find_path(building.point(150, 750, 0), building.point(2850, 750, 1))
+    assert router.find_paths(building.point(150, 750, 0), [building.point(2850, 750, 1)]) == [None]
+    assert not router.contains(np.array([150, 750, 5000]))
+    with pytest.raises(ValueError, match="not supported across storeys"):
+        router.find_nets([])
@@ -0,0 +1,161 @@
+import threading
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from bench.generator import BuildingGenerator
+from src.building_model import BuildingModel
+from src.grid import Grid
+from src.pathfinder import PathFinder
+from src.tiled_mask import TiledMask
+from test.test_pathfinder import SimpleBuilding, SimpleConfig, box
+
+
+def reference_mask(shape, tile, memory=None, directory=None):
+    dense = (np.random.default_rng(5).random(shape) < 0.3).astype(np.uint8)
+    built = []
+
+    def builder(xs, ys):
+        built.append((xs.start, ys.start))
+        mask[xs, ys, :] = dense[xs, ys, :]
+
+    mask = TiledMask(shape, tile, builder, memory=memory, directory=directory)
+    return mask, dense, built
+
+
+def test_indexing_matches_numpy():
+    mask, dense, built = reference_mask((13, 10, 4), 4)
+    assert built == []
+    assert mask.voxel(5, 9, 2) == dense[5, 9, 2]
+    assert built == [(4, 8)]
+
+    writes = [
+        ((slice(None), slice(None), 2), 0),
+        ((3, slice(2, 9), slice(1, None)), 1),
+        ((slice(1, 11), slice(3, 7), 0), (np.arange(40).reshape(10, 4) % 2).astype(np.uint8)),
+        ((12, 9, 3), 0),
+    ]
+    for key, value in writes:
+        mask[key] = value
+        dense[key] = value
+        assert np.array_equal(mask, dense)
+
+    reads = [
+        (slice(None), slice(None), 2),
+        (4, slice(None), slice(None)),
+        (slice(1, -1), 3, slice(1, 3)),
+        (2, 4, 1),
+        (slice(5, 5), slice(None), slice(None)),
+    ]
+    for key in reads:
+        assert np.array_equal(mask[key], dense[key])
+
+    columns = (np.array([1, 1, 12, -1]), np.array([0, 7, 3, 2]), slice(2, None))
+    assert np.array_equal(mask[columns], dense[columns])
+    mask[columns] = 0
+    dense[columns] = 0
+    assert np.array_equal(mask, dense)
+    assert np.array_equal(mask.free_indices(), np.argwhere(dense == 0))
+    assert not mask.on_disk
+
+
+def test_tiles_page_to_disk_under_memory_cap(tmp_path):
+    mask, dense, built = reference_mask((40, 40, 8), 8, memory=3 * 8 * 8 * 8, directory=tmp_path)
+    assert mask.on_disk and mask.max_tiles == 3
+    mask[:, 5, :] = 0
+    dense[:, 5, :] = 0
+    assert mask.resident_tiles == 3
+    assert mask.evictions == 2
+    assert np.array_equal(mask, dense)
+    assert len(built) == mask.tiles_built == 25
+    assert len(list(tmp_path.glob("tile_*.npy"))) == 25
+
+
+def test_readers_wait_for_tiles_being_built():
+    seen = []
+
+    def builder(xs, ys):
+        reader = threading.Thread(target=lambda: seen.append(mask.voxel(xs.start, ys.start, 0)))
+        reader.start()
+        reader.join(0.05)
+        readers.append(reader)
+        mask[xs, ys, :] = 0
+
+    readers = []
+    mask = TiledMask((4, 4, 2), 2, builder)
+    assert mask.voxel(0, 0, 0) == 0
+    for reader in readers:
+        reader.join()
+    assert seen == [0]
+    assert mask.tiles_built == 1
+
+
+@pytest.fixture(scope="module")
+def building(tmp_path_factory):
+    generator = BuildingGenerator(4000, 2000, shape="sloped_cutout", ducts=4, seed=1)
+    building = BuildingModel(generator.write(tmp_path_factory.mktemp("tiled") / "model.json"))
+    z = float(building.ceiling.vertices[:, 2].max())
+    return building, [np.array([*point, z]) for point in generator.endpoints()]
+
+
+@pytest.mark.parametrize("orientation, memory_mb", [("xy", 0.01), ("xyz", 0.1)])
+def test_tiled_grid_matches_dense(building, orientation, memory_mb):
+    building, (source, target) = building
+    config = SimpleNamespace(
+        step=20, offset=100, width=50, orientation=orientation, mask="dense",
+        tile_size=16, memory_mb=memory_mb, tile_dir=None, threads=1,
+    )
+    dense = Grid(building, config)
+    dense.mark_ceiling()
+    dense.mark_obstacles()
+    config.mask = "tiled"
+    tiled = Grid(building, config)
+    tiled.mark_ceiling()
+    tiled.mark_obstacles()
+    mask = tiled.obstacle_mask
+    assert mask.on_disk and mask.tiles_built == 0
+
+    pathfinder = PathFinder(tiled, "astar")
+    path = pathfinder.find_path(source, target)
+    assert np.array_equal(path, PathFinder(dense, "astar").find_path(source, target))
+    assert 0 < mask.tiles_built < 13 * 7
+    assert mask.resident_tiles <= mask.max_tiles
+
+    assert np.array_equal(tiled.ceiling_mask, dense.ceiling_mask)
+    assert np.array_equal(mask, dense.obstacle_mask)
+
+
+def test_concurrent_searches_match_dense(building):
+    building, (source, target) = building
+    config = SimpleNamespace(
+        step=20, offset=100, width=50, orientation="xy", mask="dense",
+        tile_size=16, memory_mb=0.01, tile_dir=None, threads=1,
+    )
+    dense = Grid(building, config)
+    dense.mark_ceiling()
+    dense.mark_obstacles()
+    config.mask = "tiled"
+    tiled = Grid(building, config)
+    tiled.mark_ceiling()
+    tiled.mark_obstacles()
+
+    pairs = [(source, target), (target, source), (source, (source + target) / 2), ((source + target) / 2, target)] * 5
+    expected = [PathFinder(dense, "astar").find_paths(a, [b])[0] for a, b in pairs]
+    pathfinder = PathFinder(tiled, "astar")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = list(executor.map(lambda pair: pathfinder.find_paths(pair[0], [pair[1]])[0], pairs))
+    for path, reference in zip(paths, expected):
+        assert (path is None) == (reference is None)
+        if path is not None:
+            assert np.abs(np.diff(path, axis=0)).sum() == np.abs(np.diff(reference, axis=0)).sum()
+
+
+def test_tracked_routes_repair_without_free_index():
+    grid = Grid(SimpleBuilding(), SimpleConfig(orientation="xy", mask="tiled"))
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    pf = PathFinder(grid, "jps")
+    route = pf.track(np.array([1, 5, 5]), np.array([9, 5, 5]))
+    assert len(pf.route(route)) == 9
+    assert pf.update(grid.add_obstacle(box(3.5, 1.5, 0, 6.5, 8.5, 5))) == [route]
+    assert len(pf.route(route)) == len(PathFinder(grid, "astar").find_path(np.array([1, 5, 5]), np.array([9, 5, 5])))
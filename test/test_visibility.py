@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from bench.generator import BuildingGenerator
+from src.building_model import BuildingModel
+from src.cablegeometry import CableGeometry
+from src.grid import Grid
+from src.mesh import Mesh
+from src.pathfinder import PathFinder
+from src.visibility import VisibilityRouter
+
+
+def duct(x0, y0, x1, y1, z0=3000, z1=3500):
+    corners = np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=float)
+    vertices = np.vstack((np.column_stack((corners, np.full(4, z0))), np.column_stack((corners, np.full(4, z1)))))
+    return Mesh(vertices, [[0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7]])
+
+
+def hall(obstacles=()):
+    vertices = np.array([[0, 0, 4000], [6000, 0, 4000], [6000, 3000, 4000], [0, 3000, 4000]], dtype=float)
+    return SimpleNamespace(ceiling=Mesh(vertices, [[0, 1, 2], [0, 2, 3]]), obstacles=list(obstacles))
+
+
+def config(step=50, offset=100, width=50):
+    return SimpleNamespace(step=step, offset=offset, width=width, orientation="xy", mask="dense", threads=1, tile_size=256)
+
+
+def length(path_points):
+    return float(np.abs(np.diff(path_points, axis=0)).sum())
+
+
+def test_open_ceiling_is_a_straight_run():
+    router = VisibilityRouter(hall(), config())
+    path = router.find_path(np.array([500, 1500, 4000]), np.array([5500, 1500, 4000]))
+    assert path.tolist() == [[500, 1500, 4000], [5500, 1500, 4000]]
+    assert router.walls.shape == (4, 2, 2)
+
+
+def test_detour_keeps_clearance_and_ignores_cell_size():
+    building = hall([duct(2500, 0, 3000, 2000)])
+    source, target = np.array([500, 1000, 4000]), np.array([5500, 1000, 4000])
+    paths = [VisibilityRouter(building, config(step=step)).find_path(source, target) for step in (10, 50, 200)]
+    assert all(np.array_equal(paths[0], path) for path in paths[1:])
+
+    path = paths[0]
+    assert length(path) == pytest.approx(5000 + 2 * (2000 + 125 - 1000))
+    assert CableGeometry.runs(path).shape[0] == 4
+    assert path[:, 1].max() == pytest.approx(2125)
+    assert np.all(path[:, 1] <= 3000 - 25)
+
+
+def test_endpoints_must_be_free():
+    router = VisibilityRouter(hall([duct(2500, 0, 3000, 2000)]), config())
+    with pytest.raises(ValueError, match="Source point .* is inside an obstacle or out of grid bounds"):
+        router.find_path(np.array([2600, 1000, 4000]), np.array([500, 500, 4000]))
+    with pytest.raises(ValueError, match="Target point .* is inside an obstacle or out of grid bounds"):
+        router.find_path(np.array([500, 500, 4000]), np.array([10, 10, 4000]))
+    assert router.find_paths(np.array([500, 500, 4000]), [np.array([10, 10, 4000]), np.array([5500, 500, 4000])])[0] is None
+
+
+@pytest.mark.parametrize("shape", ["cutout", "sloped_cutout"])
+def test_matches_voxel_route_length(tmp_path, shape):
+    generator = BuildingGenerator(6000, 3000, shape=shape, ducts=4, seed=3)
+    building = BuildingModel(generator.write(tmp_path / "model.json"))
+    z = float(building.ceiling.vertices[:, 2].max())
+    source, target = (np.array([*point, z]) for point in generator.endpoints())
+
+    router = VisibilityRouter(building, config(step=20))
+    grid = Grid(building, config(step=20))
+    grid.mark_ceiling()
+    grid.mark_obstacles()
+    voxel_path = PathFinder(grid, "astar").find_path(source, target)
+    path = router.find_path(source, target)
+    assert abs(length(path) - length(voxel_path)) <= 4 * 20
+    assert path.shape[0] < voxel_path.shape[0]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+pv = pytest.importorskip("pyvista")
+trimesh = pytest.importorskip("trimesh")
+pv.OFF_SCREEN = True
+
+from src.visualizer import Visualizer
+
+
+def cells(actor):
+    actor.mapper.Update()
+    return actor.mapper.GetInput().GetNumberOfCells()
+
+
+@pytest.fixture
+def visualizer():
+    vis = Visualizer()
+    yield vis
+    vis.plotter.close()
+
+
+def test_cables_share_one_actor(visualizer):
+    path = np.array([[0, 0, 0], [10, 0, 0], [10, 10, 0], [10, 10, 10]], dtype=float)
+    for shift in range(50):
+        visualizer.add_cable(path + [0, 0, shift * 20], width=2, color="red" if shift % 2 else "blue")
+    visualizer.add_points([path[0], path[-1]])
+    actors = visualizer.plotter.renderer.actors
+    assert "cables" in actors
+    assert len(actors) == 2
+    assert cells(actors["cables"]) == 50 * 4 * 6
+
+
+def test_obstacles_merge_and_toggle(visualizer):
+    boxes = [trimesh.creation.box(extents=(1, 1, 1)).apply_translation((i, 0, 0)) for i in range(100)]
+    visualizer.add_ceiling(trimesh.creation.box(extents=(200, 200, 1)))
+    visualizer.add_obstacles(boxes)
+    visualizer.add_obstacles(boxes[:10], max_faces=60)
+    visualizer.add_key_events()
+    obstacles = list(visualizer.plotter.renderer.actors.values())[1:3]
+    assert cells(obstacles[0]) == 100 * 12
+    assert cells(obstacles[1]) <= 60
+
+    for callback in visualizer.plotter.iren._key_press_event_callbacks["2"]:
+        callback()
+    assert not any(actor.GetVisibility() for actor in obstacles)
+
+
+def test_every_storey_ceiling_toggles(visualizer):
+    for z in (0, 3000, 6000):
+        visualizer.add_ceiling(trimesh.creation.box(extents=(200, 200, 1)).apply_translation((0, 0, z)))
+    visualizer.add_key_events()
+    ceilings = list(visualizer.plotter.renderer.actors.values())[:3]
+
+    for callback in visualizer.plotter.iren._key_press_event_callbacks["1"]:
+        callback()
+    assert not any(actor.GetVisibility() for actor in ceilings)
+
+
+def test_merge_keeps_vertices():
+    boxes = [trimesh.creation.box(extents=(1, 1, 1)).apply_translation((i, 0, 0)) for i in range(3)]
+    merged = Visualizer.merge(boxes)
+    assert merged.n_points == 24
+    assert merged.n_cells == 36
+    assert np.allclose(merged.bounds, (-0.5, 2.5, -0.5, 0.5, -0.5, 0.5))